@@ -1,18 +1,21 @@
 from django.contrib import admin
 from .models import Pet, PetImage
 from django.utils import timezone
+from django.utils.html import format_html
+from core.response_cache import invalidate_cached_responses
+from missing_pets.matching import queue_refresh
 
 
 class PetImageInline(admin.TabularInline):
     """Inline admin for pet images"""
     model = PetImage
     extra = 1
-    readonly_fields = ('uploaded_at',)
+    readonly_fields = ('width', 'height', 'uploaded_at')
 
 
 @admin.register(Pet)
 class PetAdmin(admin.ModelAdmin):
-    list_display = ('name', 'category', 'breed', 'owner', 'location', 'status', 'created_at')
+    list_display = ('name', 'primary_image', 'category', 'breed', 'owner', 'location', 'status', 'created_at')
     list_filter = ('category', 'status', 'gender', 'size', 'location', 'created_at')
     search_fields = ('name', 'breed', 'description', 'owner__email', 'owner__full_name')
     readonly_fields = ('id', 'created_at', 'updated_at', 'adoption_date')
@@ -42,21 +45,40 @@ class PetAdmin(admin.ModelAdmin):
     
     actions = ['mark_as_adopted', 'mark_as_available', 'deactivate_listings']
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('owner')
+    
+    def primary_image(self, obj):
+        """Thumbnail of the primary image"""
+        if obj.primary_image_path:
+            url = PetImage._meta.get_field('image').storage.url(obj.primary_image_path)
+            return format_html('<img src="{}" style="height: 40px;" />', url)
+        return '-'
+    primary_image.short_description = 'Image'
+    
+    def update_listings(self, queryset, **values):
+        #queryset.update() sends no post_save: invalidate the cached responses and queue the match refreshes here
+        pks = list(queryset.values_list('pk', flat=True))
+        count = queryset.update(**values)
+        invalidate_cached_responses('pets')
+        queue_refresh('PET', pks)
+        return count
+    
     def mark_as_adopted(self, request, queryset):
         """Bulk action to mark pets as adopted"""
-        count = queryset.update(status='ADOPTED', adoption_date=timezone.now())
+        count = self.update_listings(queryset, status='ADOPTED', adoption_date=timezone.now())
         self.message_user(request, f'{count} pet(s) marked as adopted.')
     mark_as_adopted.short_description = 'Mark selected pets as adopted'
     
     def mark_as_available(self, request, queryset):
         """Bulk action to mark pets as available"""
-        count = queryset.update(status='AVAILABLE')
+        count = self.update_listings(queryset, status='AVAILABLE')
         self.message_user(request, f'{count} pet(s) marked as available.')
     mark_as_available.short_description = 'Mark selected pets as available'
     
     def deactivate_listings(self, request, queryset):
         """Bulk action to deactivate listings"""
-        count = queryset.update(is_active=False)
+        count = self.update_listings(queryset, is_active=False)
         self.message_user(request, f'{count} listing(s) deactivated.')
     deactivate_listings.short_description = 'Deactivate selected listings'
 
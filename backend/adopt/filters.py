@@ -1,9 +1,10 @@
 
 import django_filters
+from geo.filters import NearbyFilterSet
 from .models import Pet
 
 
-class PetFilter(django_filters.FilterSet):
+class PetFilter(NearbyFilterSet):
     """
     Advanced filters for Pet listings
     
@@ -17,12 +18,14 @@ class PetFilter(django_filters.FilterSet):
     - age_max: Maximum age in months
     - breed: Case-insensitive contains search
     - name: Case-insensitive contains search
+    - near, radius_km: Within radius_km (default 10) of "lat,lon", nearest first
     
     Examples:
     - /api/v1/pets/?category=DOG
     - /api/v1/pets/?location=Kathmandu
     - /api/v1/pets/?age_min=12&age_max=36
     - /api/v1/pets/?category=CAT&location=Pokhara
+    - /api/v1/pets/?near=27.7172,85.3240&radius_km=5
     """
     
     # Age range filters
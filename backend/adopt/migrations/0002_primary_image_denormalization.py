@@ -0,0 +1,62 @@
+# Generated by Django 5.0 on 2026-10-17 20:10
+
+from django.core.files.images import get_image_dimensions
+from django.db import migrations, models
+
+
+def backfill_primary_images(apps, schema_editor):
+    Pet = apps.get_model('adopt', 'Pet')
+    PetImage = apps.get_model('adopt', 'PetImage')
+    
+    for image in PetImage.objects.filter(is_primary=True).iterator():
+        try:
+            width, height = get_image_dimensions(image.image)
+        except (OSError, ValueError):
+            width, height = None, None
+        PetImage.objects.filter(pk=image.pk).update(width=width, height=height)
+        Pet.objects.filter(pk=image.pet_id).update(
+            primary_image_path=image.image.name,
+            primary_image_width=width,
+            primary_image_height=height
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adopt', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pet',
+            name='primary_image_height',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='pet',
+            name='primary_image_path',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='pet',
+            name='primary_image_width',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='petimage',
+            name='height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='petimage',
+            name='width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AlterField(
+            model_name='petimage',
+            name='image',
+            field=models.ImageField(height_field='height', upload_to='pets/', width_field='width'),
+        ),
+        migrations.RunPython(backfill_primary_images, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0 on 2026-10-17 20:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adopt', '0002_primary_image_denormalization'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pet',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=12),
+        ),
+        migrations.AddField(
+            model_name='pet',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='pet',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
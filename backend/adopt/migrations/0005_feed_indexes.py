@@ -0,0 +1,27 @@
+# Generated by Django 5.0 on 2026-10-17 21:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adopt', '0004_image_variants'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pet',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['status', 'category', '-created_at'], name='pets_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pet',
+            index=models.Index(condition=models.Q(('is_active', True), ('status', 'AVAILABLE')), fields=['status', '-created_at', '-id'], name='pets_available_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pet',
+            index=models.Index(fields=['owner', '-created_at'], name='pets_owner_idx'),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
 from django.conf import settings
+from django.core.files.images import get_image_dimensions
 from django.utils import timezone
+from geo.gazetteer import locate
 import uuid
 
 
@@ -61,6 +63,17 @@ class Pet(models.Model):
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='AVAILABLE')
     is_active = models.BooleanField(default=True)
     
+    # Coordinates from the offline geocoder (geo/gazetteer.py), null when unknown
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    geohash = models.CharField(max_length=12, blank=True, default='', db_index=True)
+    
+    # Denormalized primary image (kept in sync by PetImage)
+    primary_image_path = models.CharField(max_length=255, blank=True, default='')
+    primary_image_width = models.PositiveIntegerField(null=True, blank=True)
+    primary_image_height = models.PositiveIntegerField(null=True, blank=True)
+    primary_image_variants = models.JSONField(default=dict, blank=True)
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -76,16 +89,54 @@ class Pet(models.Model):
             models.Index(fields=['location']),
             models.Index(fields=['status']),
             models.Index(fields=['-created_at']),
+            # Feed filtered by status/category, newest first. is_active=True is a bare
+            # boolean term in the SQL, only usable as a partial index condition
+            models.Index(
+                fields=['status', 'category', '-created_at'],
+                condition=models.Q(is_active=True),
+                name='pets_feed_idx',
+            ),
+            # Default feed (list without ?status=), ordered like KeysetCursorPagination.
+            # status leads although it is constant, SQLite prefers an equality search
+            # on another index over scanning this one in order
+            models.Index(
+                fields=['status', '-created_at', '-id'],
+                condition=models.Q(is_active=True, status='AVAILABLE'),
+                name='pets_available_idx',
+            ),
+            # my_listings
+            models.Index(fields=['owner', '-created_at'], name='pets_owner_idx'),
         ]
     
     def __str__(self):
         return f"{self.name} ({self.category}) - {self.status}"
     
+    def save(self, *args, **kwargs):
+        #Geocode the location text whenever it is saved
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'location' in update_fields:
+            self.latitude, self.longitude, self.geohash = locate(self.location)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'latitude', 'longitude', 'geohash'}
+        super().save(*args, **kwargs)
+    
     def mark_as_adopted(self):
         #Mark pet as adopted
         self.status = 'ADOPTED'
         self.adoption_date = timezone.now()
         self.save(update_fields=['status', 'adoption_date'])
+    
+    def set_primary_image(self, image):
+        #Copy the primary image onto the listing (None clears it)
+        values = {
+            'primary_image_path': image.image.name if image else '',
+            'primary_image_width': image.width if image else None,
+            'primary_image_height': image.height if image else None,
+            'primary_image_variants': image.variants if image else {},
+        }
+        Pet.objects.filter(pk=self.pk).update(**values)
+        for attr, value in values.items():
+            setattr(self, attr, value)
 
 
 class PetImage(models.Model):
@@ -97,9 +148,15 @@ class PetImage(models.Model):
         related_name='images'
     )
     image = models.ImageField(upload_to='pets/')
+    width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    height = models.PositiveIntegerField(null=True, blank=True, editable=False)
     is_primary = models.BooleanField(default=False)
     uploaded_at = models.DateTimeField(auto_now_add=True)
     
+    # Resized WebP/AVIF copies, {format: {width: path}} (imaging/pipeline.py)
+    variants = models.JSONField(default=dict, blank=True, editable=False)
+    processed_at = models.DateTimeField(null=True, blank=True, editable=False, db_index=True)
+    
     class Meta:
         db_table = 'pet_images'
         verbose_name = 'Pet Image'
@@ -110,8 +167,23 @@ class PetImage(models.Model):
         return f"Image for {self.pet.name} {'(Primary)' if self.is_primary else ''}"
     
     def save(self, *args, **kwargs):
+        #Size a new upload here rather than through width_field, which re-reads
+        #the stored file on every load of a row without dimensions
+        if self.image and not self.image._committed:
+            self.width, self.height = get_image_dimensions(self.image)
+        
         #Ensure only one primary image per pet
         if self.is_primary:
             # Set all other images for this pet as non-primary
             PetImage.objects.filter(pet=self.pet, is_primary=True).update(is_primary=False)
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+        
+        # Keep the denormalized copy on the pet in sync
+        if self.is_primary:
+            self.pet.set_primary_image(self)
+        elif (
+            self.pet.primary_image_path == self.image.name
+            # Identical photos share a file, so the path alone doesn't identify the primary image
+            and not PetImage.objects.filter(pet=self.pet, is_primary=True).exists()
+        ):
+            self.pet.set_primary_image(None)
\ No newline at end of file
@@ -1,43 +1,64 @@
 from rest_framework import serializers
+from core.serializers import ModelSerializer
 from .models import Pet, PetImage
 from users.serializers import UserSerializer
+from imaging.pipeline import srcset, thumbnail
+from imaging.uploads import add_images
 
 
-class PetImageSerializer(serializers.ModelSerializer):
+class PetImageSerializer(ModelSerializer):
     """Serializer for pet images"""
     
+    thumbnail = serializers.SerializerMethodField()
+    srcset = serializers.SerializerMethodField()
+    
     class Meta:
         model = PetImage
-        fields = ('id', 'image', 'is_primary', 'uploaded_at')
-        read_only_fields = ('id', 'uploaded_at')
+        fields = ('id', 'image', 'width', 'height', 'thumbnail', 'srcset', 'is_primary', 'uploaded_at')
+        read_only_fields = ('id', 'width', 'height', 'uploaded_at')
+    
+    def get_thumbnail(self, obj) -> str | None:
+        return thumbnail(obj.variants, obj.image.storage, self.context.get('request'))
+    
+    def get_srcset(self, obj) -> dict:
+        #{mime type: srcset} of the resized variants, empty until processed
+        return srcset(obj.variants, obj.image.storage, self.context.get('request'))
 
 
-class PetListSerializer(serializers.ModelSerializer):
+class PetListSerializer(ModelSerializer):
     """Serializer for pet list view (minimal data)"""
     
     owner_name = serializers.CharField(source='owner.full_name', read_only=True)
     primary_image = serializers.SerializerMethodField()
+    primary_image_srcset = serializers.SerializerMethodField()
+    distance_km = serializers.FloatField(read_only=True)  # only with ?near=
     category_display = serializers.CharField(source='get_category_display', read_only=True)
     
     class Meta:
         model = Pet
         fields = (
             'id', 'name', 'category', 'category_display', 'breed',
-            'age', 'gender', 'size', 'location', 'status',
-            'primary_image', 'owner_name', 'created_at'
+            'age', 'gender', 'size', 'location', 'latitude', 'longitude', 'distance_km', 'status',
+            'primary_image', 'primary_image_width', 'primary_image_height', 'primary_image_srcset',
+            'owner_name', 'created_at'
         )
         read_only_fields = ('id', 'created_at')
     
     def get_primary_image(self, obj):
         """Get primary image URL"""
-        primary = obj.images.filter(is_primary=True).first()
-        if primary:
+        # Read the denormalized column instead of joining the images table
+        if obj.primary_image_path:
+            url = PetImage._meta.get_field('image').storage.url(obj.primary_image_path)
             request = self.context.get('request')
-            return request.build_absolute_uri(primary.image.url) if request else primary.image.url
+            return request.build_absolute_uri(url) if request else url
         return None
+    
+    def get_primary_image_srcset(self, obj) -> dict:
+        storage = PetImage._meta.get_field('image').storage
+        return srcset(obj.primary_image_variants, storage, self.context.get('request'))
 
 
-class PetDetailSerializer(serializers.ModelSerializer):
+class PetDetailSerializer(ModelSerializer):
     """Serializer for pet detail view (full data)"""
     
     owner = UserSerializer(read_only=True)
@@ -52,14 +73,14 @@ class PetDetailSerializer(serializers.ModelSerializer):
         fields = (
             'id', 'owner', 'name', 'category', 'category_display',
             'breed', 'age', 'gender', 'gender_display', 'size', 'size_display',
-            'description', 'health_info', 'location', 'contact_phone',
+            'description', 'health_info', 'location', 'latitude', 'longitude', 'contact_phone',
             'contact_email', 'status', 'status_display', 'is_active',
             'images', 'created_at', 'updated_at', 'adoption_date'
         )
         read_only_fields = ('id', 'owner', 'created_at', 'updated_at', 'adoption_date')
 
 
-class PetCreateUpdateSerializer(serializers.ModelSerializer):
+class PetCreateUpdateSerializer(ModelSerializer):
     """Serializer for creating/updating pets"""
     
     images = serializers.ListField(
@@ -102,13 +123,8 @@ class PetCreateUpdateSerializer(serializers.ModelSerializer):
         images_data = validated_data.pop('images', [])
         pet = Pet.objects.create(**validated_data)
         
-        # Create images
-        for index, image in enumerate(images_data):
-            PetImage.objects.create(
-                pet=pet,
-                image=image,
-                is_primary=(index == 0)  # First image is primary
-            )
+        # Create images in one INSERT (first image is primary)
+        add_images(pet, images_data, 'pets')
         
         return pet
     
@@ -0,0 +1,26 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from core.response_cache import invalidate_cached_responses
+from .models import Pet, PetImage
+
+
+@receiver(post_delete, sender=PetImage)
+def clear_deleted_primary_image(sender, instance, **kwargs):
+    #Clear the denormalized primary image when that image is deleted
+    if instance.is_primary:
+        Pet.objects.filter(
+            pk=instance.pet_id,
+            primary_image_path=instance.image.name
+        ).update(primary_image_path='', primary_image_width=None, primary_image_height=None, primary_image_variants={})
+
+
+@receiver(post_save, sender=Pet)
+@receiver(post_delete, sender=Pet)
+def invalidate_pet_responses(sender, instance, **kwargs):
+    invalidate_cached_responses('pets', instance.pk)
+
+
+@receiver(post_save, sender=PetImage)
+@receiver(post_delete, sender=PetImage)
+def invalidate_pet_image_responses(sender, instance, **kwargs):
+    invalidate_cached_responses('pets', instance.pet_id)
@@ -1,3 +1,314 @@
-from django.test import TestCase
+import shutil
+import tempfile
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from core.query_plans import explain, unindexed_steps
+from core.testing import make_pet, make_user, pet_values
+from users.models import User
+from .models import Pet, PetImage
+
+# 1x1 transparent GIF
+GIF_BYTES = (
+    b'GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff!\xf9\x04'
+    b'\x01\x00\x00\x00\x00,\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;'
+)
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class PetListQueryCountTests(APITestCase):
+    """List endpoints must not issue a query per pet for the primary image"""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.owner = make_user()
+
+    def create_pets(self, count):
+        with self.captureOnCommitCallbacks(execute=True):
+            for index in range(count):
+                pet = make_pet(self.owner, name=f'Pet {index}')
+                for image_index in range(2):
+                    PetImage.objects.create(
+                        pet=pet,
+                        image=SimpleUploadedFile(f'pet{index}_{image_index}.gif', GIF_BYTES, content_type='image/gif'),
+                        is_primary=(image_index == 0),
+                    )
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries), response
+
+    def test_list_query_count_does_not_grow_with_page_size(self):
+        self.create_pets(2)
+        small, response = self.count_queries('/api/v1/pets/')
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertTrue(all(pet['primary_image'] for pet in response.data['results']))
+
+        self.create_pets(8)
+        large, response = self.count_queries('/api/v1/pets/')
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertEqual(small, large)
+
+    def test_my_listings_query_count_does_not_grow(self):
+        self.client.force_authenticate(self.owner)
+
+        self.create_pets(2)
+        small, _ = self.count_queries('/api/v1/pets/my-listings/')
+
+        self.create_pets(8)
+        large, response = self.count_queries('/api/v1/pets/my-listings/')
+        self.assertEqual(len(response.data['data']), 10)
+        self.assertEqual(small, large)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class PrimaryImageDenormalizationTests(APITestCase):
+    """Pet.primary_image_* mirrors the primary PetImage"""
+
+    def setUp(self):
+        self.owner = make_user()
+        self.pet = make_pet(self.owner)
+
+    def add_image(self, name, is_primary=False):
+        return PetImage.objects.create(
+            pet=self.pet,
+            image=SimpleUploadedFile(name, GIF_BYTES, content_type='image/gif'),
+            is_primary=is_primary,
+        )
+
+    def test_images_without_dimensions_load_without_reading_the_file(self):
+        image = self.add_image('a.gif', is_primary=True)
+        PetImage.objects.filter(pk=image.pk).update(width=None, height=None)
+        image.image.storage.delete(image.image.name)
+
+        response = self.client.get(f'/api/v1/pets/{self.pet.id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.data['images'][0]['width'])
+
+    def test_primary_image_is_copied_to_pet(self):
+        image = self.add_image('a.gif', is_primary=True)
+        self.pet.refresh_from_db()
+        self.assertEqual(self.pet.primary_image_path, image.image.name)
+        self.assertEqual((self.pet.primary_image_width, self.pet.primary_image_height), (1, 1))
+
+        other = self.add_image('b.gif', is_primary=True)
+        self.pet.refresh_from_db()
+        self.assertEqual(self.pet.primary_image_path, other.image.name)
+
+    def test_deleting_primary_image_clears_pet(self):
+        image = self.add_image('a.gif', is_primary=True)
+        image.delete()
+        self.pet.refresh_from_db()
+        self.assertEqual(self.pet.primary_image_path, '')
+        self.assertIsNone(self.pet.primary_image_width)
+
+    def test_delete_image_action_promotes_next_image(self):
+        primary = self.add_image('a.gif', is_primary=True)
+        other = self.add_image('b.gif')
+        self.client.force_authenticate(self.owner)
+
+        response = self.client.delete(f'/api/v1/pets/{self.pet.id}/images/{primary.id}/')
+        self.assertEqual(response.status_code, 200)
+        self.pet.refresh_from_db()
+        self.assertEqual(self.pet.primary_image_path, other.image.name)
+
+    def test_upload_images_sets_primary_when_missing(self):
+        self.client.force_authenticate(self.owner)
+        response = self.client.post(
+            f'/api/v1/pets/{self.pet.id}/upload-images/',
+            {'images': [SimpleUploadedFile('a.gif', GIF_BYTES, content_type='image/gif')]},
+            format='multipart',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.pet.refresh_from_db()
+        self.assertTrue(self.pet.primary_image_path)
+
+
+class FeedPaginationTests(APITestCase):
+    """?pagination=cursor walks the feed by (created_at, id) without COUNT(*)"""
+
+    def setUp(self):
+        cache.clear()
+        owner = make_user()
+        Pet.objects.bulk_create([Pet(**pet_values(owner, name=f'Pet {index}')) for index in range(45)])
+        # Force ties on created_at so the id tiebreak is exercised
+        pets = list(Pet.objects.order_by('pk'))
+        Pet.objects.filter(pk__in=[pet.pk for pet in pets[:30]]).update(created_at=pets[0].created_at)
+
+    def test_page_number_pagination_is_default(self):
+        response = self.client.get('/api/v1/pets/')
+        self.assertEqual(response.data['count'], 45)
+
+    def test_cursor_pages_cover_every_pet_once(self):
+        seen = []
+        url = '/api/v1/pets/?pagination=cursor'
+        while url:
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            self.assertFalse(any('COUNT(' in query['sql'] for query in context.captured_queries))
+            seen.extend(pet['id'] for pet in response.data['results'])
+            url = response.data['next']
+
+        self.assertEqual(len(seen), 45)
+        self.assertEqual(len(set(seen)), 45)
+
+    def test_previous_link_returns_previous_page(self):
+        first = self.client.get('/api/v1/pets/?pagination=cursor')
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+        self.assertEqual(
+            [pet['id'] for pet in back.data['results']],
+            [pet['id'] for pet in first.data['results']],
+        )
+
+    def test_invalid_cursor_is_404(self):
+        response = self.client.get('/api/v1/pets/', {'cursor': 'cD1ub3QtYS1kYXRlfHg='})
+        self.assertEqual(response.status_code, 404)
+
+    def test_cursor_mode_rejects_other_orderings(self):
+        for params in ['search=pet', 'ordering=name', 'near=27.7172,85.3240']:
+            response = self.client.get(f'/api/v1/pets/?pagination=cursor&{params}')
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn('pagination', response.data)
+        self.assertEqual(self.client.get('/api/v1/pets/?pagination=cursor&category=DOG').status_code, 200)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ResponseCacheTests(APITestCase):
+    """Public list/detail responses are cached until a pet or its images change"""
+
+    def setUp(self):
+        cache.clear()
+        self.owner = make_user()
+        self.pet = self.create_pet('Buddy')
+        self.other = self.create_pet('Max')
+
+    def create_pet(self, name):
+        return make_pet(self.owner, name=name)
+
+    def test_second_request_is_served_from_cache(self):
+        first = self.client.get('/api/v1/pets/', {'category': 'DOG', 'ordering': 'name'})
+        self.assertEqual(first['X-Cache'], 'MISS')
+
+        # Param order and params the view doesn't understand don't change the key
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/v1/pets/?ordering=name&utm_source=x&category=DOG')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_http_and_https_are_cached_apart(self):
+        #Responses hold absolute URLs built from the request
+        self.client.get(f'/api/v1/pets/{self.pet.id}/')
+        self.assertEqual(self.client.get(f'/api/v1/pets/{self.pet.id}/', secure=True)['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(f'/api/v1/pets/{self.pet.id}/', secure=True)['X-Cache'], 'HIT')
+
+    def test_if_none_match_returns_304(self):
+        etag = self.client.get(f'/api/v1/pets/{self.pet.id}/')['ETag']
+        response = self.client.get(f'/api/v1/pets/{self.pet.id}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_saving_a_pet_invalidates_its_responses_only(self):
+        self.client.get('/api/v1/pets/')
+        self.client.get(f'/api/v1/pets/{self.pet.id}/')
+        self.client.get(f'/api/v1/pets/{self.other.id}/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pet.name = 'Rocky'
+            self.pet.save()
+
+        response = self.client.get(f'/api/v1/pets/{self.pet.id}/')
+        self.assertEqual((response['X-Cache'], response.data['name']), ('MISS', 'Rocky'))
+        response = self.client.get('/api/v1/pets/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertIn('Rocky', [pet['name'] for pet in response.data['results']])
+        self.assertEqual(self.client.get(f'/api/v1/pets/{self.other.id}/')['X-Cache'], 'HIT')
+
+    def test_invalidation_waits_for_the_commit(self):
+        self.client.get(f'/api/v1/pets/{self.pet.id}/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pet.name = 'Rocky'
+            self.pet.save()
+            # Other clients still read the committed row, so the cached copy stays valid
+            self.assertEqual(self.client.get(f'/api/v1/pets/{self.pet.id}/')['X-Cache'], 'HIT')
+
+        response = self.client.get(f'/api/v1/pets/{self.pet.id}/')
+        self.assertEqual((response['X-Cache'], response.data['name']), ('MISS', 'Rocky'))
+
+    def test_new_image_invalidates_pet_responses(self):
+        self.client.get('/api/v1/pets/')
+        with self.captureOnCommitCallbacks(execute=True):
+            PetImage.objects.create(
+                pet=self.pet,
+                image=SimpleUploadedFile('a.gif', GIF_BYTES, content_type='image/gif'),
+                is_primary=True,
+            )
+        response = self.client.get(f'/api/v1/pets/{self.pet.id}/')
+        self.assertEqual(len(response.data['images']), 1)
+        response = self.client.get('/api/v1/pets/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+
+    def test_cache_stats_are_admin_only(self):
+        self.client.get('/api/v1/pets/')
+        self.client.get('/api/v1/pets/')
+
+        self.client.force_authenticate(self.owner)
+        self.assertEqual(self.client.get('/api/v1/cache-stats/').status_code, 403)
+
+        admin = User.objects.create_superuser(email='admin@example.com', password='pass12345', full_name='Admin')
+        self.client.force_authenticate(admin)
+        response = self.client.get('/api/v1/cache-stats/')
+        self.assertEqual(response.data['data']['hits'], 1)
+        self.assertEqual(response.data['data']['misses'], 1)
+
+
+class PetQueryPlanTests(APITestCase):
+    """Every pets query of the listing endpoints is answered from an index, without a sort"""
+
+    def setUp(self):
+        cache.clear()
+        self.owner = make_user()
+        for index, (category, status) in enumerate([('DOG', 'AVAILABLE'), ('CAT', 'AVAILABLE'), ('DOG', 'ADOPTED')] * 3):
+            make_pet(self.owner, name=f'Pet {index}', category=category, status=status)
+
+    def assert_indexed(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        queries = [query['sql'] for query in context.captured_queries if 'FROM "pets"' in query['sql']]
+        self.assertTrue(queries)
+        for sql in queries:
+            self.assertEqual(unindexed_steps(sql, 'pets'), [], f'{sql}\n{explain(sql)}')
+        return queries
+
+    def test_default_feed(self):
+        queries = self.assert_indexed('/api/v1/pets/')
+        self.assertIn('pets_available_idx', ' '.join(explain(queries[-1])))
+
+    def test_cursor_feed(self):
+        self.assert_indexed('/api/v1/pets/?cursor=')
+
+    def test_feed_by_category_and_status(self):
+        self.assert_indexed('/api/v1/pets/?category=DOG')
+        self.assert_indexed('/api/v1/pets/?category=DOG&status=ADOPTED')
+
+    def test_my_listings(self):
+        self.client.force_authenticate(self.owner)
+        queries = self.assert_indexed('/api/v1/pets/my-listings/')
+        self.assertIn('pets_owner_idx', ' '.join(explain(queries[-1])))
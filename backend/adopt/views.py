@@ -2,19 +2,27 @@ from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter, OrderingFilter
 from .models import Pet, PetImage
 from .serializers import (
     PetListSerializer, PetDetailSerializer, PetCreateUpdateSerializer, PetImageSerializer
 )
+from core.pagination import FeedPagination
+from geo.filters import DistanceOrderingFilter
+from core.db_router import ReplicaReadMixin
+from core.response_cache import CachedResponseMixin
+from imaging.uploads import InvalidImage, StreamingUploadMixin, add_images
 from core.permissions import IsOwnerOrAdmin, HasAcceptedTerms
+from search.filters import FullTextSearchFilter
 from .filters import PetFilter
 from users.utils import send_pet_listing_confirmation
 
 
-class PetViewSet(viewsets.ModelViewSet):
-    queryset = Pet.objects.filter(is_active=True).select_related('owner').prefetch_related('images')
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+class PetViewSet(ReplicaReadMixin, StreamingUploadMixin, CachedResponseMixin, viewsets.ModelViewSet):
+    queryset = Pet.objects.filter(is_active=True).select_related('owner')
+    filter_backends = [DjangoFilterBackend, DistanceOrderingFilter, FullTextSearchFilter]
+    pagination_class = FeedPagination
+    cache_namespace = 'pets'
+    streaming_upload_actions = ('create', 'upload_images')
     filterset_class = PetFilter
     search_fields = ['name', 'breed', 'description', 'location']
     ordering_fields = ['created_at', 'age', 'name']
@@ -46,8 +54,11 @@ class PetViewSet(viewsets.ModelViewSet):
             status_filter = self.request.query_params.get('status')
             if not status_filter:
                 queryset = queryset.filter(status='AVAILABLE')
+            
+            # List reads the denormalized primary image, no images join needed
+            return queryset
         
-        return queryset
+        return queryset.prefetch_related('images')
     
     def perform_create(self, serializer):
         #Set owner when creating pet
@@ -69,7 +80,7 @@ class PetViewSet(viewsets.ModelViewSet):
         #Get current user's pet listings
         #GET /api/v1/pets/my-listings/
        
-        pets = Pet.objects.filter(owner=request.user).select_related('owner').prefetch_related('images')
+        pets = Pet.objects.filter(owner=request.user).select_related('owner')
         serializer = PetListSerializer(pets, many=True, context={'request': request})
         return Response({
             'success': True,
@@ -112,11 +123,14 @@ class PetViewSet(viewsets.ModelViewSet):
                 'error': f'Maximum 5 images allowed. Current: {current_count}'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Create images
-        created_images = []
-        for image in images:
-            pet_image = PetImage.objects.create(pet=pet, image=image)
-            created_images.append(pet_image)
+        # Files are already spooled to disk and hashed; one bulk INSERT, the first becomes primary if none is set
+        try:
+            created_images = add_images(pet, images, self.cache_namespace)
+        except InvalidImage as e:
+            return Response({
+                'success': False,
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
         
         serializer = PetImageSerializer(created_images, many=True, context={'request': request})
         return Response({
@@ -144,6 +158,13 @@ class PetViewSet(viewsets.ModelViewSet):
             
             image.delete()
             
+            # Promote the next image so the listing keeps a primary image
+            if image.is_primary:
+                next_image = PetImage.objects.filter(pet=pet).first()
+                if next_image:
+                    next_image.is_primary = True
+                    next_image.save()
+            
             return Response({
                 'success': True,
                 'message': 'Image deleted successfully'
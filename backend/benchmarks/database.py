@@ -0,0 +1,29 @@
+from contextlib import contextmanager
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connections
+from root.database import ENGINES, sqlite_profile
+
+
+@contextmanager
+def scratch_database(name, profile=None):
+    """
+    Point 'default' at the SQLite file `name` (migrated) for the duration,
+    as the test runner does with the test database, so signal handlers
+    and every other query follow
+    """
+    database = settings.DATABASES['default']
+    original = dict(database)
+    connections.close_all()
+    database.update({
+        'ENGINE': ENGINES['sqlite'],
+        'NAME': name,
+        **sqlite_profile(profile, overrides=''),
+    })
+    try:
+        call_command('migrate', verbosity=0)
+        yield
+    finally:
+        connections.close_all()
+        database.clear()
+        database.update(original)
@@ -0,0 +1,263 @@
+"""
+Bulk factories for synthetic benchmark data
+
+seed() fills the database for a given number of pets, with the other
+tables scaled from it (SCALE). Rows are built in memory batch by batch and
+written with bulk_create, skipping save() and its signals; what those would
+have done is filled in directly: denormalized primary images, geocoded
+coordinates, the search index. Every user shares one password hash, so a
+million rows cost one hash. The same `seed` value gives the same data,
+UUIDs and timestamps aside.
+
+The fixed accounts and the objects they own (fixtures()) are what the
+benchmark scenarios request; everything else is background volume.
+"""
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+from adopt.models import Pet, PetImage
+from contact.models import Feedback
+from donate.models import Donation
+from geo.gazetteer import locate
+from missing_pets.models import MissingPet, MissingPetImage
+from rescue.models import RescueContact
+from search.backends import get_search_backend
+from search.indexes import get_index_fields
+from terms.models import TermsAndConditions
+from users.models import User
+
+PASSWORD = 'benchmark-password'
+USER_EMAIL = 'benchmark-user@example.com'
+ADMIN_EMAIL = 'benchmark-admin@example.com'
+
+# Rows per pet (users, missing pets...) and floors for small scales
+SCALE = {
+    'users': (0.1, 10),
+    'pet_images': (2, 0),
+    'missing_pets': (0.25, 10),
+    'donations': (0.5, 10),
+    'feedback': (0.1, 10),
+    'rescue_contacts': (0.01, 10),
+}
+
+LOCATIONS = ['Kathmandu', 'Lalitpur', 'Bhaktapur', 'Pokhara', 'Chitwan', 'Biratnagar', 'Butwal', 'Dharan']
+BREEDS = {'DOG': ['Labrador', 'German Shepherd', 'Husky', 'Local'], 'CAT': ['Persian', 'Siamese', 'Local'], 'OTHER': ['Rabbit', 'Parrot']}
+WORDS = 'friendly playful calm vaccinated trained brown white black spotted small gentle curious loyal'.split()
+
+
+def counts(pets):
+    """Rows per table for `pets` pets"""
+    result = {'pets': pets}
+    for table, (ratio, floor) in SCALE.items():
+        result[table] = max(floor, int(pets * ratio))
+    return result
+
+
+def batches(total, batch_size):
+    """Sizes of consecutive batches adding up to total"""
+    for start in range(0, total, batch_size):
+        yield min(batch_size, total - start)
+
+
+class Factory:
+
+    def __init__(self, seed=0, batch_size=5000):
+        self.random = random.Random(seed)
+        self.batch_size = batch_size
+        self.places = {name: locate(name) for name in LOCATIONS}
+        self.search = get_search_backend()
+
+    def text(self, words):
+        return ' '.join(self.random.choices(WORDS, k=words)).capitalize()
+
+    def place(self):
+        name = self.random.choice(LOCATIONS)
+        return name, self.places[name]
+
+    def users(self, total):
+        """The two fixed accounts plus total - 2 others; returns every user id"""
+        password = make_password(PASSWORD)
+        now = timezone.now()
+        common = dict(password=password, is_active=True, is_verified=True, terms_accepted=True, terms_accepted_at=now, terms_version='1.0')
+        User.objects.bulk_create([
+            User(email=USER_EMAIL, full_name='Benchmark User', phone_number='9800000000', location='Kathmandu', **common),
+            User(email=ADMIN_EMAIL, full_name='Benchmark Admin', phone_number='9800000001', role='ADMIN', is_staff=True, is_superuser=True, **common),
+        ])
+        index = 0
+        for size in batches(max(0, total - 2), self.batch_size):
+            User.objects.bulk_create([
+                User(
+                    email=f'user{index + offset}@example.com', full_name=f'User {index + offset}',
+                    phone_number='9800000000', location=self.place()[0], **common,
+                )
+                for offset in range(size)
+            ])
+            index += size
+        return list(User.objects.values_list('id', flat=True))
+
+    def pets(self, total, owner_ids, images_per_pet):
+        fields = get_index_fields(Pet)
+        for size in batches(total, self.batch_size):
+            pets, images = [], []
+            for _ in range(size):
+                category = self.random.choice(['DOG', 'DOG', 'CAT', 'OTHER'])
+                location, (latitude, longitude, geohash) = self.place()
+                pet = Pet(
+                    owner_id=self.random.choice(owner_ids),
+                    name=f'{self.random.choice(WORDS).capitalize()} {self.random.randint(1, 999)}',
+                    category=category,
+                    breed=self.random.choice(BREEDS[category]),
+                    age=self.random.randint(1, 180),
+                    gender=self.random.choice(['MALE', 'FEMALE', 'UNKNOWN']),
+                    size=self.random.choice(['SMALL', 'MEDIUM', 'LARGE']),
+                    description=self.text(20),
+                    location=location,
+                    latitude=latitude,
+                    longitude=longitude,
+                    geohash=geohash,
+                    contact_phone='9800000000',
+                    contact_email='owner@example.com',
+                    status=self.random.choices(['AVAILABLE', 'ADOPTED', 'PENDING'], weights=[8, 1, 1])[0],
+                )
+                pet_images = [
+                    PetImage(pet=pet, image=f'pets/benchmark_{pet.pk}_{index}.jpg', width=800, height=600, is_primary=(index == 0))
+                    for index in range(images_per_pet)
+                ]
+                if pet_images:
+                    pet.primary_image_path = pet_images[0].image.name
+                    pet.primary_image_width, pet.primary_image_height = 800, 600
+                pets.append(pet)
+                images.extend(pet_images)
+            with transaction.atomic():
+                Pet.objects.bulk_create(pets)
+                PetImage.objects.bulk_create(images)
+                self.search.index_many(Pet, pets, fields)
+
+    def missing_pets(self, total, reporter_ids):
+        fields = get_index_fields(MissingPet)
+        today = date.today()
+        for size in batches(total, self.batch_size):
+            reports, images = [], []
+            for _ in range(size):
+                category = self.random.choice(['DOG', 'CAT', 'OTHER'])
+                location, (latitude, longitude, geohash) = self.place()
+                report = MissingPet(
+                    reporter_id=self.random.choice(reporter_ids),
+                    name=f'{self.random.choice(WORDS).capitalize()} {self.random.randint(1, 999)}',
+                    category=category,
+                    breed=self.random.choice(BREEDS[category]),
+                    gender=self.random.choice(['MALE', 'FEMALE', 'UNKNOWN']),
+                    description=self.text(20),
+                    last_seen_location=location,
+                    last_seen_date=today - timedelta(days=self.random.randint(0, 60)),
+                    latitude=latitude,
+                    longitude=longitude,
+                    geohash=geohash,
+                    contact_phone='9800000000',
+                    contact_email='reporter@example.com',
+                    status=self.random.choices(['MISSING', 'FOUND', 'CLOSED'], weights=[7, 2, 1])[0],
+                )
+                image = MissingPetImage(missing_pet=report, image=f'missing_pets/benchmark_{report.pk}.jpg', width=800, height=600, is_primary=True)
+                report.primary_image_path = image.image.name
+                report.primary_image_width, report.primary_image_height = 800, 600
+                reports.append(report)
+                images.append(image)
+            with transaction.atomic():
+                MissingPet.objects.bulk_create(reports)
+                MissingPetImage.objects.bulk_create(images)
+                self.search.index_many(MissingPet, reports, fields)
+
+    def donations(self, total, donor_ids):
+        for size in batches(total, self.batch_size):
+            Donation.objects.bulk_create([
+                Donation(
+                    donor_id=self.random.choice(donor_ids),
+                    donor_email='donor@example.com',
+                    amount=Decimal(self.random.randint(100, 50000)),
+                    payment_method=self.random.choice(['ESEWA', 'PAYPAL', 'BANK_TRANSFER']),
+                    payment_status=self.random.choices(['SUCCESS', 'PENDING', 'FAILED'], weights=[8, 1, 1])[0],
+                    message=self.text(8),
+                )
+                for _ in range(size)
+            ])
+
+    def feedback(self, total, user_ids):
+        for size in batches(total, self.batch_size):
+            Feedback.objects.bulk_create([
+                Feedback(
+                    user_id=self.random.choice(user_ids),
+                    email='feedback@example.com',
+                    subject=self.text(4),
+                    type=self.random.choice(['FEEDBACK', 'BUG_REPORT', 'SUGGESTION']),
+                    message=self.text(30),
+                )
+                for _ in range(size)
+            ])
+
+    def rescue_contacts(self, total):
+        contacts = []
+        for index in range(total):
+            city, (latitude, longitude, geohash) = self.place()
+            contacts.append(RescueContact(
+                name=f'Rescue {index}',
+                type=self.random.choice(['SHELTER', 'VETERINARIAN']),
+                address=f'{index} Main Road',
+                city=city,
+                latitude=latitude,
+                longitude=longitude,
+                geohash=geohash,
+                phone='9800000000',
+                email=f'rescue{index}@example.com',
+                description=self.text(12),
+            ))
+        RescueContact.objects.bulk_create(contacts, batch_size=self.batch_size)
+
+    def fixtures(self, user_id):
+        #One of everything owned by the benchmark user, so owner-only routes have something to act on
+        self.pets(1, [user_id], 2)
+        self.missing_pets(1, [user_id])
+        self.donations(1, [user_id])
+        self.feedback(1, [user_id])
+        TermsAndConditions.objects.create(version='1.0', content=self.text(200), effective_date=date.today(), is_active=True)
+
+
+def seed(pets, seed=0, batch_size=5000, log=None):
+    """Fill an empty database with `pets` pets and proportional related rows"""
+    log = log or (lambda message: None)
+    factory = Factory(seed, batch_size)
+    total = counts(pets)
+
+    user_ids = factory.users(total['users'])
+    user_id = User.objects.get(email=USER_EMAIL).pk
+    factory.fixtures(user_id)
+    log(f"{total['users']} users")
+    factory.pets(total['pets'], user_ids, total['pet_images'] // max(1, pets))
+    log(f"{total['pets']} pets, {total['pet_images']} images")
+    factory.missing_pets(total['missing_pets'], user_ids)
+    log(f"{total['missing_pets']} missing pet reports")
+    factory.donations(total['donations'], user_ids)
+    factory.feedback(total['feedback'], user_ids)
+    factory.rescue_contacts(total['rescue_contacts'])
+    log(f"{total['donations']} donations, {total['feedback']} feedback, {total['rescue_contacts']} rescue contacts")
+    return total
+
+
+def fixtures():
+    """Objects the scenarios act on, looked up so a seeded database can be reused"""
+    user = User.objects.get(email=USER_EMAIL)
+    pet = Pet.objects.filter(owner=user).earliest('created_at')
+    missing_pet = MissingPet.objects.filter(reporter=user).earliest('created_at')
+    return {
+        'user': user,
+        'admin': User.objects.get(email=ADMIN_EMAIL),
+        'pet': pet,
+        'pet_image': pet.images.filter(is_primary=False).first(),
+        'missing_pet': missing_pet,
+        'donation': Donation.objects.filter(donor=user).earliest('created_at'),
+        'feedback': Feedback.objects.filter(user=user).earliest('created_at'),
+        'rescue_contact': RescueContact.objects.earliest('created_at'),
+        'terms': TermsAndConditions.objects.get(is_active=True),
+    }
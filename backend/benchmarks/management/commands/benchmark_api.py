@@ -0,0 +1,60 @@
+import json
+import tempfile
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+from benchmarks.database import scratch_database
+from benchmarks.factories import USER_EMAIL, counts, fixtures, seed
+from benchmarks.runner import compare, run
+from benchmarks.scenarios import SCENARIOS
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Seed synthetic data and record latency, query counts and response size of every API endpoint'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--pets', type=int, default=10_000, help='Data scale, other tables are proportional')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--iterations', type=int, default=20, help='Timed requests per scenario')
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--warm-cache', action='store_true', help='Keep the response cache between requests')
+        parser.add_argument('--only', help='Run scenarios whose name contains this')
+        parser.add_argument('--db', help='SQLite file to seed and keep (reused when already seeded), default a temporary one')
+        parser.add_argument('--output', help='Write the results as JSON')
+        parser.add_argument('--baseline', help='Results JSON of an earlier run, regressions make the command fail')
+        parser.add_argument('--latency-tolerance', type=float, default=0.25, help='Allowed p95 slowdown as a fraction')
+    
+    def handle(self, *args, **options):
+        scenarios = [scenario for scenario in SCENARIOS if not options['only'] or options['only'] in scenario.name]
+        baseline = json.loads(Path(options['baseline']).read_text()) if options['baseline'] else None
+        
+        with tempfile.TemporaryDirectory(prefix='benchmark-api-') as directory:
+            name = Path(options['db']) if options['db'] else Path(directory) / 'benchmark.sqlite3'
+            with scratch_database(name):
+                if User.objects.filter(email=USER_EMAIL).exists():
+                    self.stdout.write(f'Reusing the data in {name}')
+                else:
+                    self.stdout.write(f"Seeding {options['pets']} pets into {name}")
+                    seed(options['pets'], options['seed'], log=self.stdout.write)
+                
+                results = run(scenarios, fixtures(), options['iterations'], options['warmup'], options['warm_cache'], log=self.stdout.write)
+                results['meta']['scale'] = counts(options['pets'])
+        
+        unexpected = [
+            f"{name}: {result['status']} (expected {result['expected_status']})"
+            for name, result in results['scenarios'].items() if result['status'] != result['expected_status']
+        ]
+        for message in unexpected:
+            self.stdout.write(self.style.WARNING(message))
+        
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(results, indent=2))
+            self.stdout.write(f"Wrote {options['output']}")
+        
+        if baseline:
+            if baseline['meta'].get('scale') != results['meta']['scale']:
+                self.stdout.write(self.style.WARNING('The baseline was recorded at another scale'))
+            regressions = compare(baseline, results, options['latency_tolerance'])
+            if regressions:
+                raise CommandError('Regressions against the baseline:\n' + '\n'.join(regressions))
+            self.stdout.write(self.style.SUCCESS('No regressions against the baseline'))
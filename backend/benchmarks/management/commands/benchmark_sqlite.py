@@ -0,0 +1,94 @@
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections
+from adopt.models import Pet
+from benchmarks.database import scratch_database
+from root.database import SQLITE_PROFILES
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Compare SQLite profiles with concurrent Pet creates and list reads on a scratch database'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', nargs='+', choices=list(SQLITE_PROFILES), default=list(SQLITE_PROFILES))
+        parser.add_argument('--writers', type=int, default=4, help='Threads creating pets')
+        parser.add_argument('--readers', type=int, default=4, help='Threads reading the pet list')
+        parser.add_argument('--seconds', type=float, default=5, help='Duration of each run')
+        parser.add_argument('--seed', type=int, default=500, help='Pets created before the run')
+    
+    def create_pet(self, owner, index):
+        Pet.objects.create(
+            owner=owner,
+            name=f'Benchmark {index}',
+            category='DOG',
+            age=12,
+            gender='MALE',
+            size='MEDIUM',
+            description='Benchmark pet',
+            location='Kathmandu',
+            contact_phone='9800000000',
+            contact_email=owner.email,
+        )
+    
+    def read_list(self):
+        #The query of GET /api/v1/pets/
+        list(Pet.objects.filter(status='AVAILABLE').order_by('-created_at')[:20])
+    
+    def worker(self, operation, deadline, results):
+        timings, locked = [], 0
+        try:
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    operation()
+                except OperationalError as e:
+                    if 'locked' not in str(e):
+                        raise
+                    locked += 1
+                    continue
+                timings.append(time.perf_counter() - started)
+        finally:
+            # Each thread has its own connection
+            connections.close_all()
+            results.append((timings, locked))
+    
+    def run(self, writers, readers, seconds):
+        owner = User.objects.get(email='benchmark@example.com')
+        counter = iter(range(10 ** 9))
+        write_results, read_results = [], []
+        deadline = time.perf_counter() + seconds
+        threads = [
+            threading.Thread(target=self.worker, args=(lambda: self.create_pet(owner, next(counter)), deadline, write_results))
+            for _ in range(writers)
+        ] + [
+            threading.Thread(target=self.worker, args=(self.read_list, deadline, read_results))
+            for _ in range(readers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return write_results, read_results
+    
+    def summarize(self, results, seconds):
+        timings = [timing for thread_timings, _ in results for timing in thread_timings]
+        locked = sum(count for _, count in results)
+        median = statistics.median(timings) * 1000 if timings else 0
+        return f'{len(timings) / seconds:8.1f}/s  median {median:6.1f}ms  locked {locked}'
+    
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory(prefix='benchmark-sqlite-') as directory:
+            for profile in options['profiles']:
+                with scratch_database(Path(directory) / f'{profile}.sqlite3', profile):
+                    owner = User.objects.create_user(email='benchmark@example.com', password=None, full_name='Benchmark')
+                    for index in range(options['seed']):
+                        self.create_pet(owner, index)
+                    
+                    writes, reads = self.run(options['writers'], options['readers'], options['seconds'])
+                    self.stdout.write(f'{profile:<12} creates {self.summarize(writes, options["seconds"])}')
+                    self.stdout.write(f'{"":<12} reads   {self.summarize(reads, options["seconds"])}')
@@ -0,0 +1,142 @@
+"""
+Runs the scenarios through the test client and compares result files
+
+Each scenario is requested `warmup + iterations` times, each time in a
+transaction that is rolled back, so writes don't change the data the next
+request sees. The response cache is cleared before every request unless
+warm_cache is set: query counts then show what a cache miss costs, which
+is where N+1 queries live. Recorded per scenario: status, p50/p95
+latency, the highest query count and the response size in bytes.
+
+Rate limits, replicas and real email are off for the run, and the caches
+are a private local memory cache so clearing them is safe.
+"""
+import logging
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from django import get_version
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from users.tokens import RefreshToken
+
+RUN_SETTINGS = {
+    'CACHES': {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'benchmarks'}},
+    'RATE_LIMITS': {},
+    'DATABASE_REPLICAS': [],
+    'EMAIL_BACKEND': 'django.core.mail.backends.locmem.EmailBackend',
+}
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))]
+
+
+def get_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(__file__),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure(scenario, fixtures, client, iterations, warmup, warm_cache):
+    timings, queries = [], []
+    for iteration in range(warmup + iterations):
+        with transaction.atomic():
+            values = {**fixtures, **scenario.prepare(fixtures)}
+            if not warm_cache:
+                cache.clear()
+            path, data = scenario.path(values), scenario.data(values)
+            with CaptureQueriesContext(connection) as context:
+                started = time.perf_counter()
+                if scenario.method == 'get':
+                    response = client.get(path, data)
+                else:
+                    response = getattr(client, scenario.method)(path, data, format=scenario.format)
+                elapsed = time.perf_counter() - started
+            transaction.set_rollback(True)
+        if iteration >= warmup:
+            timings.append(elapsed * 1000)
+            queries.append(len(context.captured_queries))
+    return {
+        'route': scenario.route,
+        'action': scenario.action,
+        'method': scenario.method.upper(),
+        'path': path,
+        'status': response.status_code,
+        'expected_status': scenario.status,
+        'p50_ms': round(percentile(timings, 0.5), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'queries': max(queries),
+        'bytes': len(response.content),
+    }
+
+
+def run(scenarios, fixtures, iterations=20, warmup=2, warm_cache=False, log=None):
+    """Result dict (see module docstring), JSON serializable"""
+    log = log or (lambda message: None)
+    results = {}
+    # Expected 4xx (and recorded 5xx) responses would log a line per request
+    request_logger = logging.getLogger('django.request')
+    level = request_logger.level
+    request_logger.setLevel(logging.CRITICAL)
+    try:
+        with (
+            tempfile.TemporaryDirectory(prefix='benchmark-media-') as media_root,
+            override_settings(MEDIA_ROOT=media_root, **RUN_SETTINGS),
+        ):
+            tokens = {
+                role: str(RefreshToken.for_user(fixtures[role]).access_token)
+                for role in ('user', 'admin')
+            }
+            for scenario in scenarios:
+                client = APIClient(HTTP_HOST='localhost', raise_request_exception=False)
+                if scenario.user:
+                    client.credentials(HTTP_AUTHORIZATION=f'Bearer {tokens[scenario.user]}')
+                results[scenario.name] = result = measure(scenario, fixtures, client, iterations, warmup, warm_cache)
+                log(f"{scenario.name:<70} {result['status']:>3}  p50 {result['p50_ms']:8.2f}ms  p95 {result['p95_ms']:8.2f}ms  "
+                    f"{result['queries']:>3}q  {result['bytes']:>8}B")
+    finally:
+        request_logger.setLevel(level)
+    return {
+        'meta': {
+            'commit': get_commit(),
+            'created_at': timezone.now().isoformat(),
+            'iterations': iterations,
+            'warm_cache': warm_cache,
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'django': get_version(),
+        },
+        'scenarios': results,
+    }
+
+
+def compare(baseline, current, latency_tolerance=0.25, latency_floor_ms=2.0):
+    """
+    Regressions of `current` against `baseline` as messages: any extra query,
+    a changed status, or a p95 more than `latency_tolerance` (fraction) and
+    `latency_floor_ms` slower
+    """
+    regressions = []
+    for name, new in current['scenarios'].items():
+        old = baseline['scenarios'].get(name)
+        if old is None:
+            continue
+        if new['status'] != old['status']:
+            regressions.append(f"{name}: status {old['status']} -> {new['status']}")
+        if new['queries'] > old['queries']:
+            regressions.append(f"{name}: queries {old['queries']} -> {new['queries']}")
+        slower = new['p95_ms'] - old['p95_ms']
+        if slower > latency_floor_ms and slower > old['p95_ms'] * latency_tolerance:
+            regressions.append(f"{name}: p95 {old['p95_ms']:.2f}ms -> {new['p95_ms']:.2f}ms")
+    return regressions
@@ -0,0 +1,230 @@
+"""
+The requests the benchmark makes, at least one per route and action of
+root/api_urls.py
+
+A scenario names the route (URL name) and viewset action it exercises;
+tests check that route_actions() is covered, so a new endpoint fails the
+suite until it has a scenario. Paths and bodies are callables of the
+fixtures (benchmarks/factories.py); `prepare` runs before the timed
+request, inside the same rolled back transaction, for things a request
+consumes (reset tokens, refresh tokens).
+"""
+from datetime import timedelta
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import get_resolver, reverse
+from django.urls.resolvers import URLResolver
+from django.utils import timezone
+from users.models import EmailVerificationToken, PasswordResetToken
+from users.tokens import RefreshToken
+from .factories import PASSWORD, USER_EMAIL
+
+# 1x1 transparent GIF
+GIF_BYTES = (
+    b'GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff!\xf9\x04\x01\x00'
+    b'\x00\x00\x00,\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;'
+)
+HTTP_METHODS = ('get', 'post', 'put', 'patch', 'delete')
+
+
+class Scenario:
+    """One request: route and action it covers, who makes it and with what"""
+
+    def __init__(self, route, action, method='get', kwargs=None, query='', user=None, data=None,
+                 format='json', status=200, prepare=None, name=None):
+        self.route = route
+        self.action = action
+        self.method = method
+        self.kwargs = kwargs or (lambda f: {})
+        self.query = query
+        self.user = user  # None, 'user' or 'admin'
+        self.data = data or (lambda f: None)
+        self.format = format
+        self.status = status
+        self.prepare = prepare or (lambda f: {})
+        self.name = name or f'{route}:{action}' + (f'?{query}' if query else '')
+
+    def path(self, fixtures):
+        path = reverse(self.route, kwargs=self.kwargs(fixtures))
+        return f'{path}?{self.query}' if self.query else path
+
+
+def image(name='benchmark.gif'):
+    return SimpleUploadedFile(name, GIF_BYTES, content_type='image/gif')
+
+
+def refresh_token(f):
+    return {'refresh': str(RefreshToken.for_user(f['user']))}
+
+
+def reset_token(f):
+    token = PasswordResetToken.objects.create(
+        user=f['user'], token=PasswordResetToken.generate_token(), expires_at=timezone.now() + timedelta(hours=1)
+    )
+    return {'token': token.token}
+
+
+def verification_token(f):
+    EmailVerificationToken.objects.filter(user=f['user']).delete()
+    token = EmailVerificationToken.objects.create(
+        user=f['user'], token=EmailVerificationToken.generate_token(), expires_at=timezone.now() + timedelta(hours=24)
+    )
+    return {'token': token.token}
+
+
+def pet_fields(f):
+    return {
+        'name': 'Benchmark', 'category': 'DOG', 'breed': 'Local', 'age': 12, 'gender': 'MALE', 'size': 'MEDIUM',
+        'description': 'Friendly and vaccinated', 'location': 'Kathmandu',
+        'contact_phone': '9800000000', 'contact_email': USER_EMAIL,
+    }
+
+
+def missing_pet_fields(f):
+    return {
+        'name': 'Benchmark', 'category': 'CAT', 'breed': 'Local', 'gender': 'FEMALE',
+        'description': 'White paws', 'last_seen_location': 'Pokhara', 'last_seen_date': str(timezone.now().date()),
+        'contact_phone': '9800000000', 'contact_email': USER_EMAIL,
+    }
+
+
+def fixture_pk(name):
+    return lambda f: {'pk': f[name].pk}
+
+
+user_pk = fixture_pk('user')
+pet_pk = fixture_pk('pet')
+missing_pet_pk = fixture_pk('missing_pet')
+donation_pk = fixture_pk('donation')
+feedback_pk = fixture_pk('feedback')
+
+SCENARIOS = [
+    # users
+    Scenario('users-list', 'list', user='admin'),
+    Scenario('users-list', 'create', 'post', status=201, data=lambda f: {
+        'email': 'new-user@example.com', 'password': 'Benchmark-pass-9', 'password2': 'Benchmark-pass-9',
+        'full_name': 'New User', 'terms_accepted': True,
+    }),
+    Scenario('users-login', 'login', 'post', data=lambda f: {'email': USER_EMAIL, 'password': PASSWORD}),
+    Scenario('users-refresh', 'refresh', 'post', prepare=refresh_token, data=lambda f: {'refresh': f['refresh']}),
+    Scenario('users-logout', 'logout', 'post', user='user', prepare=refresh_token, data=lambda f: {'refresh': f['refresh']}),
+    Scenario('users-me', 'me', user='user'),
+    Scenario('users-update-me', 'update_me', 'patch', user='user', data=lambda f: {'location': 'Pokhara'}),
+    Scenario('users-change-password', 'change_password', 'post', user='user', data=lambda f: {
+        'old_password': PASSWORD, 'new_password': 'Benchmark-pass-9', 'new_password2': 'Benchmark-pass-9',
+    }),
+    Scenario('users-forgot-password', 'forgot_password', 'post', data=lambda f: {'email': USER_EMAIL}),
+    Scenario('users-verify-password-reset-token', 'verify_password_reset_token', 'post', prepare=reset_token,
+             data=lambda f: {'token': f['token']}),
+    Scenario('users-reset-password', 'reset_password', 'post', prepare=reset_token, data=lambda f: {
+        'token': f['token'], 'new_password': 'Benchmark-pass-9', 'new_password2': 'Benchmark-pass-9',
+    }),
+    Scenario('users-verify-email', 'verify_email', 'post', prepare=verification_token, data=lambda f: {'token': f['token']}),
+    Scenario('users-hashing-stats', 'hashing_stats', user='admin'),
+    Scenario('users-detail', 'retrieve', kwargs=user_pk, user='user'),
+    Scenario('users-detail', 'update', 'put', kwargs=user_pk, user='user', data=lambda f: {
+        'full_name': 'Benchmark User', 'phone_number': '9800000000', 'location': 'Pokhara',
+    }),
+    Scenario('users-detail', 'partial_update', 'patch', kwargs=user_pk, user='user', data=lambda f: {'location': 'Pokhara'}),
+    Scenario('users-detail', 'destroy', 'delete', kwargs=user_pk, user='user', status=204),
+
+    # terms
+    Scenario('terms-list', 'list'),
+    Scenario('terms-current', 'current'),
+    Scenario('terms-detail', 'retrieve', kwargs=fixture_pk('terms')),
+    Scenario('terms-accept', 'accept', 'post', user='user', data=lambda f: {'terms_id': f['terms'].pk}),
+    Scenario('terms-my-acceptance', 'my_acceptance', user='user'),
+
+    # pets
+    Scenario('pets-list', 'list'),
+    Scenario('pets-list', 'list', query='category=DOG&size=MEDIUM'),
+    Scenario('pets-list', 'list', query='search=friendly'),
+    Scenario('pets-list', 'list', query='near=27.7172,85.3240'),
+    Scenario('pets-list', 'list', query='cursor='),
+    Scenario('pets-list', 'create', 'post', user='user', format='multipart', status=201,
+             data=lambda f: {**pet_fields(f), 'images': [image()]}),
+    Scenario('pets-my-listings', 'my_listings', user='user'),
+    Scenario('pets-detail', 'retrieve', kwargs=pet_pk),
+    Scenario('pets-detail', 'update', 'put', kwargs=pet_pk, user='user', data=pet_fields),
+    Scenario('pets-detail', 'partial_update', 'patch', kwargs=pet_pk, user='user', data=lambda f: {'age': 13}),
+    Scenario('pets-detail', 'destroy', 'delete', kwargs=pet_pk, user='user', status=204),
+    Scenario('pets-delete-image', 'delete_image', 'delete', user='user',
+             kwargs=lambda f: {'pk': f['pet'].pk, 'image_id': f['pet_image'].pk}),
+    Scenario('pets-mark-adopted', 'mark_adopted', 'post', kwargs=pet_pk, user='user'),
+    Scenario('pets-upload-images', 'upload_images', 'post', kwargs=pet_pk, user='user', format='multipart',
+             data=lambda f: {'images': [image()]}),
+
+    # missing pets
+    Scenario('missing-pets-list', 'list'),
+    Scenario('missing-pets-list', 'list', query='category=CAT'),
+    Scenario('missing-pets-list', 'list', query='search=white'),
+    Scenario('missing-pets-list', 'create', 'post', user='user', format='multipart', status=201,
+             data=lambda f: {**missing_pet_fields(f), 'images': [image()]}),
+    Scenario('missing-pets-my-reports', 'my_reports', user='user'),
+    Scenario('missing-pets-detail', 'retrieve', kwargs=missing_pet_pk),
+    Scenario('missing-pets-detail', 'update', 'put', kwargs=missing_pet_pk, user='user', data=missing_pet_fields),
+    Scenario('missing-pets-detail', 'partial_update', 'patch', kwargs=missing_pet_pk, user='user',
+             data=lambda f: {'description': 'White paws, blue collar'}),
+    Scenario('missing-pets-detail', 'destroy', 'delete', kwargs=missing_pet_pk, user='user', status=204),
+    Scenario('missing-pets-mark-found', 'mark_found', 'post', kwargs=missing_pet_pk, user='user'),
+    Scenario('missing-pets-possible-matches', 'possible_matches', kwargs=missing_pet_pk),
+    Scenario('missing-pets-suggested-matches', 'suggested_matches', kwargs=missing_pet_pk),
+    Scenario('missing-pets-upload-images', 'upload_images', 'post', kwargs=missing_pet_pk, user='user',
+             format='multipart', data=lambda f: {'images': [image()]}),
+
+    # rescue
+    Scenario('rescue-list', 'list'),
+    Scenario('rescue-list', 'list', query='near=27.7172,85.3240&radius_km=25'),
+    Scenario('rescue-detail', 'retrieve', kwargs=fixture_pk('rescue_contact')),
+
+    # donations
+    Scenario('donations-list', 'list', user='admin'),
+    Scenario('donations-list', 'create', 'post', status=201, data=lambda f: {
+        'donor_email': 'donor@example.com', 'amount': '500.00', 'payment_method': 'ESEWA',
+    }),
+    Scenario('donations-initiate', 'initiate', 'post', user='user', status=201, data=lambda f: {
+        'donor_email': 'donor@example.com', 'amount': '500.00', 'payment_method': 'PAYPAL',
+    }),
+    Scenario('donations-my-donations', 'my_donations', user='user'),
+    Scenario('donations-detail', 'retrieve', kwargs=donation_pk, user='admin'),
+    Scenario('donations-detail', 'update', 'put', kwargs=donation_pk, user='admin', data=lambda f: {
+        'donor_email': 'donor@example.com', 'amount': '600.00', 'payment_method': 'ESEWA',
+    }),
+    Scenario('donations-detail', 'partial_update', 'patch', kwargs=donation_pk, user='admin', data=lambda f: {'message': 'Thanks'}),
+    Scenario('donations-detail', 'destroy', 'delete', kwargs=donation_pk, user='admin', status=204),
+
+    # feedback
+    Scenario('feedback-list', 'list', user='admin'),
+    Scenario('feedback-list', 'create', 'post', status=201, data=lambda f: {
+        'name': 'Visitor', 'email': 'visitor@example.com', 'subject': 'Hello', 'type': 'FEEDBACK', 'message': 'Great work',
+    }),
+    Scenario('feedback-my-feedback', 'my_feedback', user='user'),
+    Scenario('feedback-detail', 'retrieve', kwargs=feedback_pk, user='admin'),
+    Scenario('feedback-detail', 'update', 'put', kwargs=feedback_pk, user='admin', data=lambda f: {
+        'email': 'visitor@example.com', 'subject': 'Hello', 'type': 'FEEDBACK', 'message': 'Great work', 'status': 'RESOLVED',
+    }),
+    Scenario('feedback-detail', 'partial_update', 'patch', kwargs=feedback_pk, user='admin', data=lambda f: {'status': 'RESOLVED'}),
+    Scenario('feedback-detail', 'destroy', 'delete', kwargs=feedback_pk, user='user', status=204),
+
+    # core
+    Scenario('cache-stats', 'get', user='admin'),
+]
+
+
+def route_actions(urlconf='root.api_urls'):
+    """(route name, action) for every endpoint; the HTTP method stands in for APIViews"""
+    found = set()
+
+    def walk(patterns):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                walk(pattern.url_patterns)
+            elif pattern.name != 'api-root':
+                callback = pattern.callback
+                if getattr(callback, 'actions', None):
+                    found.update((pattern.name, action) for action in callback.actions.values())
+                else:
+                    view_class = callback.view_class
+                    found.update((pattern.name, method) for method in HTTP_METHODS if hasattr(view_class, method))
+
+    walk(get_resolver(urlconf).url_patterns)
+    return found
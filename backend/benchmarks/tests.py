@@ -0,0 +1,59 @@
+from django.test import TestCase
+
+from .factories import counts, fixtures, seed
+from .runner import compare, run
+from .scenarios import SCENARIOS, route_actions
+
+
+def results(**scenarios):
+    return {'meta': {}, 'scenarios': {
+        name: {'status': 200, 'queries': 2, 'p95_ms': 10.0, **values} for name, values in scenarios.items()
+    }}
+
+
+class ScenarioCoverageTests(TestCase):
+
+    def test_every_route_has_a_scenario(self):
+        covered = {(scenario.route, scenario.action) for scenario in SCENARIOS}
+        self.assertEqual(route_actions() - covered, set())
+
+    def test_scenario_names_are_unique(self):
+        names = [scenario.name for scenario in SCENARIOS]
+        self.assertEqual(len(names), len(set(names)))
+
+
+class BenchmarkRunTests(TestCase):
+    """The whole suite runs at a tiny scale and every request gets its expected status"""
+
+    def test_run(self):
+        total = seed(20)
+        self.assertEqual(total, counts(20))
+        result = run(SCENARIOS, fixtures(), iterations=1, warmup=0)
+
+        unexpected = {
+            name: scenario['status'] for name, scenario in result['scenarios'].items()
+            if scenario['status'] != scenario['expected_status']
+        }
+        self.assertEqual(unexpected, {})
+        listing = result['scenarios']['pets-list:list']
+        self.assertGreater(listing['bytes'], 0)
+        self.assertLessEqual(listing['queries'], 2)
+
+
+class CompareTests(TestCase):
+
+    def test_extra_queries_and_status_changes_are_regressions(self):
+        baseline = results(**{'pets-list:list': {}, 'pets-detail:retrieve': {}})
+        current = results(**{'pets-list:list': {'queries': 22}, 'pets-detail:retrieve': {'status': 500}})
+        self.assertEqual(compare(baseline, current), [
+            'pets-list:list: queries 2 -> 22',
+            'pets-detail:retrieve: status 200 -> 500',
+        ])
+
+    def test_latency_needs_both_tolerance_and_floor(self):
+        baseline = results(**{'fast': {'p95_ms': 1.0}, 'slow': {'p95_ms': 100.0}})
+        self.assertEqual(compare(baseline, results(**{'fast': {'p95_ms': 2.5}, 'slow': {'p95_ms': 120.0}})), [])
+        self.assertEqual(len(compare(baseline, results(**{'slow': {'p95_ms': 130.0}}))), 1)
+
+    def test_new_scenarios_are_not_regressions(self):
+        self.assertEqual(compare(results(), results(**{'new:list': {}})), [])
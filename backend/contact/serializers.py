@@ -1,9 +1,10 @@
 from rest_framework import serializers
+from core.serializers import ModelSerializer
 from .models import Feedback
 from users.serializers import UserSerializer
 
 
-class FeedbackListSerializer(serializers.ModelSerializer):
+class FeedbackListSerializer(ModelSerializer):
     
     sender_display = serializers.SerializerMethodField()
     type_display = serializers.CharField(source='get_type_display', read_only=True)
@@ -21,7 +22,7 @@ class FeedbackListSerializer(serializers.ModelSerializer):
         return obj.get_sender_display()
 
 
-class FeedbackDetailSerializer(serializers.ModelSerializer):
+class FeedbackDetailSerializer(ModelSerializer):
     
     sender_info = UserSerializer(source='user', read_only=True)
     sender_display = serializers.SerializerMethodField()
@@ -41,7 +42,7 @@ class FeedbackDetailSerializer(serializers.ModelSerializer):
         return obj.get_sender_display()
 
 
-class FeedbackCreateSerializer(serializers.ModelSerializer):
+class FeedbackCreateSerializer(ModelSerializer):
     
     class Meta:
         model = Feedback
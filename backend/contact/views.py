@@ -7,11 +7,13 @@ from .serializers import (
     FeedbackListSerializer, FeedbackDetailSerializer, FeedbackCreateSerializer
 )
 from core.permissions import IsAdminUser
+from core.throttling import RateLimitMixin
 from .utils import send_feedback_confirmation_email
 
 
-class FeedbackViewSet(viewsets.ModelViewSet):
+class FeedbackViewSet(RateLimitMixin, viewsets.ModelViewSet):
     queryset = Feedback.objects.all()
+    rate_limit_scopes = {'create': 'feedback'}
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['type', 'status']
     ordering = ['-created_at']
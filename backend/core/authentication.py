@@ -0,0 +1,88 @@
+"""
+JWT authentication backed by a short-lived user cache
+
+JWTAuthentication loads the User row on every authenticated request.
+CachedJWTAuthentication keeps the user's fields, keyed by the token's
+user_id, in Django's cache (settings.CACHES) for AUTH_USER_CACHE_TIMEOUT
+seconds, so permission checks (terms, role, ownership) cost no queries in
+the steady state. The password hash is never cached (the cache is shared,
+Redis in production): a cached user is rebuilt with the password deferred,
+and only the md5 that CHECK_REVOKE_TOKEN compares with is kept. Saving or
+deleting a User drops its entry (users/signals.py); bulk .update() calls
+bypass signals and are picked up when the entry expires.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+KEY_PREFIX = 'auth:user'
+# Never written to the cache
+SECRET_FIELDS = {'password'}
+
+
+def get_cache():
+    return caches[getattr(settings, 'AUTH_USER_CACHE_ALIAS', 'default')]
+
+
+def user_cache_key(user_id):
+    return f'{KEY_PREFIX}:{user_id}'
+
+
+def invalidate_cached_user(user_id):
+    get_cache().delete(user_cache_key(user_id))
+
+
+def cached_fields(user_model):
+    return [field.attname for field in user_model._meta.concrete_fields if field.attname not in SECRET_FIELDS]
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that reads the user from the cache before the database"""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        cache = get_cache()
+        key = user_cache_key(user_id)
+        fields = cached_fields(self.user_model)
+        entry = cache.get(key)
+        if entry is None:
+            row = (
+                self.user_model.objects
+                .filter(**{api_settings.USER_ID_FIELD: user_id})
+                .values(*fields, 'password')
+                .first()
+            )
+            if row is None:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            entry = {field: row[field] for field in fields}
+            entry['revoke_hash'] = get_md5_hash_password(row['password'])
+            cache.set(key, entry, getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 60))
+
+        # A saved instance with the password deferred (loaded on first access)
+        user = self.user_model.from_db(
+            router.db_for_read(self.user_model), fields, [entry[field] for field in fields]
+        )
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != entry['revoke_hash']:
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    #Same bearer scheme in the API docs as JWTAuthentication
+    target_class = 'core.authentication.CachedJWTAuthentication'
@@ -0,0 +1,44 @@
+"""
+Bounded deletes for cleanup jobs
+
+A single DELETE over a large table holds its locks (on SQLite, the whole
+database) until it finishes and blocks live writes meanwhile.
+delete_in_batches() deletes at most batch_size rows per short transaction,
+optionally sleeping between batches so other writers get in. Batches are
+picked in the order of an index: the primary key (resuming after the last
+deleted key), or an indexed column of the filter such as expires_at, where
+deleted rows leave the filter and each batch starts at the front of the index.
+"""
+import time
+from collections import Counter
+
+from django.db import transaction
+
+
+def delete_in_batches(queryset, batch_size=1000, pause=0, index='pk'):
+    """
+    Delete every row of the queryset, batch_size at a time in `index` order;
+    returns a Counter of {model label: rows deleted}, cascades included
+    """
+    deleted = Counter()
+    last_pk = None
+    while True:
+        batch = queryset.order_by(index)
+        if last_pk is not None:
+            batch = batch.filter(pk__gt=last_pk)
+        pks = list(batch.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            break
+        
+        # Re-apply the queryset's filters, a row may no longer match
+        with transaction.atomic():
+            _, counts = queryset.filter(pk__in=pks).delete()
+        deleted.update(counts)
+        if index == 'pk':
+            last_pk = pks[-1]
+        
+        if len(pks) < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+    return deleted
@@ -0,0 +1,119 @@
+"""
+Read replica routing for the public list/retrieve endpoints
+
+Only reads that can tolerate replica lag go to a replica: list/retrieve
+actions of ViewSets using ReplicaReadMixin (adopt, missing_pets, rescue,
+terms), and within those only models of REPLICA_APPS. Everything else,
+including every write and any read inside a write request, stays on
+'default'.
+
+Read-your-writes: after a successful write (PrimaryPinMiddleware) the
+client is pinned to the primary for REPLICA_PIN_SECONDS, by a cookie and,
+for authenticated users, by a cache entry keyed by user id (JWT clients
+may not keep cookies), so it sees its own changes before the replicas
+catch up.
+
+Everyone else's: public responses are cached for all clients
+(core/response_cache.py), so a cache miss within REPLICA_LAG_SECONDS of an
+invalidation is rebuilt from the primary (primary_reads()); a lagging
+replica could otherwise put the old data back for RESPONSE_CACHE_TIMEOUT.
+
+DATABASE_REPLICAS lists the replica aliases (root/database.py); with
+none configured the router sends everything to 'default'.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+PIN_COOKIE = 'db_primary_pin'
+
+replica_reads = ContextVar('replica_reads', default=False)
+
+
+def pin_key(user_id):
+    return f'db:primary_pin:{user_id}'
+
+
+def is_pinned(request):
+    if PIN_COOKIE in request.COOKIES:
+        return True
+    user = getattr(request, 'user', None)
+    return bool(user and user.is_authenticated and cache.get(pin_key(user.pk)))
+
+
+@contextmanager
+def primary_reads():
+    """Send the reads of the block to the primary, even in a replica action"""
+    token = replica_reads.set(False)
+    try:
+        yield
+    finally:
+        replica_reads.reset(token)
+
+
+def choose_replica():
+    replicas = getattr(settings, 'DATABASE_REPLICAS', [])
+    return random.choice(replicas) if replicas else None
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if replica_reads.get() and model._meta.app_label in getattr(settings, 'REPLICA_APPS', ()):
+            return choose_replica()
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+
+class ReplicaReadMixin:
+    """Serve `replica_actions` from a replica unless the client is pinned to the primary"""
+
+    replica_actions = ('list', 'retrieve')
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # After authentication, so a pinned user is recognised
+        use_replica = (
+            bool(getattr(settings, 'DATABASE_REPLICAS', []))
+            and self.action in self.replica_actions
+            and not is_pinned(request)
+        )
+        self._replica_token = replica_reads.set(use_replica)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_replica_token', None)
+        if token is not None:
+            replica_reads.reset(token)
+            self._replica_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class PrimaryPinMiddleware:
+    """Keep a client on the primary for REPLICA_PIN_SECONDS after it writes"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            request.method not in ('GET', 'HEAD', 'OPTIONS')
+            and response.status_code < 400
+            and getattr(settings, 'DATABASE_REPLICAS', [])
+        ):
+            seconds = getattr(settings, 'REPLICA_PIN_SECONDS', 10)
+            response.set_cookie(PIN_COOKIE, '1', max_age=seconds, httponly=True, samesite='Lax')
+            # DRF copies the authenticated user onto the Django request
+            user = getattr(request, 'user', None)
+            if user and user.is_authenticated:
+                cache.set(pin_key(user.pk), True, seconds)
+        return response
@@ -0,0 +1,174 @@
+#Pagination classes shared by the public listing endpoints
+
+from django.core.exceptions import ValidationError as FieldValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import Cursor, CursorPagination, PageNumberPagination
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Keyset pagination over (created_at, id), newest first
+
+    DRF's CursorPagination positions on the first ordering field only and
+    skips ties with an OFFSET. This encodes every ordering field in the
+    cursor and filters with a row comparison instead, so each page is an
+    index range scan no matter how deep the client has scrolled.
+    """
+
+    ordering = ('-created_at', '-id')
+    position_separator = '|'
+
+    def get_ordering(self, request, queryset, view):
+        # The keyset only works for its fixed ordering; relevance (?search=), distance (?near=) and ?ordering= would be dropped
+        if not set(queryset.query.order_by) <= set(self.ordering):
+            raise ValidationError({
+                'pagination': 'Cursor pagination only walks the newest-first feed, use page numbers with search, near or ordering.'
+            })
+        return self.ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (reverse, current_position) = (False, None)
+        else:
+            (_, reverse, current_position) = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(*[self.reverse_field(field) for field in self.ordering])
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if current_position is not None:
+            queryset = queryset.filter(self.get_position_filter(queryset.model, current_position, reverse))
+
+        # Fetch one extra row to know whether there is a following page
+        results = list(queryset[:self.page_size + 1])
+        self.page = list(results[:self.page_size])
+        has_following = len(results) > len(self.page)
+
+        # Cursors are exclusive bounds: the first/last row shown on this page
+        if self.page:
+            nearest = self._get_position_from_instance(self.page[0], self.ordering)
+            furthest = self._get_position_from_instance(self.page[-1], self.ordering)
+        else:
+            nearest = furthest = current_position
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = current_position is not None
+            self.has_previous = has_following
+            self.next_position = nearest
+            self.previous_position = furthest
+        else:
+            self.has_next = has_following
+            self.has_previous = current_position is not None
+            self.next_position = furthest
+            self.previous_position = nearest
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=self.next_position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=self.previous_position))
+
+    def reverse_field(self, field):
+        return field[1:] if field.startswith('-') else '-' + field
+
+    def get_position_filter(self, model, position, reverse):
+        #(a, b) < (x, y)  ==>  a < x OR (a = x AND b < y)
+        values = position.split(self.position_separator)
+        if len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        fields = [field.lstrip('-') for field in self.ordering]
+        try:
+            values = [model._meta.get_field(field).to_python(value) for field, value in zip(fields, values)]
+        except FieldValidationError:
+            raise NotFound(self.invalid_cursor_message)
+
+        descending = self.ordering[0].startswith('-') != reverse
+        lookup = 'lt' if descending else 'gt'
+
+        condition = Q()
+        for index, field in enumerate(fields):
+            equal = {fields[i]: values[i] for i in range(index)}
+            condition |= Q(**equal, **{f'{field}__{lookup}': values[index]})
+        return condition
+
+    def _get_position_from_instance(self, instance, ordering):
+        return self.position_separator.join(
+            str(instance[field.lstrip('-')] if isinstance(instance, dict) else getattr(instance, field.lstrip('-')))
+            for field in ordering
+        )
+
+
+class FeedPagination(PageNumberPagination):
+    """
+    Page-number pagination with opt-in keyset pagination for feeds
+
+    - /api/v1/pets/?page=3              -> {count, next, previous, results}
+    - /api/v1/pets/?pagination=cursor   -> {next, previous, results}
+
+    Cursor responses skip the COUNT(*) and OFFSET; clients follow the
+    `next` link, which carries the ?cursor= token. Feeds ordered by search
+    relevance, distance or ?ordering= are 400 in cursor mode.
+    """
+
+    mode_query_param = 'pagination'
+    cursor_pagination_class = KeysetCursorPagination
+
+    cursor_paginator = None
+
+    def use_cursor(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.cursor_pagination_class.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_cursor(request):
+            self.cursor_paginator = self.cursor_pagination_class()
+            page = self.cursor_paginator.paginate_queryset(queryset, request, view)
+            self.display_page_controls = self.cursor_paginator.display_page_controls
+            return page
+
+        self.cursor_paginator = None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def to_html(self):
+        if self.cursor_paginator:
+            return self.cursor_paginator.to_html()
+        return super().to_html()
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            {
+                'name': self.mode_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Set to "cursor" for keyset pagination (no count, follow the next link).',
+                'schema': {'type': 'string', 'enum': ['cursor']},
+            },
+        ] + self.cursor_pagination_class().get_schema_operation_parameters(view)
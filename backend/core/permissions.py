@@ -1,6 +1,9 @@
 
 from rest_framework import permissions
 
+# Foreign keys to the owning user, first one the object has wins
+OWNER_FIELDS = ('owner', 'reporter', 'user', 'donor')
+
 
 class IsOwnerOrAdmin(permissions.BasePermission):
     #Permission to only allow owners of an object or admins to edit/delete it.
@@ -15,15 +18,10 @@ class IsOwnerOrAdmin(permissions.BasePermission):
             return True
         
         # Check if user is the owner
-        # Handle different owner field names
-        if hasattr(obj, 'owner'):
-            return obj.owner == request.user
-        elif hasattr(obj, 'reporter'):
-            return obj.reporter == request.user
-        elif hasattr(obj, 'user'):
-            return obj.user == request.user
-        elif hasattr(obj, 'donor'):
-            return obj.donor == request.user
+        # Handle different owner field names, comparing the foreign key id so the related row is never fetched
+        for field in OWNER_FIELDS:
+            if hasattr(obj, f'{field}_id'):
+                return getattr(obj, f'{field}_id') == request.user.pk
         
         return False
 
@@ -0,0 +1,220 @@
+"""
+Opt-in per-request profiling
+
+ProfilingMiddleware profiles a request when it carries an `X-Profile`
+header equal to PROFILING_TOKEN (any value while DEBUG if no token is set),
+or at random for a PROFILING_SAMPLE_RATE fraction of requests. Every
+profiled request logs one JSON line on the 'core.profiling' logger; a
+requested one also gets a Server-Timing header, which browser dev tools
+show next to the request (sampled requests may be anyone's, so their
+timings stay in the logs):
+
+    db         SQL time and query count (every connection), plus duplicates:
+               identical SQL and params run more than once, and the
+               statements repeated most often with different params (N+1)
+    filter     DjangoFilterBackend and other filter backends
+    search     SearchFilter backends (FullTextSearchFilter)
+    ordering   OrderingFilter backends (DistanceOrderingFilter)
+    serialize  to_representation() of the project's model serializers
+    email      rendering and queueing notification emails
+    view       the rest of the DRF view: dispatch minus the sections above
+    total      the whole request as seen by the outermost middleware
+
+db overlaps the other sections: a query counts towards whichever section
+ran it, e.g. a lazy queryset is evaluated during serialize.
+
+The view and filter timings come from ProfiledViewMixin, which
+profile_views() puts in front of every DRF view under root/api_urls.py
+when the URLconf is loaded, and the serialize timing from the
+core.serializers.ModelSerializer base; when no request is being profiled
+they only check a context variable.
+"""
+import json
+import logging
+import random
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.urls import URLResolver
+from rest_framework.filters import OrderingFilter, SearchFilter
+
+logger = logging.getLogger(__name__)
+
+HEADER = 'HTTP_X_PROFILE'
+SECTIONS = ('db', 'filter', 'search', 'ordering', 'serialize', 'email', 'view', 'total')
+# Sections subtracted from the view's own time
+VIEW_CHILDREN = ('filter', 'search', 'ordering', 'serialize', 'email')
+
+current_profile = ContextVar('current_profile', default=None)
+
+
+class Profile:
+
+    def __init__(self):
+        self.durations = defaultdict(float)
+        self.active = set()
+        self.queries = []
+
+    @contextmanager
+    def section(self, name):
+        # Re-entering a running section (a serializer serializing another) is already timed
+        if name in self.active:
+            yield
+            return
+        self.active.add(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[name] += time.perf_counter() - started
+            self.active.discard(name)
+
+    def record_query(self, execute, sql, params, many, context):
+        #connection.execute_wrapper hook
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, repr(params), time.perf_counter() - started))
+
+    def timings(self):
+        """{section: milliseconds} of the sections that ran"""
+        durations = dict(self.durations)
+        durations['db'] = sum(duration for _, _, duration in self.queries)
+        if 'view' in durations:
+            durations['view'] -= sum(durations.get(name, 0) for name in VIEW_CHILDREN)
+        return {name: round(durations[name] * 1000, 3) for name in SECTIONS if name in durations}
+
+    def query_stats(self):
+        statements = Counter(sql for sql, _, _ in self.queries)
+        executions = Counter((sql, params) for sql, params, _ in self.queries)
+        return {
+            'count': len(self.queries),
+            'duplicates': len(self.queries) - len(executions),
+            'repeated': [
+                {'sql': sql, 'count': count}
+                for sql, count in statements.most_common(3) if count > 1
+            ],
+        }
+
+    def server_timing(self):
+        timings = self.timings()
+        metrics = []
+        for name, duration in timings.items():
+            metric = f'{name};dur={duration}'
+            if name == 'db':
+                metric += f';desc="{len(self.queries)} queries"'
+            metrics.append(metric)
+        return ', '.join(metrics)
+
+
+@contextmanager
+def section(name):
+    """Time a block as `name` when the current request is profiled"""
+    profile = current_profile.get()
+    if profile is None:
+        yield
+    else:
+        with profile.section(name):
+            yield
+
+
+def filter_section(backend):
+    if issubclass(backend, SearchFilter):
+        return 'search'
+    if issubclass(backend, OrderingFilter):
+        return 'ordering'
+    return 'filter'
+
+
+class ProfiledViewMixin:
+    #Time the view and each of its filter backends, added to every view by profile_views()
+    #(a comment: getdoc() would give this docstring to the views' schema descriptions)
+
+    def dispatch(self, request, *args, **kwargs):
+        with section('view'):
+            return super().dispatch(request, *args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        if current_profile.get() is None:
+            return super().filter_queryset(queryset)
+        # Same loop as GenericAPIView.filter_queryset, one section per backend
+        for backend in list(self.filter_backends):
+            with section(filter_section(backend)):
+                queryset = backend().filter_queryset(self.request, queryset, self)
+        return queryset
+
+
+def profiled_view(callback):
+    """`callback` rebuilt on a subclass of its DRF view with ProfiledViewMixin first"""
+    cls = getattr(callback, 'cls', None)
+    if cls is None or issubclass(cls, ProfiledViewMixin):
+        return callback
+    # Same name and docstring, the schema and browsable API describe the original view
+    profiled = type(cls.__name__, (ProfiledViewMixin, cls), {
+        '__module__': cls.__module__,
+        '__qualname__': cls.__qualname__,
+        '__doc__': cls.__doc__,
+    })
+    if getattr(callback, 'actions', None) is not None:
+        return profiled.as_view(callback.actions, **callback.initkwargs)
+    return profiled.as_view(**callback.initkwargs)
+
+
+def profile_views(urlpatterns):
+    """Profile every DRF view in `urlpatterns`, including the included URLconfs"""
+    for pattern in urlpatterns:
+        if isinstance(pattern, URLResolver):
+            profile_views(pattern.url_patterns)
+        else:
+            pattern.callback = profiled_view(pattern.callback)
+    return urlpatterns
+
+
+def profile_requested(request):
+    token = getattr(settings, 'PROFILING_TOKEN', '')
+    header = request.META.get(HEADER)
+    return bool(header) and (header == token if token else settings.DEBUG)
+
+
+def sampled():
+    return random.random() < getattr(settings, 'PROFILING_SAMPLE_RATE', 0)
+
+
+class ProfilingMiddleware:
+    """Profile requested and sampled requests, see the module docstring"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        requested = profile_requested(request)
+        if not requested and not sampled():
+            return self.get_response(request)
+
+        profile = Profile()
+        token = current_profile.set(profile)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(profile.record_query))
+                with profile.section('total'):
+                    response = self.get_response(request)
+        finally:
+            current_profile.reset(token)
+
+        if requested:
+            response['Server-Timing'] = profile.server_timing()
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'sampled': not requested,
+            'timings_ms': profile.timings(),
+            'queries': profile.query_stats(),
+        }))
+        return response
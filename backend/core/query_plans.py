@@ -0,0 +1,24 @@
+"""
+EXPLAIN QUERY PLAN helpers (SQLite) for checking that queries use an index
+
+A step reading a table without an index ("SCAN pets") or sorting in a
+temporary b-tree ("USE TEMP B-TREE FOR ORDER BY") is what a missing or
+mismatched index looks like in SQLite's plans.
+"""
+from django.db import connections
+
+
+def explain(sql, using='default'):
+    """The detail column of each plan step"""
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def unindexed_steps(sql, table, using='default'):
+    #Full scans of `table` and sorts, [] when every step uses an index
+    return [
+        step for step in explain(sql, using)
+        if (step.startswith('SCAN') and step.split()[1] == table and 'INDEX' not in step)
+        or 'TEMP B-TREE' in step
+    ]
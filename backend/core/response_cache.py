@@ -0,0 +1,180 @@
+"""
+Response cache for the public list/retrieve endpoints
+
+Serialized response data is stored in Django's cache (settings.CACHES)
+under keys built from the request scheme, host and path (the data holds
+absolute image and pagination URLs) and the query params the view
+actually understands, so junk params can't bust the cache.
+
+Invalidation is generation based, which works on any cache backend:
+- every namespace (e.g. 'pets') has a list generation and a global
+  generation, every object has its own generation
+- list keys embed the list generation, detail keys embed the global and
+  object generations
+- invalidate_cached_responses(namespace, pk) bumps the list generation and
+  that object's generation; without a pk it bumps everything in the namespace.
+  The bump waits for the write's transaction to commit: bumped earlier, a
+  concurrent miss would still read the old rows and cache them under the
+  new generation until the next write
+Old entries are never read again and expire with RESPONSE_CACHE_TIMEOUT.
+
+Generations are invalidation timestamps: a miss less than
+REPLICA_LAG_SECONDS after one is rebuilt from the primary database, so a
+lagging read replica can't cache the old data for everyone.
+"""
+import hashlib
+import time
+from functools import partial
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .db_router import primary_reads
+
+KEY_PREFIX = 'response'
+STATS_KEYS = {
+    'hits': f'{KEY_PREFIX}:stats:hits',
+    'misses': f'{KEY_PREFIX}:stats:misses',
+}
+
+
+def get_cache():
+    return caches[getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')]
+
+
+def generation_key(namespace, scope):
+    return f'{KEY_PREFIX}:{namespace}:gen:{scope}'
+
+
+def get_generations(namespace, *scopes):
+    """Current generation for each scope, initializing missing ones"""
+    cache = get_cache()
+    keys = [generation_key(namespace, scope) for scope in scopes]
+    found = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, None)
+        found.update(missing)
+    return [found[key] for key in keys]
+
+
+def invalidate_cached_responses(namespace, pk=None):
+    """
+    Invalidate list pages of a namespace and one object's detail (or every
+    detail) once the current transaction commits, so a concurrent miss can't
+    cache the pre-commit rows under the new generation.
+    """
+    scopes = ['list', f'object:{pk}'] if pk is not None else ['list', 'all']
+    transaction.on_commit(partial(bump_generations, namespace, scopes))
+
+
+def bump_generations(namespace, scopes):
+    generation = time.time_ns()
+    get_cache().set_many({generation_key(namespace, scope): generation for scope in scopes}, None)
+
+
+def recently_invalidated(generations):
+    lag_ns = getattr(settings, 'REPLICA_LAG_SECONDS', 10) * 1_000_000_000
+    return time.time_ns() - max(generations) < lag_ns
+
+
+def record(stat):
+    cache = get_cache()
+    key = STATS_KEYS[stat]
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key)
+
+
+def get_cache_stats():
+    values = get_cache().get_many(list(STATS_KEYS.values()))
+    stats = {stat: values.get(key, 0) for stat, key in STATS_KEYS.items()}
+    total = stats['hits'] + stats['misses']
+    stats['hit_ratio'] = round(stats['hits'] / total, 4) if total else None
+    return stats
+
+
+class CachedResponseMixin:
+    """
+    Cache list/retrieve responses of a viewset
+
+    Set `cache_namespace` and call invalidate_cached_responses(namespace, pk)
+    from post_save/post_delete of every model the responses depend on.
+    Responses carry an ETag (and X-Cache: HIT/MISS); a matching
+    If-None-Match gets a 304.
+    """
+
+    cache_namespace = None
+
+    def list(self, request, *args, **kwargs):
+        generations = get_generations(self.cache_namespace, 'list')
+        return self.cached_response(generations, super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        pk = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        generations = get_generations(self.cache_namespace, 'all', f'object:{pk}')
+        return self.cached_response(generations, super().retrieve, request, *args, **kwargs)
+
+    def cached_response(self, generations, handler, request, *args, **kwargs):
+        cache = get_cache()
+        key = self.get_response_cache_key(request, generations)
+        entry = cache.get(key)
+
+        if entry is None:
+            record('misses')
+            if recently_invalidated(generations):
+                with primary_reads():
+                    response = handler(request, *args, **kwargs)
+            else:
+                response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            etag = quote_etag(hashlib.md5(JSONRenderer().render(response.data)).hexdigest())
+            cache.set(key, (response.data, etag), getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300))
+            response['X-Cache'] = 'MISS'
+        else:
+            record('hits')
+            data, etag = entry
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+
+        if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        response['ETag'] = etag
+        return response
+
+    def get_response_cache_key(self, request, generations):
+        allowed = self.get_cache_query_params()
+        params = sorted(
+            (name, value)
+            for name, values in request.query_params.lists()
+            if name in allowed
+            for value in values
+            if value != ''
+        )
+        fingerprint = hashlib.md5(
+            f'{request.scheme}://{request.get_host()}|{request.path}|{urlencode(params)}'.encode()
+        ).hexdigest()
+        generation = '.'.join(str(value) for value in generations)
+        return f'{KEY_PREFIX}:{self.cache_namespace}:{self.action}:{generation}:{fingerprint}'
+
+    def get_cache_query_params(self):
+        #Query params that can change the response: filters, search, ordering, pagination
+        cls = type(self)
+        if '_cache_query_params' not in cls.__dict__:
+            names = {api_settings.URL_FORMAT_OVERRIDE}
+            for backend in self.filter_backends:
+                names.update(param['name'] for param in backend().get_schema_operation_parameters(self))
+            if self.paginator is not None:
+                names.update(param['name'] for param in self.paginator.get_schema_operation_parameters(self))
+            cls._cache_query_params = frozenset(names)
+        return cls._cache_query_params
@@ -1,11 +1,20 @@
-
 #Core serializers with reusable base classes
 
 from rest_framework import serializers
+from core.profiling import section
+
+
+class ModelSerializer(serializers.ModelSerializer):
+    #Base for the project's model serializers, times serialization for request profiling (core/profiling.py)
+    
+    def to_representation(self, instance):
+        #A ListSerializer calls its child once per item, nested serializers run inside their parent's section
+        with section('serialize'):
+            return super().to_representation(instance)
 
 
-class TimestampedSerializer(serializers.ModelSerializer):
+class TimestampedSerializer(ModelSerializer):
     #Base serializer with timestamp fields
     
     created_at = serializers.DateTimeField(read_only=True)
-    updated_at = serializers.DateTimeField(read_only=True)
\ No newline at end of file
+    updated_at = serializers.DateTimeField(read_only=True)
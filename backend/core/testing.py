@@ -0,0 +1,56 @@
+"""
+Model factories shared by the app test suites.
+
+Each fills the required fields with the same plain defaults the tests used
+to spell out; keyword arguments override them, so a test only names the
+fields it is about.
+"""
+from django.utils import timezone
+
+from adopt.models import Pet
+from missing_pets.models import MissingPet
+from users.models import User
+
+PASSWORD = 'pass12345'
+
+
+def make_user(email='owner@example.com', **fields):
+    values = {'password': PASSWORD, 'full_name': 'Pet Owner', 'is_active': True, **fields}
+    return User.objects.create_user(email=email, **values)
+
+
+def pet_values(owner, **fields):
+    #Field values of make_pet(), for Pet(...) rows passed to bulk_create
+    return {
+        'owner': owner,
+        'name': 'Buddy',
+        'category': 'DOG',
+        'age': 12,
+        'gender': 'MALE',
+        'size': 'MEDIUM',
+        'description': 'Friendly',
+        'location': 'Kathmandu',
+        'contact_phone': '9800000000',
+        'contact_email': owner.email,
+        **fields,
+    }
+
+
+def make_pet(owner, **fields):
+    return Pet.objects.create(**pet_values(owner, **fields))
+
+
+def make_missing_pet(reporter, **fields):
+    values = {
+        'reporter': reporter,
+        'name': 'Kitty',
+        'category': 'CAT',
+        'gender': 'FEMALE',
+        'description': 'White paws',
+        'last_seen_location': 'Pokhara',
+        'last_seen_date': timezone.now().date(),
+        'contact_phone': '9800000000',
+        'contact_email': reporter.email,
+        **fields,
+    }
+    return MissingPet.objects.create(**values)
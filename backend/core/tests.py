@@ -0,0 +1,244 @@
+import json
+import time
+from unittest.mock import patch
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.urls import URLResolver, get_resolver
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from adopt.models import Pet
+from users.models import User
+from .authentication import user_cache_key
+from .db_router import PIN_COOKIE, ReplicaRouter, replica_reads
+from .profiling import Profile, ProfiledViewMixin
+from .serializers import ModelSerializer
+from .testing import make_pet, make_user
+
+
+class CachedAuthenticationTests(APITestCase):
+    """Authenticated writes resolve the user and ownership without user queries"""
+
+    def setUp(self):
+        cache.clear()
+        self.owner = make_user(terms_accepted=True)
+        self.pet = make_pet(self.owner)
+
+    def authenticate(self, user):
+        token = RefreshToken.for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def user_queries(self, method, url, data=None):
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(self.client, method)(url, data, format='json')
+        self.assertLess(response.status_code, 400, response.data)
+        return [query['sql'] for query in context.captured_queries if 'FROM "users"' in query['sql']]
+
+    def test_writes_do_no_user_queries_once_cached(self):
+        self.authenticate(self.owner)
+        self.assertEqual(len(self.user_queries('patch', f'/api/v1/pets/{self.pet.id}/', {'name': 'Rocky'})), 1)
+
+        self.assertEqual(self.user_queries('patch', f'/api/v1/pets/{self.pet.id}/', {'name': 'Max'}), [])
+        self.assertEqual(self.user_queries('post', f'/api/v1/pets/{self.pet.id}/mark_adopted/'), [])
+
+    def test_password_hash_is_not_cached(self):
+        self.authenticate(self.owner)
+        self.client.patch(f'/api/v1/pets/{self.pet.id}/', {'name': 'Rocky'}, format='json')
+        entry = cache.get(user_cache_key(self.owner.pk))
+        self.assertEqual(entry['email'], self.owner.email)
+        self.assertNotIn('password', entry)
+        self.assertNotIn(self.owner.password, entry.values())
+
+    def test_saving_the_user_invalidates_the_cache(self):
+        self.authenticate(self.owner)
+        self.client.patch(f'/api/v1/pets/{self.pet.id}/', {'name': 'Rocky'}, format='json')
+
+        # A stale cached user would pass the terms check and fail validation instead
+        self.owner.terms_accepted = False
+        self.owner.save()
+        response = self.client.post('/api/v1/pets/', {}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+        self.owner.is_active = False
+        self.owner.save()
+        response = self.client.patch(f'/api/v1/pets/{self.pet.id}/', {'name': 'Max'}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+    def test_other_users_are_not_owners(self):
+        other = make_user('other@example.com', full_name='Someone Else', terms_accepted=True)
+        self.authenticate(other)
+        response = self.client.patch(f'/api/v1/pets/{self.pet.id}/', {'name': 'Mine'}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+
+@override_settings(DATABASE_REPLICAS=['default'], REPLICA_LAG_SECONDS=0)
+class ReplicaRoutingTests(APITestCase):
+    """Public list/retrieve reads go to a replica, writes and the writer's next reads to the primary"""
+
+    def setUp(self):
+        cache.clear()
+        self.owner = make_user()
+        self.pet = make_pet(self.owner)
+        # The test database stands in for the replica, record when the router picks it
+        patcher = patch('core.db_router.choose_replica', return_value='default')
+        self.choose_replica = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_list_and_retrieve_read_from_a_replica(self):
+        self.client.get('/api/v1/pets/')
+        self.assertTrue(self.choose_replica.called)
+        self.choose_replica.reset_mock()
+        self.client.get(f'/api/v1/pets/{self.pet.id}/')
+        self.assertTrue(self.choose_replica.called)
+
+    def test_writes_pin_the_client_to_the_primary(self):
+        self.client.force_authenticate(self.owner)
+        response = self.client.patch(f'/api/v1/pets/{self.pet.id}/', {'name': 'Rocky'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(PIN_COOKIE, response.cookies)
+        self.assertFalse(self.choose_replica.called)
+
+        response = self.client.get(f'/api/v1/pets/{self.pet.id}/')
+        self.assertEqual(response.data['name'], 'Rocky')
+        self.assertFalse(self.choose_replica.called)
+
+    def test_authenticated_writer_is_pinned_without_the_cookie(self):
+        self.client.force_authenticate(self.owner)
+        self.client.patch(f'/api/v1/pets/{self.pet.id}/', {'name': 'Rocky'}, format='json')
+        self.client.cookies.clear()
+        self.client.get('/api/v1/pets/')
+        self.assertFalse(self.choose_replica.called)
+
+        # Another query string, the first list response is cached
+        self.client.force_authenticate(None)
+        self.client.get('/api/v1/pets/?category=DOG')
+        self.assertTrue(self.choose_replica.called)
+
+    @override_settings(REPLICA_LAG_SECONDS=60)
+    def test_cache_refills_after_an_invalidation_read_the_primary(self):
+        # Another client's write, this client isn't pinned to the primary
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pet.name = 'Rocky'
+            self.pet.save()
+
+        response = self.client.get(f'/api/v1/pets/{self.pet.id}/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['name'], 'Rocky')
+        self.assertFalse(self.choose_replica.called)
+
+        # Once the replicas have caught up, misses use them again
+        with patch('core.response_cache.time.time_ns', return_value=time.time_ns() + 120 * 10**9):
+            self.client.get('/api/v1/pets/?category=DOG')
+        self.assertTrue(self.choose_replica.called)
+
+    def test_only_replica_apps_are_routed(self):
+        router = ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Pet))
+        token = replica_reads.set(True)
+        try:
+            self.assertEqual(router.db_for_read(Pet), 'default')
+            self.assertIsNone(router.db_for_read(User))
+        finally:
+            replica_reads.reset(token)
+        self.assertEqual(router.db_for_write(Pet), 'default')
+
+
+@override_settings(DEBUG=True, PROFILING_SAMPLE_RATE=0, PROFILING_TOKEN='')
+class ProfilingTests(APITestCase):
+    """X-Profile and sampled requests get a Server-Timing header and a JSON log line"""
+
+    def setUp(self):
+        cache.clear()
+        self.owner = make_user()
+        make_pet(self.owner)
+
+    def profiled_get(self, url, **headers):
+        with self.assertLogs('core.profiling', 'INFO') as logs:
+            response = self.client.get(url, **headers)
+        return response, json.loads(logs.records[-1].getMessage())
+
+    def test_requested_profile_breaks_the_request_down(self):
+        response, entry = self.profiled_get('/api/v1/pets/?search=buddy', HTTP_X_PROFILE='1')
+        self.assertEqual(response.status_code, 200)
+        metrics = [metric.split(';')[0] for metric in response['Server-Timing'].split(', ')]
+        for name in ('db', 'filter', 'search', 'ordering', 'serialize', 'view', 'total'):
+            self.assertIn(name, metrics)
+        self.assertIn('queries"', response['Server-Timing'])
+
+        self.assertEqual(entry['path'], '/api/v1/pets/')
+        self.assertEqual(entry['status'], 200)
+        self.assertFalse(entry['sampled'])
+        self.assertGreater(entry['queries']['count'], 0)
+        self.assertLessEqual(entry['timings_ms']['serialize'], entry['timings_ms']['total'])
+
+    def test_unprofiled_requests_have_no_header(self):
+        response = self.client.get('/api/v1/pets/')
+        self.assertNotIn('Server-Timing', response)
+
+    @override_settings(DEBUG=False, PROFILING_TOKEN='secret')
+    def test_header_must_match_the_token(self):
+        self.assertNotIn('Server-Timing', self.client.get('/api/v1/pets/', HTTP_X_PROFILE='guess'))
+        response, _ = self.profiled_get('/api/v1/pets/', HTTP_X_PROFILE='secret')
+        self.assertIn('Server-Timing', response)
+
+    @override_settings(DEBUG=False)
+    def test_header_is_ignored_without_a_token_outside_debug(self):
+        self.assertNotIn('Server-Timing', self.client.get('/api/v1/pets/', HTTP_X_PROFILE='1'))
+
+    @override_settings(PROFILING_SAMPLE_RATE=1)
+    def test_sampled_requests_are_only_logged(self):
+        response, entry = self.profiled_get('/api/v1/pets/')
+        self.assertNotIn('Server-Timing', response)
+        self.assertTrue(entry['sampled'])
+        self.assertIn('serialize', entry['timings_ms'])
+
+    def test_email_time(self):
+        with self.assertLogs('core.profiling', 'INFO'):
+            response = self.client.post('/api/v1/auth/forgot-password/', {'email': self.owner.email}, HTTP_X_PROFILE='1')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('email;dur=', response['Server-Timing'])
+
+    def test_every_api_view_and_serializer_is_profiled(self):
+        def callbacks(patterns):
+            for pattern in patterns:
+                if isinstance(pattern, URLResolver):
+                    yield from callbacks(pattern.url_patterns)
+                else:
+                    yield pattern.callback
+
+        def subclasses(cls):
+            for subclass in cls.__subclasses__():
+                yield subclass
+                yield from subclasses(subclass)
+
+        views = [callback.cls for callback in callbacks(get_resolver('root.api_urls').url_patterns)]
+        self.assertTrue(views)
+        for view in views:
+            self.assertTrue(issubclass(view, ProfiledViewMixin), view)
+
+        # Serializer modules are loaded by the URLconf above
+        project = {app.name for app in apps.get_app_configs() if app.path.startswith(str(settings.BASE_DIR))}
+        model_serializers = [
+            cls for cls in subclasses(serializers.ModelSerializer)
+            if cls.__module__.split('.')[0] in project and not cls.__module__.endswith('tests')
+        ]
+        self.assertTrue(model_serializers)
+        for cls in model_serializers:
+            self.assertTrue(issubclass(cls, ModelSerializer), cls)
+
+    def test_duplicate_queries(self):
+        profile = Profile()
+        execute = lambda sql, params, many, context: None
+        for params in [(1,), (1,), (2,)]:
+            profile.record_query(execute, 'SELECT 1 WHERE id = %s', params, False, {})
+        profile.record_query(execute, 'SELECT 2', (), False, {})
+        stats = profile.query_stats()
+        self.assertEqual(stats['count'], 4)
+        self.assertEqual(stats['duplicates'], 1)
+        self.assertEqual(stats['repeated'], [{'sql': 'SELECT 1 WHERE id = %s', 'count': 3}])
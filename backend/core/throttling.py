@@ -0,0 +1,132 @@
+"""
+Token bucket rate limits for public write endpoints
+
+Registration, password reset emails, feedback and donations each write
+rows and send mail, so they are limited per client IP and per submitted
+email address. RATE_LIMITS maps a scope to its limits, e.g.
+{'forgot_password': {'ip': '10/hour', 'email': '3/hour'}}; a ViewSet with
+RateLimitMixin names the scope of each action in `rate_limit_scopes`.
+
+Each (scope, kind, value) key is one bucket of `count` tokens refilled
+continuously at count/period, so the window slides instead of resetting
+on the hour and bursts up to `count` are allowed. A bucket is one
+(tokens, timestamp) pair in Django's cache (settings.CACHES, RATE_LIMIT_CACHE_ALIAS):
+local memory in development, Redis when REDIS_URL is set; O(1) per key,
+expiring once it would be full again. A request reads all its buckets in
+one get_many and writes them in one set_many; concurrent requests on the
+same key can race past the limit by a request or two, which is fine for
+abuse protection.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+KEY_PREFIX = 'ratelimit'
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def get_cache():
+    return caches[getattr(settings, 'RATE_LIMIT_CACHE_ALIAS', 'default')]
+
+
+def get_client_ip(request):
+    """
+    Client address: REMOTE_ADDR, or with NUM_PROXIES trusted proxies in front
+    the X-Forwarded-For entry that many hops from the right (entries further
+    left are client supplied and can't be trusted)
+    """
+    num_proxies = getattr(settings, 'NUM_PROXIES', 0)
+    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if num_proxies and x_forwarded_for:
+        addresses = [address.strip() for address in x_forwarded_for.split(',')]
+        return addresses[-min(num_proxies, len(addresses))]
+    return request.META.get('REMOTE_ADDR')
+
+
+def get_email(request):
+    if request.user and request.user.is_authenticated:
+        return request.user.email.lower()
+    try:
+        email = request.data.get('email')
+    except AttributeError:
+        return None
+    return email.strip().lower() if isinstance(email, str) and email.strip() else None
+
+
+# Limit kind -> function returning the value to limit by, or None to skip
+IDENTIFIERS = {
+    'ip': get_client_ip,
+    'email': get_email,
+}
+
+
+def parse_rate(rate):
+    """'10/hour' -> (10, 3600)"""
+    count, period = rate.split('/')
+    return int(count), PERIODS[period.strip()[0]]
+
+
+def bucket_key(scope, kind, value):
+    digest = hashlib.sha1(value.encode()).hexdigest()[:20]
+    return f'{KEY_PREFIX}:{scope}:{kind}:{digest}'
+
+
+class BucketThrottle(BaseThrottle):
+    """DRF throttle consuming one token from every bucket of a scope"""
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.wait_seconds = None
+
+    def get_buckets(self, request):
+        #{cache key: (count, period)} for the limits that apply to this request
+        limits = getattr(settings, 'RATE_LIMITS', {}).get(self.scope, {})
+        buckets = {}
+        for kind, rate in limits.items():
+            value = IDENTIFIERS[kind](request)
+            if value:
+                buckets[bucket_key(self.scope, kind, value)] = parse_rate(rate)
+        return buckets
+
+    def allow_request(self, request, view):
+        buckets = self.get_buckets(request)
+        if not buckets:
+            return True
+
+        cache = get_cache()
+        now = time.time()
+        stored = cache.get_many(list(buckets))
+        levels = {}
+        for key, (count, period) in buckets.items():
+            tokens, updated_at = stored.get(key, (count, now))
+            levels[key] = min(count, tokens + (now - updated_at) * count / period)
+
+        # Every bucket must have a token, none is spent otherwise
+        empty = [key for key, tokens in levels.items() if tokens < 1]
+        if empty:
+            self.wait_seconds = max((1 - levels[key]) * buckets[key][1] / buckets[key][0] for key in empty)
+            return False
+
+        # Kept until the slowest bucket would be full again
+        timeout = int(max(period for _, period in buckets.values())) + 1
+        cache.set_many({key: (tokens - 1, now) for key, tokens in levels.items()}, timeout)
+        return True
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class RateLimitMixin:
+    """Throttle the actions listed in `rate_limit_scopes` ({action: RATE_LIMITS scope})"""
+
+    rate_limit_scopes = {}
+
+    def get_throttles(self):
+        throttles = super().get_throttles()
+        scope = self.rate_limit_scopes.get(self.action)
+        if scope:
+            throttles.append(BucketThrottle(scope))
+        return throttles
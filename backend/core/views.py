@@ -0,0 +1,19 @@
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from core.permissions import IsAdminUser
+from core.response_cache import get_cache_stats
+
+
+class CacheStatsView(APIView):
+    #Response cache hit/miss counters (admin only)
+
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(responses=OpenApiTypes.OBJECT)
+    def get(self, request):
+        return Response({
+            'success': True,
+            'data': get_cache_stats()
+        })
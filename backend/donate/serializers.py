@@ -1,9 +1,10 @@
 from rest_framework import serializers
+from core.serializers import ModelSerializer
 from .models import Donation
 from users.serializers import UserSerializer
 
 
-class DonationListSerializer(serializers.ModelSerializer):
+class DonationListSerializer(ModelSerializer):
     
     donor_display = serializers.SerializerMethodField()
     payment_method_display = serializers.CharField(source='get_payment_method_display', read_only=True)
@@ -24,7 +25,7 @@ class DonationListSerializer(serializers.ModelSerializer):
         return obj.get_donor_display_name()
 
 
-class DonationDetailSerializer(serializers.ModelSerializer):
+class DonationDetailSerializer(ModelSerializer):
     
     donor_display = serializers.SerializerMethodField()
     donor_info = UserSerializer(source='donor', read_only=True)
@@ -50,7 +51,7 @@ class DonationDetailSerializer(serializers.ModelSerializer):
         return obj.get_donor_display_name()
 
 
-class DonationCreateSerializer(serializers.ModelSerializer):
+class DonationCreateSerializer(ModelSerializer):
     
     class Meta:
         model = Donation
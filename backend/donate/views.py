@@ -7,11 +7,13 @@ from .serializers import (
     DonationListSerializer, DonationDetailSerializer, DonationCreateSerializer
 )
 from core.permissions import IsOwnerOrAdmin
+from core.throttling import RateLimitMixin
 from .utils import send_donation_confirmation_email
 
 
-class DonationViewSet(viewsets.ModelViewSet):
+class DonationViewSet(RateLimitMixin, viewsets.ModelViewSet):
     queryset = Donation.objects.all()
+    rate_limit_scopes = {'create': 'donation', 'initiate': 'donation'}
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['payment_status', 'payment_method', 'currency']
     ordering = ['-created_at']
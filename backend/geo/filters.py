@@ -0,0 +1,66 @@
+import django_filters
+from django import forms
+from rest_framework.filters import OrderingFilter
+from .spatial import filter_near
+
+DEFAULT_RADIUS_KM = 10
+MAX_RADIUS_KM = 500
+
+
+class PointField(forms.CharField):
+    """"lat,lon" -> (lat, lon)"""
+
+    def clean(self, value):
+        value = super().clean(value)
+        if not value:
+            return None
+        try:
+            latitude, longitude = (float(part) for part in value.split(','))
+        except ValueError:
+            raise forms.ValidationError('Use "latitude,longitude", e.g. 27.7172,85.3240.')
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise forms.ValidationError('Coordinates out of range.')
+        return latitude, longitude
+
+
+class PointFilter(django_filters.Filter):
+    field_class = PointField
+
+
+class NearbyFilterSet(django_filters.FilterSet):
+    """
+    Adds radius search over the geocoded latitude/longitude/geohash columns
+
+    - /api/v1/pets/?near=27.7172,85.3240                 (within 10 km)
+    - /api/v1/rescue/?near=27.7172,85.3240&radius_km=5&type=VETERINARIAN&emergency_service=true
+
+    Results are annotated with `distance_km` and come nearest first unless
+    ?ordering= is given.
+    """
+
+    near = PointFilter(method='filter_near', label='Near "latitude,longitude"')
+    radius_km = django_filters.NumberFilter(
+        method='filter_radius',
+        min_value=0,
+        max_value=MAX_RADIUS_KM,
+        label=f'Radius around `near` in km (default {DEFAULT_RADIUS_KM})'
+    )
+
+    def filter_near(self, queryset, name, value):
+        radius_km = self.form.cleaned_data.get('radius_km') or DEFAULT_RADIUS_KM
+        return filter_near(queryset, *value, float(radius_km))
+
+    def filter_radius(self, queryset, name, value):
+        # Applied by filter_near
+        return queryset
+
+
+class DistanceOrderingFilter(OrderingFilter):
+    """OrderingFilter that sorts nearest first when the queryset has a distance"""
+
+    distance_field = 'distance_km'
+
+    def get_ordering(self, request, queryset, view):
+        if not request.query_params.get(self.ordering_param) and self.distance_field in queryset.query.annotations:
+            return [self.distance_field, 'pk']
+        return super().get_ordering(request, queryset, view)
@@ -0,0 +1,67 @@
+"""
+Offline geocoder
+
+Resolves free-text locations ("Thamel, Kathmandu", "near Lakeside Pokhara")
+against the bundled gazetteer in geo/data/gazetteer.csv. No network calls;
+add rows there to cover more places, then run `python manage.py geocode_locations`.
+"""
+import csv
+import re
+from functools import lru_cache
+from pathlib import Path
+
+from .geohash import encode
+
+GAZETTEER_PATH = Path(__file__).resolve().parent / 'data' / 'gazetteer.csv'
+
+# Longest place name in the gazetteer, in words
+MAX_NAME_WORDS = 3
+
+WORD_RE = re.compile(r'[a-z0-9]+')
+
+
+def normalize(text):
+    return ' '.join(WORD_RE.findall(text.lower()))
+
+
+@lru_cache(maxsize=None)
+def load_gazetteer():
+    """{normalized name or alias: (latitude, longitude)}"""
+    places = {}
+    with open(GAZETTEER_PATH, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            point = (float(row['latitude']), float(row['longitude']))
+            names = [row['name'], *filter(None, row['aliases'].split('|'))]
+            for name in names:
+                places.setdefault(normalize(name), point)
+    return places
+
+
+@lru_cache(maxsize=4096)
+def geocode(text):
+    """
+    (latitude, longitude) for a free-text location, or None
+
+    Comma-separated parts are tried most specific (first) to least, and
+    within a part the longest matching run of words wins.
+    """
+    if not text:
+        return None
+    places = load_gazetteer()
+    for part in text.split(','):
+        words = normalize(part).split()
+        for size in range(min(len(words), MAX_NAME_WORDS), 0, -1):
+            for start in range(len(words) - size + 1):
+                point = places.get(' '.join(words[start:start + size]))
+                if point:
+                    return point
+    return None
+
+
+def locate(*texts):
+    """(latitude, longitude, geohash) from the first text that geocodes"""
+    for text in texts:
+        point = geocode(text)
+        if point:
+            return point[0], point[1], encode(*point)
+    return None, None, ''
@@ -0,0 +1,76 @@
+"""
+Geohash encoding
+
+A geohash interleaves longitude/latitude bits into base32, so nearby
+points share a prefix and a prefix is a rectangular cell. Storing the hash
+in an indexed column turns "points in this cell" into an index range scan.
+"""
+import math
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+# Stored precision, ~4.8m x 4.8m cells
+PRECISION = 9
+
+
+def encode(latitude, longitude, precision=PRECISION):
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            bounds, coordinate = lon_range, longitude
+        else:
+            bounds, coordinate = lat_range, latitude
+        middle = (bounds[0] + bounds[1]) / 2
+        if coordinate >= middle:
+            value = value * 2 + 1
+            bounds[0] = middle
+        else:
+            value = value * 2
+            bounds[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = 0
+            value = 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """(height, width) of a cell in degrees"""
+    bits = 5 * precision
+    lon_bits = math.ceil(bits / 2)
+    lat_bits = bits // 2
+    return 180 / 2 ** lat_bits, 360 / 2 ** lon_bits
+
+
+def covering_cells(latitude, longitude, lat_delta, lon_delta):
+    """
+    Geohash prefixes covering the box latitude ± lat_delta, longitude ± lon_delta
+
+    Picks the finest precision whose cells are at least as large as the box
+    half-size, so the cell containing the center plus its 8 neighbours cover
+    it. Returns None when the box is too large to be worth prefix filtering.
+    """
+    precision = 0
+    for candidate in range(1, PRECISION + 1):
+        height, width = cell_size(candidate)
+        if height < lat_delta or width < lon_delta:
+            break
+        precision = candidate
+    if precision == 0:
+        return None
+
+    height, width = cell_size(precision)
+    cells = set()
+    for row in (-1, 0, 1):
+        for column in (-1, 0, 1):
+            lat = min(max(latitude + row * height, -90.0), 90.0)
+            lon = (longitude + column * width + 180) % 360 - 180
+            cells.add(encode(lat, lon, precision))
+    return sorted(cells)
@@ -0,0 +1,48 @@
+from itertools import islice
+from django.core.management.base import BaseCommand
+from core.response_cache import invalidate_cached_responses
+from geo.gazetteer import locate
+from adopt.models import Pet
+from missing_pets.matching import queue_refresh
+from missing_pets.models import MissingPet
+from rescue.models import RescueContact
+
+# Model, location text fields (most specific first), response cache namespace, MatchRefresh kind
+GEOCODED_MODELS = (
+    (Pet, ('location',), 'pets', 'PET'),
+    (MissingPet, ('last_seen_location',), 'missing_pets', 'MISSING_PET'),
+    (RescueContact, ('address', 'city'), 'rescue', None),
+)
+
+
+class Command(BaseCommand):
+    help = 'Re-geocode pet, missing pet and rescue contact locations (e.g. after editing geo/data/gazetteer.csv)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+    
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        
+        for model, fields, namespace, match_kind in GEOCODED_MODELS:
+            located = total = 0
+            rows = model._default_manager.order_by('pk').only('pk', 'latitude', 'longitude', *fields).iterator(chunk_size=batch_size)
+            while batch := list(islice(rows, batch_size)):
+                moved = []
+                for row in batch:
+                    point = row.latitude, row.longitude
+                    row.latitude, row.longitude, row.geohash = locate(*(getattr(row, field) for field in fields))
+                    located += bool(row.geohash)
+                    if (row.latitude, row.longitude) != point:
+                        moved.append(row.pk)
+                model._default_manager.bulk_update(batch, ['latitude', 'longitude', 'geohash'])
+                # Location is scored, rows that moved get their suggested matches redone
+                if match_kind and moved:
+                    queue_refresh(match_kind, moved)
+                total += len(batch)
+            
+            # bulk_update doesn't send post_save
+            invalidate_cached_responses(namespace)
+            self.stdout.write(self.style.SUCCESS(
+                f'Located {located} of {total} {model._meta.verbose_name_plural}'
+            ))
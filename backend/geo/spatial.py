@@ -0,0 +1,61 @@
+"""
+Radius queries over (latitude, longitude, geohash) columns
+
+filter_near() narrows with geohash prefix ranges (index range scans on the
+geohash column) and a lat/lon bounding box, then computes the haversine
+distance only for those candidates.
+"""
+import math
+
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+
+from .geohash import covering_cells
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+# Sorts after every base32 geohash character, so [prefix, prefix + END) is the prefix range
+PREFIX_END = '~'
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def distance_expression(latitude, longitude, lat_field='latitude', lon_field='longitude'):
+    """Haversine distance in km from a point to the row's coordinates"""
+    lat = math.radians(latitude)
+    lon = math.radians(longitude)
+    half_dlat = (Radians(F(lat_field)) - Value(lat)) / Value(2.0)
+    half_dlon = (Radians(F(lon_field)) - Value(lon)) / Value(2.0)
+    a = (
+        Power(Sin(half_dlat), 2)
+        + Value(math.cos(lat)) * Cos(Radians(F(lat_field))) * Power(Sin(half_dlon), 2)
+    )
+    return Value(2 * EARTH_RADIUS_KM) * ASin(Sqrt(a), output_field=FloatField())
+
+
+def filter_near(queryset, latitude, longitude, radius_km, annotation='distance_km'):
+    """Rows within radius_km of the point, annotated with their distance"""
+    lat_delta = radius_km / KM_PER_DEGREE
+    lon_delta = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01))
+
+    cells = covering_cells(latitude, longitude, lat_delta, lon_delta)
+    if cells:
+        condition = Q()
+        for cell in cells:
+            condition |= Q(geohash__gte=cell, geohash__lt=cell + PREFIX_END)
+        queryset = queryset.filter(condition)
+
+    queryset = queryset.filter(
+        latitude__range=(latitude - lat_delta, latitude + lat_delta),
+        longitude__range=(longitude - lon_delta, longitude + lon_delta),
+    )
+    return (
+        queryset
+        .annotate(**{annotation: distance_expression(latitude, longitude)})
+        .filter(**{f'{annotation}__lte': radius_km})
+    )
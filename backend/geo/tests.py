@@ -0,0 +1,125 @@
+import math
+import random
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase
+from rest_framework.test import APITestCase
+
+from rescue.models import RescueContact
+from .gazetteer import geocode
+from .geohash import covering_cells, encode
+from .spatial import KM_PER_DEGREE, filter_near, haversine_km
+
+
+class GeocoderTests(SimpleTestCase):
+
+    def test_most_specific_part_wins(self):
+        self.assertEqual(geocode('Thamel, Kathmandu'), (27.7154, 85.3123))
+        self.assertEqual(geocode('near Lakeside Pokhara'), (28.2090, 83.9590))
+
+    def test_aliases_and_noise(self):
+        self.assertEqual(geocode('PATAN'), geocode('Lalitpur'))
+        self.assertEqual(geocode('Kathmandu Metropolitan City, Nepal'), (27.7172, 85.3240))
+        self.assertIsNone(geocode('Somewhere else'))
+        self.assertIsNone(geocode(''))
+
+
+class GeohashTests(SimpleTestCase):
+
+    def test_encode(self):
+        # Reference value from the original geohash.org implementation
+        self.assertEqual(encode(57.64911, 10.40744, 11), 'u4pruydqqvj')
+
+    def test_covering_cells_contain_every_point_in_radius(self):
+        rng = random.Random(4)
+        for radius_km in (0.5, 5, 25, 150):
+            lat, lon = 27.7, 85.3
+            lat_delta = radius_km / KM_PER_DEGREE
+            lon_delta = radius_km / (KM_PER_DEGREE * math.cos(math.radians(lat)))
+            cells = covering_cells(lat, lon, lat_delta, lon_delta)
+            for _ in range(200):
+                point = (lat + rng.uniform(-lat_delta, lat_delta), lon + rng.uniform(-lon_delta, lon_delta))
+                self.assertTrue(any(encode(*point).startswith(cell) for cell in cells), (radius_km, point))
+
+
+class NearbyFilterTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.thamel = self.create_contact('Thamel Vet', 'Thamel, Kathmandu')
+        self.patan = self.create_contact('Patan Vet', 'Jawalakhel, Lalitpur')
+        self.pokhara = self.create_contact('Lakeside Vet', 'Lakeside', city='Pokhara')
+        self.create_contact('Nowhere Vet', 'Unknown street', city='Unknown')
+        self.create_contact('Thamel Shelter', 'Thamel', type='SHELTER')
+
+    def create_contact(self, name, address, city='Kathmandu', type='VETERINARIAN'):
+        return RescueContact.objects.create(
+            name=name,
+            type=type,
+            address=address,
+            city=city,
+            phone='9800000000',
+            email='vet@example.com',
+            emergency_service=True,
+        )
+
+    def test_contacts_are_geocoded_on_save(self):
+        self.assertEqual((self.thamel.latitude, self.thamel.longitude), (27.7154, 85.3123))
+        self.assertTrue(self.thamel.geohash.startswith(encode(27.7154, 85.3123, 6)))
+
+        self.thamel.address = 'Lakeside'
+        self.thamel.save(update_fields=['address'])
+        self.thamel.refresh_from_db()
+        self.assertEqual(self.thamel.latitude, self.pokhara.latitude)
+
+    def test_nearest_emergency_vet(self):
+        response = self.client.get('/api/v1/rescue/', {
+            'near': '27.7172,85.3240',
+            'radius_km': 10,
+            'type': 'VETERINARIAN',
+            'emergency_service': 'true',
+        })
+        self.assertEqual(response.status_code, 200)
+        results = response.data['results']
+        self.assertEqual([contact['name'] for contact in results], ['Thamel Vet', 'Patan Vet'])
+        self.assertAlmostEqual(
+            results[0]['distance_km'],
+            haversine_km(27.7172, 85.3240, 27.7154, 85.3123),
+            places=6
+        )
+
+        # Without ?near= there is no distance
+        response = self.client.get('/api/v1/rescue/')
+        self.assertNotIn('distance_km', response.data['results'][0])
+
+    def test_radius_and_explicit_ordering(self):
+        response = self.client.get('/api/v1/rescue/', {'near': '27.7172,85.3240', 'radius_km': 300, 'ordering': 'name'})
+        self.assertEqual(
+            [contact['name'] for contact in response.data['results']],
+            ['Lakeside Vet', 'Patan Vet', 'Thamel Shelter', 'Thamel Vet']
+        )
+
+    def test_invalid_point_is_400(self):
+        for near in ('27.7', 'a,b', '95,85'):
+            response = self.client.get('/api/v1/rescue/', {'near': near})
+            self.assertEqual(response.status_code, 400, near)
+
+    def test_radius_query_uses_geohash_index(self):
+        queryset = filter_near(RescueContact.objects.all(), 27.7172, 85.3240, 5)
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+        self.assertIn('geohash', plan)
+        self.assertNotIn('SCAN rescue_contacts', plan.replace('USING INDEX', ''))
+
+    def test_geocode_locations_command(self):
+        RescueContact.objects.update(latitude=None, longitude=None, geohash='')
+        out = StringIO()
+        call_command('geocode_locations', stdout=out)
+        self.assertIn('Located 4 of 5 Rescue Contacts', out.getvalue())
+        self.thamel.refresh_from_db()
+        self.assertEqual(self.thamel.latitude, 27.7154)
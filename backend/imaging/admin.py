@@ -0,0 +1,10 @@
+from django.contrib import admin
+from .models import Blob
+
+
+@admin.register(Blob)
+class BlobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'refcount', 'released_at', 'created_at')
+    list_filter = ('created_at',)
+    search_fields = ('name',)
+    readonly_fields = ('name', 'refcount', 'released_at', 'created_at')
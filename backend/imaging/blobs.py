@@ -0,0 +1,145 @@
+"""
+Reference counting for content-addressed media (imaging/storage.py)
+
+Blob.refcount is the number of (row, field) references to a file among the
+REFERENCES fields. post_save/post_delete keep it current (imaging/signals.py),
+code that skips signals (bulk_create) calls retain() itself, and
+`gc_media_blobs --recount` rebuilds every count from the tables.
+
+A file is garbage once its count is 0 and both the last release and the
+file's mtime are older than MEDIA_BLOB_GC_GRACE, so an upload whose row is
+still being inserted is never collected. Files with no Blob row at all
+(e.g. written by a request that then failed) are collected the same way.
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Blob
+from .storage import BLOB_PREFIX, is_blob
+
+# Model -> fields holding media names: file fields, or JSON with names as leaf values
+REFERENCES = {
+    'adopt.PetImage': ('image', 'variants'),
+    'missing_pets.MissingPetImage': ('image', 'variants'),
+    'users.User': ('profile_picture',),
+}
+
+
+def get_grace():
+    return timedelta(seconds=getattr(settings, 'MEDIA_BLOB_GC_GRACE', 3600))
+
+
+def iter_names(value):
+    if isinstance(value, dict):
+        for item in value.values():
+            yield from iter_names(item)
+    elif value:
+        name = getattr(value, 'name', value)
+        if isinstance(name, str) and is_blob(name):
+            yield name
+
+
+def referenced_names(instance, fields):
+    """Blob names referenced by the loaded (non-deferred) fields of a row"""
+    names = Counter()
+    for field_name in fields:
+        attname = instance._meta.get_field(field_name).attname
+        if attname in instance.__dict__:
+            names.update(iter_names(instance.__dict__[attname]))
+    return names
+
+
+def retain(names):
+    for name, count in sorted(Counter(names).items()):
+        if not is_blob(name):
+            continue
+        if Blob.objects.filter(name=name).update(refcount=F('refcount') + count):
+            continue
+        try:
+            with transaction.atomic():
+                Blob.objects.create(name=name, refcount=count)
+        except IntegrityError:
+            Blob.objects.filter(name=name).update(refcount=F('refcount') + count)
+
+
+def release(names):
+    now = timezone.now()
+    for name, count in sorted(Counter(names).items()):
+        if is_blob(name):
+            Blob.objects.filter(name=name).update(refcount=F('refcount') - count, released_at=now)
+
+
+def count_references():
+    counts = Counter()
+    for label, fields in REFERENCES.items():
+        model = apps.get_model(label)
+        for row in model.objects.values_list(*fields).iterator():
+            for value in row:
+                counts.update(iter_names(value))
+    return counts
+
+
+@transaction.atomic
+def recount():
+    """Rebuild every refcount from the tables; returns the number of rows fixed"""
+    counts = count_references()
+    now = timezone.now()
+    fixed = 0
+
+    for blob in Blob.objects.select_for_update().iterator():
+        refcount = counts.pop(blob.name, 0)
+        if blob.refcount != refcount:
+            Blob.objects.filter(pk=blob.pk).update(refcount=refcount, released_at=now)
+            fixed += 1
+
+    Blob.objects.bulk_create([Blob(name=name, refcount=refcount) for name, refcount in counts.items()])
+    return fixed + len(counts)
+
+
+def iter_blob_files(storage):
+    directories, _ = storage.listdir(BLOB_PREFIX) if storage.exists(BLOB_PREFIX) else ([], [])
+    for directory in directories:
+        for filename in storage.listdir(f'{BLOB_PREFIX}{directory}')[1]:
+            yield f'{BLOB_PREFIX}{directory}/{filename}'
+
+
+def collect_garbage(grace=None, dry_run=False, storage=None):
+    """Delete unreferenced blobs, returns (files, bytes)"""
+    storage = storage or default_storage
+    cutoff = timezone.now() - (get_grace() if grace is None else grace)
+
+    def is_stale(name):
+        return storage.exists(name) and storage.get_modified_time(name) < cutoff
+
+    deleted, freed = 0, 0
+
+    def delete(name):
+        nonlocal deleted, freed
+        size = storage.size(name)
+        if not dry_run:
+            storage.delete(name)
+        deleted += 1
+        freed += size
+
+    # Counted to zero
+    for name in Blob.objects.filter(refcount__lte=0, released_at__lt=cutoff).values_list('name', flat=True).iterator():
+        if not is_stale(name):
+            continue
+        if dry_run:
+            delete(name)
+        elif Blob.objects.filter(name=name, refcount__lte=0).delete()[0]:
+            delete(name)
+
+    # Never counted
+    for name in iter_blob_files(storage):
+        if not Blob.objects.filter(name=name).exists() and is_stale(name):
+            delete(name)
+
+    return deleted, freed
@@ -0,0 +1,22 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from imaging.blobs import collect_garbage, recount
+
+
+class Command(BaseCommand):
+    help = 'Delete media blobs that no pet image, missing pet image or profile picture references'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--recount', action='store_true', help='Rebuild reference counts from the tables first')
+        parser.add_argument('--grace', type=int, default=None, help='Seconds an unreferenced blob is kept (default MEDIA_BLOB_GC_GRACE)')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be deleted')
+    
+    def handle(self, *args, **options):
+        if options['recount']:
+            fixed = recount()
+            self.stdout.write(f'Fixed {fixed} reference count(s)')
+        
+        grace = timedelta(seconds=options['grace']) if options['grace'] is not None else None
+        deleted, freed = collect_garbage(grace, dry_run=options['dry_run'])
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {deleted} blob(s), {freed / (1024 * 1024):.1f}MB'))
@@ -0,0 +1,34 @@
+import time
+from django.core.management.base import BaseCommand
+from adopt.models import PetImage
+from missing_pets.models import MissingPetImage
+from imaging.pipeline import process_pending
+
+
+class Command(BaseCommand):
+    help = 'Strip EXIF from uploaded pet images and render their WebP/AVIF variants'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Process pending images and exit')
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--interval', type=float, default=5, help='Seconds to sleep when nothing is pending')
+        parser.add_argument('--reprocess', action='store_true', help='Queue every image again first (e.g. after changing IMAGE_VARIANT_WIDTHS)')
+    
+    def handle(self, *args, **options):
+        if options['reprocess']:
+            for model in (PetImage, MissingPetImage):
+                model.objects.update(processed_at=None)
+        
+        while True:
+            processed = failed = 0
+            for model in (PetImage, MissingPetImage):
+                done, errors = process_pending(model, options['batch_size'])
+                processed += done
+                failed += errors
+            if processed or failed:
+                self.stdout.write(f'Processed {processed}, failed {failed}')
+            
+            if not (processed or failed):
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
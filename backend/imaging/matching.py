@@ -0,0 +1,104 @@
+"""
+Photo matching between missing pet reports and other listings
+
+The variant worker fingerprints every pet and missing pet image
+(fingerprint_image). possible_matches() looks up the report's fingerprints
+in the band indexes (imaging/phash.py) and ranks active listings of the
+same category, pets and other missing reports, by the Hamming distance of
+their closest photo pair.
+"""
+from django.conf import settings
+from django.db.models import Q
+
+from .models import ImageFingerprint
+from .phash import BANDS, band_neighbours, hamming, phash, split_bands, to_signed, to_unsigned
+
+# Image model -> ImageFingerprint field pointing at it
+FINGERPRINT_FIELDS = {
+    'adopt.PetImage': 'pet_image',
+    'missing_pets.MissingPetImage': 'missing_pet_image',
+}
+
+
+def get_max_distance():
+    return getattr(settings, 'IMAGE_MATCH_MAX_DISTANCE', 10)
+
+
+def fingerprint_image(instance, image):
+    """Store the perceptual hash of a PetImage/MissingPetImage, `image` being its decoded PIL image"""
+    value = phash(image)
+    bands = {f'band_{index}': band for index, band in enumerate(split_bands(value))}
+    field = FINGERPRINT_FIELDS[instance._meta.label]
+    ImageFingerprint.objects.update_or_create(
+        **{field: instance},
+        defaults={'phash': to_signed(value), **bands}
+    )
+    return value
+
+
+def band_lookup(hashes, max_distance):
+    #Rows sharing a near-identical band with any of the hashes: a superset of the rows within max_distance
+    radius = max_distance // BANDS
+    values = [set() for _ in range(BANDS)]
+    for value in hashes:
+        for index, band in enumerate(split_bands(value)):
+            values[index].update(band_neighbours(band, radius))
+
+    lookup = Q()
+    for index, bands in enumerate(values):
+        lookup |= Q(**{f'band_{index}__in': sorted(bands)})
+    return lookup
+
+
+def possible_matches(missing_pet, limit=None, max_distance=None):
+    """
+    [(kind, listing, distance)] best first, kind being 'pet' or
+    'missing_pet'; empty until the report's photos are processed
+    """
+    from adopt.models import Pet
+    from missing_pets.models import MissingPet
+
+    max_distance = get_max_distance() if max_distance is None else max_distance
+    limit = limit or getattr(settings, 'IMAGE_MATCH_LIMIT', 20)
+
+    hashes = [
+        to_unsigned(value)
+        for value in ImageFingerprint.objects
+        .filter(missing_pet_image__missing_pet=missing_pet)
+        .values_list('phash', flat=True)
+    ]
+    if not hashes:
+        return []
+
+    candidates = (
+        ImageFingerprint.objects
+        .filter(band_lookup(hashes, max_distance))
+        .filter(
+            Q(pet_image__pet__is_active=True, pet_image__pet__category=missing_pet.category)
+            | Q(
+                missing_pet_image__missing_pet__is_active=True,
+                missing_pet_image__missing_pet__category=missing_pet.category
+            )
+        )
+        .exclude(missing_pet_image__missing_pet=missing_pet)
+        .values_list('phash', 'pet_image__pet_id', 'missing_pet_image__missing_pet_id')
+    )
+
+    # Closest photo pair per listing
+    best = {}
+    for value, pet_id, missing_pet_id in candidates:
+        distance = min(hamming(to_unsigned(value), query) for query in hashes)
+        if distance > max_distance:
+            continue
+        key = ('pet', pet_id) if pet_id else ('missing_pet', missing_pet_id)
+        if distance < best.get(key, max_distance + 1):
+            best[key] = distance
+
+    ranked = sorted(best.items(), key=lambda item: item[1])[:limit]
+    listings = {
+        'pet': Pet.objects.select_related('owner').in_bulk([pk for (kind, pk), _ in ranked if kind == 'pet']),
+        'missing_pet': MissingPet.objects.select_related('reporter').in_bulk(
+            [pk for (kind, pk), _ in ranked if kind == 'missing_pet']
+        ),
+    }
+    return [(kind, listings[kind][pk], distance) for (kind, pk), distance in ranked]
@@ -0,0 +1,35 @@
+# Generated by Django 5.0 on 2026-10-17 20:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adopt', '0004_image_variants'),
+        ('imaging', '0001_initial'),
+        ('missing_pets', '0004_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageFingerprint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('phash', models.BigIntegerField()),
+                ('band_0', models.IntegerField()),
+                ('band_1', models.IntegerField()),
+                ('band_2', models.IntegerField()),
+                ('band_3', models.IntegerField()),
+                ('missing_pet_image', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='fingerprint', to='missing_pets.missingpetimage')),
+                ('pet_image', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='fingerprint', to='adopt.petimage')),
+            ],
+            options={
+                'verbose_name': 'Image Fingerprint',
+                'verbose_name_plural': 'Image Fingerprints',
+                'db_table': 'image_fingerprints',
+                'indexes': [models.Index(fields=['band_0'], name='image_finge_band_0_c6c2a7_idx'), models.Index(fields=['band_1'], name='image_finge_band_1_1bd9fc_idx'), models.Index(fields=['band_2'], name='image_finge_band_2_53a94a_idx'), models.Index(fields=['band_3'], name='image_finge_band_3_faaa46_idx')],
+            },
+        ),
+    ]
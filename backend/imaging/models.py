@@ -0,0 +1,63 @@
+from django.db import models
+
+
+class Blob(models.Model):
+    #Reference count of a file in content-addressed storage (imaging/storage.py)
+    
+    name = models.CharField(max_length=100, unique=True)
+    refcount = models.IntegerField(default=0)
+    
+    # Last time a reference was dropped; GC waits MEDIA_BLOB_GC_GRACE after it
+    released_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'media_blobs'
+        verbose_name = 'Media Blob'
+        verbose_name_plural = 'Media Blobs'
+        indexes = [
+            models.Index(fields=['refcount', 'released_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.name} ({self.refcount})"
+
+
+class ImageFingerprint(models.Model):
+    #Perceptual hash of a pet or missing pet image, searchable by Hamming distance (imaging/phash.py)
+    
+    pet_image = models.OneToOneField(
+        'adopt.PetImage',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='fingerprint'
+    )
+    missing_pet_image = models.OneToOneField(
+        'missing_pets.MissingPetImage',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='fingerprint'
+    )
+    
+    # 64-bit hash stored signed, plus its four 16-bit bands for the multi-index lookup
+    phash = models.BigIntegerField()
+    band_0 = models.IntegerField()
+    band_1 = models.IntegerField()
+    band_2 = models.IntegerField()
+    band_3 = models.IntegerField()
+    
+    class Meta:
+        db_table = 'image_fingerprints'
+        verbose_name = 'Image Fingerprint'
+        verbose_name_plural = 'Image Fingerprints'
+        indexes = [
+            models.Index(fields=['band_0']),
+            models.Index(fields=['band_1']),
+            models.Index(fields=['band_2']),
+            models.Index(fields=['band_3']),
+        ]
+    
+    def __str__(self):
+        return f"{self.pet_image or self.missing_pet_image} ({self.phash:x})"
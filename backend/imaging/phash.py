@@ -0,0 +1,90 @@
+"""
+Perceptual hashing and multi-index Hamming search
+
+phash() is the classic DCT hash: the image is shrunk to 32x32 grey, the
+8x8 lowest frequencies of its DCT are compared with their median, giving 64
+bits that survive resizing, recompression and small crops/colour changes.
+Two photos of the same animal from the same shoot land a few bits apart.
+
+The hash is split into BANDS 16-bit bands, each stored in an indexed column.
+If two hashes are within distance r, by pigeonhole at least one band is
+within r // BANDS of the query's band, so a lookup is one OR of IN lists
+over the band indexes (every band value within that small radius) followed
+by an exact distance check on the few rows it returns.
+"""
+import math
+from functools import lru_cache
+from itertools import combinations
+
+from PIL import Image
+
+HASH_BITS = 64
+BANDS = 4
+BAND_BITS = HASH_BITS // BANDS
+BAND_MASK = (1 << BAND_BITS) - 1
+
+SAMPLE_SIZE = 32
+DCT_SIZE = 8
+
+
+@lru_cache(maxsize=None)
+def cosine_table():
+    #cos((2x + 1) * u * pi / 2N) for the DCT_SIZE lowest frequencies
+    return [
+        [math.cos((2 * x + 1) * u * math.pi / (2 * SAMPLE_SIZE)) for x in range(SAMPLE_SIZE)]
+        for u in range(DCT_SIZE)
+    ]
+
+
+def phash(image):
+    """64-bit perceptual hash of a PIL image, as an unsigned int"""
+    grey = image.convert('L').resize((SAMPLE_SIZE, SAMPLE_SIZE), Image.LANCZOS)
+    pixels = list(grey.getdata())
+    rows = [pixels[y * SAMPLE_SIZE:(y + 1) * SAMPLE_SIZE] for y in range(SAMPLE_SIZE)]
+    table = cosine_table()
+
+    # Separable DCT-II: along rows, then down the columns, low frequencies only
+    row_dct = [[sum(c * p for c, p in zip(table[u], row)) for u in range(DCT_SIZE)] for row in rows]
+    coefficients = [
+        sum(table[v][y] * row_dct[y][u] for y in range(SAMPLE_SIZE))
+        for v in range(DCT_SIZE)
+        for u in range(DCT_SIZE)
+    ]
+
+    # The DC term only measures brightness, leave it out of the median
+    median = sorted(coefficients[1:])[len(coefficients[1:]) // 2]
+    value = 0
+    for coefficient in coefficients:
+        value = (value << 1) | (coefficient > median)
+    return value
+
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+
+def to_signed(value):
+    #Fit an unsigned 64-bit hash into a BigIntegerField
+    return value - (1 << HASH_BITS) if value >= 1 << (HASH_BITS - 1) else value
+
+
+def to_unsigned(value):
+    return value + (1 << HASH_BITS) if value < 0 else value
+
+
+def split_bands(value):
+    """[band_0, ..., band_{BANDS-1}], most significant first"""
+    return [(value >> (BAND_BITS * (BANDS - 1 - index))) & BAND_MASK for index in range(BANDS)]
+
+
+@lru_cache(maxsize=1024)
+def band_neighbours(band, radius):
+    """Every band value within `radius` bits of `band`"""
+    values = [band]
+    for distance in range(1, radius + 1):
+        for bits in combinations(range(BAND_BITS), distance):
+            flipped = band
+            for bit in bits:
+                flipped ^= 1 << bit
+            values.append(flipped)
+    return tuple(values)
@@ -0,0 +1,212 @@
+"""
+Image processing pipeline
+
+Uploads are stored as-is and processed by `python manage.py process_images`,
+which picks up image rows whose processed_at is null:
+- the upload is rotated upright (EXIF orientation) and re-encoded without
+  its EXIF block (GPS position, camera serial), then saved as a blob of its
+  own (imaging/storage.py) that replaces the upload's blob on the row;
+  `gc_media_blobs` deletes the old one once nothing else references it
+- a variant is rendered for every width in IMAGE_VARIANT_WIDTHS smaller than
+  the image (or the image's own width when it is smaller than all of them)
+  in every format of IMAGE_VARIANT_FORMATS Pillow can encode
+- variants are blobs too, named by the sha256 of their bytes, so
+  re-processing is a no-op on storage and the files can be served with a
+  far-future cache header
+- the upright image is fingerprinted for photo matching (imaging/matching.py)
+
+The variant paths are stored in the row's `variants` JSON as
+{format: {width: path}}; srcset() turns that into <picture> sources.
+"""
+import hashlib
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from PIL import Image, ImageOps, features
+
+from .matching import fingerprint_image
+from .storage import blob_name
+
+MIME_TYPES = {
+    'avif': 'image/avif',
+    'webp': 'image/webp',
+}
+
+# image.info keys that carry metadata (besides the EXIF block)
+METADATA_KEYS = ('xmp', 'XML:com.adobe.xmp', 'photoshop', 'iptc', 'comment')
+
+# Upload formats that are re-encoded in place; anything else (GIF, ...) is converted to PNG
+ORIGINAL_FORMATS = {
+    'JPEG': ('.jpg', {'quality': 90, 'optimize': True}),
+    'PNG': ('.png', {'optimize': True}),
+    'WEBP': ('.webp', {'quality': 90}),
+}
+
+
+class ImageProcessingError(Exception):
+    pass
+
+
+def get_variant_widths():
+    return sorted(getattr(settings, 'IMAGE_VARIANT_WIDTHS', [320, 640, 1280]))
+
+
+def get_variant_formats():
+    #Configured formats this Pillow build can encode
+    formats = getattr(settings, 'IMAGE_VARIANT_FORMATS', ['avif', 'webp'])
+    return [fmt for fmt in formats if features.check(fmt)]
+
+
+def get_quality(fmt):
+    return getattr(settings, 'IMAGE_VARIANT_QUALITY', {}).get(fmt, 75)
+
+
+def store(storage, data, ext):
+    #Already stored bytes are not written again, ContentAddressedStorage only refreshes their mtime for GC
+    return storage.save(blob_name(hashlib.sha256(data).hexdigest(), ext), ContentFile(data))
+
+
+def encode(image, fmt, **options):
+    buffer = BytesIO()
+    image.save(buffer, format=fmt, **options)
+    return buffer.getvalue()
+
+
+def open_image(field):
+    # Straight from storage, the FieldFile may still hold the uploaded file object
+    with field.storage.open(field.name, 'rb') as f:
+        data = f.read()
+    try:
+        image = Image.open(BytesIO(data))
+        image.load()
+    except (OSError, Image.DecompressionBombError) as e:
+        raise ImageProcessingError(f'Cannot decode {field.name}: {e}')
+    return image, data
+
+
+def has_metadata(image):
+    return bool(image.getexif()) or any(key in image.info for key in METADATA_KEYS)
+
+
+def strip_original(image):
+    """Upright copy of the upload without metadata, as (bytes, extension, image)"""
+    source_format = image.format
+    upright = ImageOps.exif_transpose(image)
+    ext, options = ORIGINAL_FORMATS.get(source_format, ORIGINAL_FORMATS['PNG'])
+    fmt = source_format if source_format in ORIGINAL_FORMATS else 'PNG'
+
+    if fmt == 'JPEG' and upright.mode not in ('RGB', 'L'):
+        upright = upright.convert('RGB')
+    elif upright.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+        upright = upright.convert('RGBA')
+
+    # Nothing from image.info (exif, xmp, comments) is passed on, except the colour profile
+    icc_profile = image.info.get('icc_profile')
+    if icc_profile:
+        options = {**options, 'icc_profile': icc_profile}
+    return encode(upright, fmt, **options), ext, upright
+
+
+def variant_widths(width):
+    widths = [value for value in get_variant_widths() if value < width]
+    return widths or [width]
+
+
+def render_variants(image, storage):
+    """{format: {width: path}} for every configured format and width"""
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+
+    variants = {}
+    for width in variant_widths(image.width):
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+        for fmt in get_variant_formats():
+            data = encode(resized, fmt.upper(), quality=get_quality(fmt))
+            path = store(storage, data, f'.{fmt}')
+            variants.setdefault(fmt, {})[str(width)] = path
+    return variants
+
+
+def process_image(instance):
+    """
+    Replace the upload of a PetImage/MissingPetImage with a stripped blob and
+    render its variants. The row is saved through the model so the parent's primary
+    image copy and the response cache follow.
+    """
+    field = instance.image
+    storage = field.storage
+    original, data = open_image(field)
+
+    if original.format in ORIGINAL_FORMATS and not has_metadata(original):
+        # Already clean (or processed before): keep the bytes, re-encoding would only lose quality
+        ext, upright = ORIGINAL_FORMATS[original.format][0], original
+    else:
+        data, ext, upright = strip_original(original)
+    name = store(storage, data, ext)
+    variants = render_variants(upright, storage)
+
+    instance.image.name = name
+    instance.width, instance.height = upright.size
+    instance.variants = variants
+    instance.processed_at = timezone.now()
+
+    # is_primary may have changed since the row was loaded, and save() demotes siblings of a primary image
+    instance.refresh_from_db(fields=['is_primary'])
+    instance.save(update_fields=['image', 'width', 'height', 'variants', 'processed_at', 'is_primary'])
+
+    # Perceptual hash for photo matching (imaging/matching.py)
+    fingerprint_image(instance, upright)
+    return instance
+
+
+def process_pending(model, limit=None):
+    """Process unprocessed rows of one image model, returns (processed, failed)"""
+    pending = model.objects.filter(processed_at__isnull=True).order_by('pk')
+    if limit:
+        pending = pending[:limit]
+
+    processed = failed = 0
+    for instance in pending:
+        try:
+            process_image(instance)
+        except model.DoesNotExist:
+            continue  # deleted while we were working on it
+        except (ImageProcessingError, OSError):
+            # Mark it anyway so one bad upload doesn't block the queue; variants stay empty
+            model.objects.filter(pk=instance.pk).update(processed_at=timezone.now())
+            failed += 1
+        else:
+            processed += 1
+    return processed, failed
+
+
+def variant_url(storage, path, request=None):
+    url = storage.url(path)
+    return request.build_absolute_uri(url) if request else url
+
+
+def srcset(variants, storage, request=None):
+    """
+    {mime type: srcset} for <picture><source type=... srcset=...>, best
+    format first; empty until the image is processed
+    """
+    sources = {}
+    for fmt in get_variant_formats():
+        widths = (variants or {}).get(fmt)
+        if widths:
+            sources[MIME_TYPES[fmt]] = ', '.join(
+                f'{variant_url(storage, path, request)} {width}w'
+                for width, path in sorted(widths.items(), key=lambda item: int(item[0]))
+            )
+    return sources
+
+
+def thumbnail(variants, storage, request=None):
+    #Smallest WebP variant (the most widely supported format), None until processed
+    widths = (variants or {}).get('webp') or next(iter((variants or {}).values()), None)
+    if not widths:
+        return None
+    return variant_url(storage, widths[min(widths, key=int)], request)
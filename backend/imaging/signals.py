@@ -0,0 +1,31 @@
+from collections import Counter
+
+from django.apps import apps
+from django.db.models.signals import post_delete, post_init, post_save
+
+from .blobs import REFERENCES, referenced_names, release, retain
+
+
+def snapshot_blob_names(sender, instance, **kwargs):
+    #Names as loaded, to diff against on save
+    instance._blob_names = referenced_names(instance, REFERENCES[sender._meta.label])
+
+
+def count_saved_blob_names(sender, instance, created, **kwargs):
+    names = referenced_names(instance, REFERENCES[sender._meta.label])
+    previous = Counter() if created else instance.__dict__.get('_blob_names', Counter())
+    retain(names - previous)
+    release(previous - names)
+    instance._blob_names = names
+
+
+def count_deleted_blob_names(sender, instance, **kwargs):
+    release(referenced_names(instance, REFERENCES[sender._meta.label]))
+
+
+def connect():
+    for label in REFERENCES:
+        model = apps.get_model(label)
+        post_init.connect(snapshot_blob_names, sender=model, dispatch_uid=f'blob_snapshot_{label}')
+        post_save.connect(count_saved_blob_names, sender=model, dispatch_uid=f'blob_save_{label}')
+        post_delete.connect(count_deleted_blob_names, sender=model, dispatch_uid=f'blob_delete_{label}')
@@ -0,0 +1,57 @@
+"""
+Content-addressed media storage
+
+Every file is stored once, at blobs/<sha256[:2]>/<sha256><ext>, whatever
+name or upload_to the caller asked for: the same photo posted to a pet
+listing, a missing pet report and a profile is one file. Names never
+change content, so their URLs can be cached forever (serve MEDIA_URL
+blobs/ with `Cache-Control: public, max-age=31536000, immutable`).
+
+Files are never overwritten or deleted by the models; imaging/blobs.py
+counts references and the `gc_media_blobs` command removes unreferenced
+files.
+"""
+import hashlib
+import mimetypes
+import os
+
+from django.core.files.storage import FileSystemStorage
+
+BLOB_PREFIX = 'blobs/'
+
+
+def canonical_ext(ext):
+    #.jpeg and .jpg of the same bytes must map to one blob
+    content_type, _ = mimetypes.guess_type(f'x{ext}')
+    return (content_type and mimetypes.guess_extension(content_type)) or ext.lower()
+
+
+def blob_name(digest, ext):
+    return f'{BLOB_PREFIX}{digest[:2]}/{digest}{canonical_ext(ext)}'
+
+
+def is_blob(name):
+    return bool(name) and name.startswith(BLOB_PREFIX)
+
+
+def content_digest(content):
+    #Uploads spooled by HashingUploadHandler arrive with their sha256
+    digest = getattr(content, 'sha256', None)
+    if digest is None:
+        hasher = hashlib.sha256()
+        for chunk in content.chunks():
+            hasher.update(chunk)
+        digest = hasher.hexdigest()
+        content.seek(0)
+    return digest
+
+
+class ContentAddressedStorage(FileSystemStorage):
+
+    def _save(self, name, content):
+        name = blob_name(content_digest(content), os.path.splitext(name)[1])
+        if self.exists(name):
+            # Already stored; a fresh mtime keeps GC off it until the new reference is counted
+            os.utime(self.path(name))
+            return name
+        return super()._save(name, content)
@@ -0,0 +1,424 @@
+import hashlib
+import random
+import shutil
+import tempfile
+from datetime import timedelta
+from io import BytesIO, StringIO
+
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from PIL import Image, ImageDraw
+from rest_framework.test import APITestCase
+
+from adopt.models import PetImage
+from core.testing import make_missing_pet, make_pet, make_user
+from missing_pets.models import MissingPetImage
+from users.models import User
+from .blobs import collect_garbage
+from .matching import possible_matches
+from .models import Blob
+from .phash import BANDS, band_neighbours, hamming, phash, split_bands, to_signed, to_unsigned
+from .pipeline import process_image, process_pending
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def jpeg_with_exif(size=(400, 300)):
+    #Landscape JPEG tagged "rotate 90° clockwise" with a camera model and GPS block
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Orientation
+    exif[0x0110] = 'Phone 12'  # Model
+    exif[0x8825] = {1: 'N', 2: (27.0, 42.0, 0.0)}  # GPSInfo
+    buffer = BytesIO()
+    Image.new('RGB', size, (200, 120, 40)).save(buffer, format='JPEG', exif=exif)
+    return buffer.getvalue()
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    IMAGE_VARIANT_WIDTHS=[100, 200],
+    IMAGE_VARIANT_FORMATS=['avif', 'webp'],
+)
+class ImagePipelineTests(APITestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.owner = make_user()
+        self.pet = make_pet(self.owner)
+
+    def add_image(self, data, name='photo.jpg', is_primary=True):
+        return PetImage.objects.create(
+            pet=self.pet,
+            image=SimpleUploadedFile(name, data, content_type='image/jpeg'),
+            is_primary=is_primary,
+        )
+
+    def test_upload_is_stripped_rotated_and_renamed(self):
+        image = self.add_image(jpeg_with_exif())
+        upload = image.image.name
+
+        process_image(image)
+        image.refresh_from_db()
+
+        self.assertRegex(image.image.name, r'^blobs/[0-9a-f]{2}/[0-9a-f]{64}\.jpg$')
+        # The upload with its EXIF is unreferenced now, GC removes it
+        self.assertEqual(Blob.objects.get(name=upload).refcount, 0)
+        collect_garbage(timedelta(0))
+        self.assertFalse(default_storage.exists(upload))
+        self.assertEqual((image.width, image.height), (300, 400))
+        with default_storage.open(image.image.name) as f:
+            stored = Image.open(f)
+            self.assertEqual(stored.size, (300, 400))
+            self.assertFalse(stored.getexif())
+
+    def test_variants_are_rendered_per_width_and_format(self):
+        image = process_image(self.add_image(jpeg_with_exif()))
+
+        self.assertEqual(set(image.variants), {'avif', 'webp'})
+        for fmt, widths in image.variants.items():
+            self.assertEqual(set(widths), {'100', '200'})
+            self.assertRegex(widths['100'], rf'^blobs/[0-9a-f]{{2}}/[0-9a-f]{{64}}\.{fmt}$')
+            with default_storage.open(widths['100']) as f:
+                variant = Image.open(f)
+                self.assertEqual((variant.format, variant.size), (fmt.upper(), (100, 133)))
+
+    def test_reprocessing_keeps_the_same_files(self):
+        image = process_image(self.add_image(jpeg_with_exif()))
+        name, variants = image.image.name, image.variants
+
+        image = process_image(image)
+        self.assertEqual((image.image.name, image.variants), (name, variants))
+        self.assertTrue(default_storage.exists(name))
+
+    def test_small_image_gets_one_variant_at_its_own_width(self):
+        buffer = BytesIO()
+        Image.new('P', (40, 30)).save(buffer, format='GIF')
+        image = process_image(self.add_image(buffer.getvalue(), name='tiny.gif'))
+
+        self.assertTrue(image.image.name.endswith('.png'))
+        self.assertEqual(set(image.variants['webp']), {'40'})
+
+    def test_primary_variants_reach_the_list_and_detail_responses(self):
+        image = process_image(self.add_image(jpeg_with_exif()))
+        self.pet.refresh_from_db()
+        self.assertEqual(self.pet.primary_image_path, image.image.name)
+        self.assertEqual(self.pet.primary_image_variants, image.variants)
+
+        pet = self.client.get('/api/v1/pets/').data['results'][0]
+        self.assertEqual(list(pet['primary_image_srcset']), ['image/avif', 'image/webp'])
+        self.assertRegex(pet['primary_image_srcset']['image/webp'], r'^http://testserver/media/blobs/\S+ 100w, \S+ 200w$')
+
+        detail = self.client.get(f'/api/v1/pets/{self.pet.id}/').data
+        self.assertEqual(detail['images'][0]['srcset'], pet['primary_image_srcset'])
+        self.assertTrue(detail['images'][0]['thumbnail'].endswith('.webp'))
+
+    def test_unprocessed_image_has_no_srcset(self):
+        self.add_image(jpeg_with_exif())
+        detail = self.client.get(f'/api/v1/pets/{self.pet.id}/').data
+        self.assertEqual(detail['images'][0]['srcset'], {})
+        self.assertIsNone(detail['images'][0]['thumbnail'])
+
+    def test_undecodable_upload_does_not_block_the_queue(self):
+        broken = self.add_image(b'not an image', is_primary=False)
+        self.add_image(jpeg_with_exif(), is_primary=True)
+
+        self.assertEqual(process_pending(PetImage), (1, 1))
+        broken.refresh_from_db()
+        self.assertIsNotNone(broken.processed_at)
+        self.assertEqual(broken.variants, {})
+        self.assertEqual(process_pending(PetImage), (0, 0))
+
+    def test_command_processes_both_image_models(self):
+        self.add_image(jpeg_with_exif())
+        missing_pet = make_missing_pet(
+            self.owner,
+            description='Grey cat',
+            last_seen_location='Lalitpur',
+            last_seen_date='2024-01-01',
+        )
+        MissingPetImage.objects.create(
+            missing_pet=missing_pet,
+            image=SimpleUploadedFile('cat.jpg', jpeg_with_exif(), content_type='image/jpeg'),
+            is_primary=True,
+        )
+
+        out = StringIO()
+        call_command('process_images', '--once', stdout=out)
+        self.assertIn('Processed 2, failed 0', out.getvalue())
+        missing_pet.refresh_from_db()
+        self.assertTrue(missing_pet.primary_image_path.startswith('blobs/'))
+        self.assertIn('webp', missing_pet.primary_image_variants)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class StreamingUploadTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.owner = make_user()
+        self.pet = make_pet(self.owner)
+        self.client.force_authenticate(self.owner)
+        self.url = f'/api/v1/pets/{self.pet.id}/upload-images/'
+
+    def upload(self, *files):
+        return self.client.post(
+            self.url,
+            {'images': [SimpleUploadedFile(name, data, content_type='image/jpeg') for name, data in files]},
+            format='multipart',
+        )
+
+    def test_images_are_stored_by_content_hash_and_inserted_at_once(self):
+        photo = jpeg_with_exif()
+        with CaptureQueriesContext(connection) as context:
+            response = self.upload(('a.jpeg', photo), ('b.jpg', photo), ('c.jpg', jpeg_with_exif((80, 60))))
+
+        self.assertEqual(response.status_code, 200)
+        inserts = [query for query in context.captured_queries if query['sql'].startswith('INSERT INTO "pet_images"')]
+        self.assertEqual(len(inserts), 1)
+
+        images = list(PetImage.objects.filter(pet=self.pet).order_by('id'))
+        digest = hashlib.sha256(photo).hexdigest()
+        self.assertEqual(images[0].image.name, f'blobs/{digest[:2]}/{digest}.jpg')
+        self.assertEqual(images[0].image.name, images[1].image.name)
+        self.assertEqual((images[0].width, images[0].height), (400, 300))
+        self.assertEqual([image.is_primary for image in images], [True, False, False])
+
+        self.pet.refresh_from_db()
+        self.assertEqual(self.pet.primary_image_path, images[0].image.name)
+        self.assertEqual(self.client.get(f'/api/v1/pets/{self.pet.id}/').data['images'][0]['id'], images[0].id)
+
+    def test_oversized_file_is_rejected_while_streaming(self):
+        with override_settings(IMAGE_UPLOAD_MAX_SIZE=1024):
+            response = self.upload(('a.jpg', jpeg_with_exif()))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('larger than', str(response.data))
+        self.assertFalse(PetImage.objects.exists())
+
+    def test_too_many_files_are_rejected(self):
+        response = self.upload(*[(f'{index}.jpg', jpeg_with_exif()) for index in range(6)])
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(PetImage.objects.exists())
+
+    def test_non_image_is_rejected_before_anything_is_written(self):
+        response = self.upload(('a.jpg', jpeg_with_exif()), ('b.jpg', b'not an image'))
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.data['success'])
+        self.assertFalse(PetImage.objects.exists())
+
+    def test_processing_keeps_an_upload_shared_by_another_row(self):
+        photo = jpeg_with_exif()
+        self.upload(('a.jpg', photo), ('b.jpg', photo))
+
+        self.assertEqual(process_pending(PetImage), (2, 0))
+        self.assertEqual(len({image.image.name for image in PetImage.objects.all()}), 1)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ContentAddressedStorageTests(APITestCase):
+
+    def setUp(self):
+        self.owner = make_user()
+        self.pet = make_pet(self.owner)
+        self.missing_pet = make_missing_pet(
+            self.owner,
+            name='Buddy',
+            category='DOG',
+            gender='MALE',
+            description='Brown dog',
+            last_seen_location='Kathmandu',
+            last_seen_date='2024-01-01',
+        )
+        self.photo = jpeg_with_exif()
+
+    def upload(self, name='photo.jpg', data=None):
+        return SimpleUploadedFile(name, data or self.photo, content_type='image/jpeg')
+
+    def refcount(self, name):
+        return Blob.objects.get(name=name).refcount
+
+    def test_same_photo_is_stored_once_across_models(self):
+        pet_image = PetImage.objects.create(pet=self.pet, image=self.upload('a.jpg'), is_primary=True)
+        missing_image = MissingPetImage.objects.create(missing_pet=self.missing_pet, image=self.upload('b.jpeg'))
+        self.owner.profile_picture = self.upload('me.jpg')
+        self.owner.save()
+
+        digest = hashlib.sha256(self.photo).hexdigest()
+        name = f'blobs/{digest[:2]}/{digest}.jpg'
+        self.assertEqual({pet_image.image.name, missing_image.image.name, self.owner.profile_picture.name}, {name})
+        self.assertEqual(self.refcount(name), 3)
+        self.assertEqual(len(default_storage.listdir(f'blobs/{digest[:2]}')[1]), 1)
+
+    def test_blob_is_collected_after_its_last_reference_is_gone(self):
+        pet_image = PetImage.objects.create(pet=self.pet, image=self.upload(), is_primary=True)
+        missing_image = MissingPetImage.objects.create(missing_pet=self.missing_pet, image=self.upload())
+        name = pet_image.image.name
+
+        pet_image.delete()
+        self.assertEqual(collect_garbage(timedelta(0)), (0, 0))
+        self.assertTrue(default_storage.exists(name))
+
+        self.missing_pet.delete()  # cascades to its images
+        self.assertEqual(self.refcount(name), 0)
+        self.assertEqual(collect_garbage(), (0, 0))  # still inside the grace period
+        self.assertEqual(collect_garbage(timedelta(0)), (1, len(self.photo)))
+        self.assertFalse(default_storage.exists(name))
+        self.assertFalse(Blob.objects.filter(name=name).exists())
+        self.assertFalse(MissingPetImage.objects.filter(pk=missing_image.pk).exists())
+
+    def test_replacing_a_profile_picture_releases_the_old_one(self):
+        self.owner.profile_picture = self.upload()
+        self.owner.save()
+        old = self.owner.profile_picture.name
+
+        user = User.objects.get(pk=self.owner.pk)
+        user.profile_picture = self.upload(data=jpeg_with_exif((50, 50)))
+        user.save()
+
+        self.assertEqual(self.refcount(old), 0)
+        self.assertEqual(self.refcount(user.profile_picture.name), 1)
+
+    def test_orphaned_files_are_collected(self):
+        name = default_storage.save('pets/orphan.jpg', self.upload())
+        self.assertEqual(collect_garbage(), (0, 0))
+        self.assertEqual(collect_garbage(timedelta(0), dry_run=True), (1, len(self.photo)))
+        self.assertTrue(default_storage.exists(name))
+        self.assertEqual(collect_garbage(timedelta(0)), (1, len(self.photo)))
+        self.assertFalse(default_storage.exists(name))
+
+    def test_recount_repairs_drifted_counts(self):
+        image = PetImage.objects.create(pet=self.pet, image=self.upload(), is_primary=True)
+        Blob.objects.update(refcount=0)
+
+        out = StringIO()
+        call_command('gc_media_blobs', '--recount', '--grace', '0', stdout=out)
+        self.assertIn('Fixed 1 reference count(s)', out.getvalue())
+        self.assertIn('Deleted 0 blob(s)', out.getvalue())
+        self.assertEqual(self.refcount(image.image.name), 1)
+
+
+def photo(seed, size=(320, 240), quality=90):
+    #Deterministic "photo": random coloured shapes on a gradient, saved at `size`
+    rng = random.Random(seed)
+    image = Image.linear_gradient('L').resize((320, 240)).convert('RGB')
+    draw = ImageDraw.Draw(image)
+    for _ in range(12):
+        x, y = rng.randrange(320), rng.randrange(240)
+        w, h = rng.randrange(20, 160), rng.randrange(20, 120)
+        colour = tuple(rng.randrange(256) for _ in range(3))
+        (draw.ellipse if rng.random() < 0.5 else draw.rectangle)((x, y, x + w, y + h), fill=colour)
+    buffer = BytesIO()
+    image.resize(size, Image.LANCZOS).save(buffer, format='JPEG', quality=quality)
+    return buffer.getvalue()
+
+
+class PerceptualHashTests(SimpleTestCase):
+
+    def hash_of(self, data):
+        return phash(Image.open(BytesIO(data)))
+
+    def test_resized_and_recompressed_copy_is_close(self):
+        original = self.hash_of(photo(1))
+        self.assertLessEqual(hamming(original, self.hash_of(photo(1, size=(1024, 768), quality=40))), 4)
+        self.assertGreater(hamming(original, self.hash_of(photo(2))), 16)
+
+    def test_band_lookup_finds_every_hash_within_the_radius(self):
+        rng = random.Random(7)
+        max_distance = 10
+        radius = max_distance // BANDS
+        for _ in range(200):
+            query = rng.getrandbits(64)
+            other = query
+            for bit in rng.sample(range(64), rng.randint(0, max_distance)):
+                other ^= 1 << bit
+            self.assertTrue(any(
+                band in band_neighbours(query_band, radius)
+                for band, query_band in zip(split_bands(other), split_bands(query))
+            ))
+
+    def test_signed_storage_round_trip(self):
+        for value in (0, 1, (1 << 63) - 1, 1 << 63, (1 << 64) - 1):
+            self.assertEqual(to_unsigned(to_signed(value)), value)
+            self.assertLess(abs(to_signed(value)), 1 << 63 + 1)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMAGE_VARIANT_WIDTHS=[100], IMAGE_VARIANT_FORMATS=['webp'])
+class PossibleMatchesTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.owner = make_user()
+        self.missing_pet = self.create_missing_pet('Buddy', photo(1))
+
+    def create_missing_pet(self, name, data, category='DOG'):
+        missing_pet = make_missing_pet(
+            self.owner,
+            name=name,
+            category=category,
+            gender='MALE',
+            description='Brown dog',
+            last_seen_location='Kathmandu',
+            last_seen_date='2024-01-01',
+        )
+        MissingPetImage.objects.create(
+            missing_pet=missing_pet,
+            image=SimpleUploadedFile(f'{name}.jpg', data, content_type='image/jpeg'),
+            is_primary=True,
+        )
+        return missing_pet
+
+    def create_pet(self, name, *photos, category='DOG'):
+        pet = make_pet(self.owner, name=name, category=category)
+        for index, data in enumerate(photos):
+            PetImage.objects.create(
+                pet=pet,
+                image=SimpleUploadedFile(f'{name}{index}.jpg', data, content_type='image/jpeg'),
+                is_primary=(index == 0),
+            )
+        return pet
+
+    def get_matches(self):
+        process_pending(PetImage)
+        process_pending(MissingPetImage)
+        response = self.client.get(f'/api/v1/missing-pets/{self.missing_pet.id}/possible-matches/')
+        self.assertEqual(response.status_code, 200)
+        return response.data['data']
+
+    def test_listings_with_the_same_animal_are_ranked_first(self):
+        same = self.create_pet('Same', photo(3), photo(1, size=(800, 600), quality=50))
+        self.create_pet('Different', photo(2))
+        report = self.create_missing_pet('Sighting', photo(1, size=(160, 120)))
+        self.create_pet('Cat', photo(1), category='CAT')
+
+        matches = self.get_matches()
+        # The unrelated pet and the cat with the same photo are left out
+        self.assertEqual(
+            {(match['kind'], match['listing']['id']) for match in matches},
+            {('pet', str(same.id)), ('missing_pet', str(report.id))}
+        )
+        self.assertEqual([match['distance'] for match in matches], sorted(match['distance'] for match in matches))
+        self.assertTrue(all(match['distance'] <= 10 for match in matches))
+        self.assertEqual(matches[0]['similarity'], round(1 - matches[0]['distance'] / 64, 4))
+
+    def test_no_matches_before_the_report_is_processed(self):
+        response = self.client.get(f'/api/v1/missing-pets/{self.missing_pet.id}/possible-matches/')
+        self.assertEqual(response.data['data'], [])
+
+    def test_lookup_is_a_constant_number_of_queries(self):
+        for index in range(5):
+            self.create_pet(f'Pet {index}', photo(1, quality=60 + index))
+        process_pending(PetImage)
+        process_pending(MissingPetImage)
+        # Report hashes, band lookup, pets (no missing pet matched, so no query for them)
+        with self.assertNumQueries(3):
+            matches = possible_matches(self.missing_pet)
+        self.assertEqual(len(matches), 5)
@@ -0,0 +1,139 @@
+"""
+Streaming image uploads
+
+StreamingUploadMixin swaps Django's upload handlers for HashingUploadHandler
+on the viewset actions that accept images: every file is spooled to a
+temporary file in 64KB chunks (never held in memory, whatever its size)
+while its sha256 is computed, and the upload is cut off as soon as a file
+passes IMAGE_UPLOAD_MAX_SIZE or the request carries more than
+IMAGE_UPLOAD_MAX_FILES files.
+
+add_images() then saves each file as a blob (imaging/storage.py: identical
+files are written once, FileSystemStorage renames the temporary file
+instead of copying it), inserts the image rows with one bulk INSERT and
+counts the new references (imaging/blobs.py). The rows are picked up by
+`process_images` like any other upload.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.db import transaction
+from django.http.multipartparser import MultiPartParserError
+from PIL import Image
+
+from core.response_cache import invalidate_cached_responses
+from .blobs import retain
+from .storage import blob_name, content_digest
+
+
+class InvalidImage(Exception):
+    pass
+
+
+def get_max_size():
+    return getattr(settings, 'IMAGE_UPLOAD_MAX_SIZE', 5 * 1024 * 1024)
+
+
+def get_max_files():
+    return getattr(settings, 'IMAGE_UPLOAD_MAX_FILES', 5)
+
+
+class HashingUploadHandler(TemporaryFileUploadHandler):
+    """Spools each file to disk, hashing it on the way, and enforces the upload limits"""
+
+    chunk_size = 64 * 2 ** 10
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.max_size = get_max_size()
+        self.max_files = get_max_files()
+        self.file_count = 0
+
+    def new_file(self, *args, **kwargs):
+        self.file_count += 1
+        if self.file_count > self.max_files:
+            raise MultiPartParserError(f'Maximum {self.max_files} images allowed.')
+        super().new_file(*args, **kwargs)
+        self.hasher = hashlib.sha256()
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.max_size:
+            self.upload_interrupted()
+            raise MultiPartParserError(
+                f'{self.file_name} is larger than {self.max_size // (1024 * 1024)}MB.'
+            )
+        self.hasher.update(raw_data)
+        super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        file.sha256 = self.hasher.hexdigest()
+        return file
+
+
+class StreamingUploadMixin:
+    """Parse the multipart body of `streaming_upload_actions` with HashingUploadHandler"""
+
+    streaming_upload_actions = ()
+
+    def initialize_request(self, request, *args, **kwargs):
+        drf_request = super().initialize_request(request, *args, **kwargs)
+        # The body is parsed lazily, so this runs before anything reads request.data
+        if self.action in self.streaming_upload_actions:
+            request.upload_handlers = [HashingUploadHandler(request)]
+        return drf_request
+
+
+def inspect_image(file):
+    """(extension, width, height); only reads the header"""
+    try:
+        file.seek(0)
+        with Image.open(file) as image:
+            fmt, size = image.format, image.size
+    except (OSError, Image.DecompressionBombError):
+        raise InvalidImage(f'{file.name} is not a valid image.')
+    finally:
+        file.seek(0)
+    ext = {'JPEG': 'jpg', 'TIFF': 'tif'}.get(fmt, fmt.lower())
+    return f'.{ext}', *size
+
+
+def add_images(parent, files, cache_namespace):
+    """
+    Store the files and bulk insert their rows on `parent.images`; the first
+    one becomes primary when the parent has no primary image yet.
+    Raises InvalidImage before anything is written.
+    """
+    related = parent.images
+    model = related.model
+    field = model._meta.get_field('image')
+    storage = field.storage
+
+    inspected = [(file, *inspect_image(file)) for file in files]
+
+    stored = {}
+    rows = []
+    for index, (file, ext, width, height) in enumerate(inspected):
+        digest = content_digest(file)
+        if digest not in stored:
+            stored[digest] = storage.save(blob_name(digest, ext), file)
+        rows.append(model(
+            image=stored[digest],
+            width=width,
+            height=height,
+            is_primary=(index == 0 and not parent.primary_image_path),
+            **{related.field.name: parent},
+        ))
+
+    with transaction.atomic():
+        images = model.objects.bulk_create(rows)
+        retain(image.image.name for image in images)
+        if images and images[0].is_primary:
+            parent.set_primary_image(images[0])
+
+    # bulk_create sends no post_save, so no cache invalidation or blob counting either
+    invalidate_cached_responses(cache_namespace, parent.pk)
+    return images
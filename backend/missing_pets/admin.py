@@ -1,18 +1,21 @@
 from django.contrib import admin
 from django.utils import timezone
+from django.utils.html import format_html
+from .matching import queue_refresh
 from .models import MissingPet, MissingPetImage
+from core.response_cache import invalidate_cached_responses
 
 
 class MissingPetImageInline(admin.TabularInline):
     """Inline admin for missing pet images"""
     model = MissingPetImage
     extra = 1
-    readonly_fields = ('uploaded_at',)
+    readonly_fields = ('width', 'height', 'uploaded_at')
 
 
 @admin.register(MissingPet)
 class MissingPetAdmin(admin.ModelAdmin):
-    list_display = ('name', 'category', 'reporter', 'last_seen_location', 'status', 'created_at')
+    list_display = ('name', 'primary_image', 'category', 'reporter', 'last_seen_location', 'status', 'created_at')
     list_filter = ('category', 'status', 'gender', 'last_seen_date', 'created_at')
     search_fields = ('name', 'breed', 'description', 'last_seen_location', 
                      'reporter__email', 'reporter__full_name')
@@ -43,21 +46,40 @@ class MissingPetAdmin(admin.ModelAdmin):
     
     actions = ['mark_as_found', 'mark_as_missing', 'close_reports']
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('reporter')
+    
+    def primary_image(self, obj):
+        """Thumbnail of the primary image"""
+        if obj.primary_image_path:
+            url = MissingPetImage._meta.get_field('image').storage.url(obj.primary_image_path)
+            return format_html('<img src="{}" style="height: 40px;" />', url)
+        return '-'
+    primary_image.short_description = 'Image'
+    
+    def update_reports(self, queryset, **values):
+        #queryset.update() sends no post_save: invalidate the cached responses and queue the match refreshes here
+        pks = list(queryset.values_list('pk', flat=True))
+        count = queryset.update(**values)
+        invalidate_cached_responses('missing_pets')
+        queue_refresh('MISSING_PET', pks)
+        return count
+    
     def mark_as_found(self, request, queryset):
         """Bulk action to mark pets as found"""
-        count = queryset.update(status='FOUND', found_date=timezone.now())
+        count = self.update_reports(queryset, status='FOUND', found_date=timezone.now())
         self.message_user(request, f'{count} pet(s) marked as found.')
     mark_as_found.short_description = 'Mark selected pets as found'
     
     def mark_as_missing(self, request, queryset):
         """Bulk action to mark pets as missing"""
-        count = queryset.update(status='MISSING')
+        count = self.update_reports(queryset, status='MISSING')
         self.message_user(request, f'{count} pet(s) marked as missing.')
     mark_as_missing.short_description = 'Mark selected pets as missing'
     
     def close_reports(self, request, queryset):
         """Bulk action to close reports"""
-        count = queryset.update(status='CLOSED', is_active=False)
+        count = self.update_reports(queryset, status='CLOSED', is_active=False)
         self.message_user(request, f'{count} report(s) closed.')
     close_reports.short_description = 'Close selected reports'
 
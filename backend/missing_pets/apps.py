@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class MissingPetsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'missing_pets'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -1,9 +1,10 @@
 
 import django_filters
+from geo.filters import NearbyFilterSet
 from .models import MissingPet
 
 
-class MissingPetFilter(django_filters.FilterSet):
+class MissingPetFilter(NearbyFilterSet):
     """
     Advanced filters for Missing Pet reports
     
@@ -14,6 +15,7 @@ class MissingPetFilter(django_filters.FilterSet):
     - last_seen_location: Case-insensitive contains search
     - breed: Case-insensitive contains search
     - name: Case-insensitive contains search
+    - near, radius_km: Within radius_km (default 10) of "lat,lon", nearest first
     - last_seen_after: Reports where pet was seen after this date
     - last_seen_before: Reports where pet was seen before this date
     - has_reward: Filter pets with reward offered
@@ -24,6 +26,7 @@ class MissingPetFilter(django_filters.FilterSet):
     - /api/v1/missing-pets/?last_seen_location=Kathmandu
     - /api/v1/missing-pets/?last_seen_after=2025-01-01
     - /api/v1/missing-pets/?has_reward=true
+    - /api/v1/missing-pets/?near=28.2096,83.9856&radius_km=3
     """
     
     # Location filter (case-insensitive partial match)
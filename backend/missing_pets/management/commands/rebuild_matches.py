@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from missing_pets.matching import rebuild_all
+
+
+class Command(BaseCommand):
+    help = 'Recompute the suggested matches of every open missing pet report'
+    
+    def handle(self, *args, **options):
+        total = rebuild_all()
+        self.stdout.write(self.style.SUCCESS(f'Stored {total} match(es)'))
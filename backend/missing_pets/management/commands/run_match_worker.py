@@ -0,0 +1,23 @@
+import time
+from django.core.management.base import BaseCommand
+from missing_pets.matching import refresh_queued
+
+
+class Command(BaseCommand):
+    help = 'Re-score the suggested matches of saved pet listings and missing pet reports'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Refresh queued rows and exit')
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--interval', type=float, default=5, help='Seconds to sleep when nothing is queued')
+    
+    def handle(self, *args, **options):
+        while True:
+            refreshed = refresh_queued(options['batch_size'])
+            if refreshed:
+                self.stdout.write(f'Refreshed {refreshed}')
+            
+            if not refreshed:
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
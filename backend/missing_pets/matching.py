@@ -0,0 +1,297 @@
+"""
+Attribute matching between missing pet reports and possible sightings
+
+Candidates for a MISSING report are AVAILABLE pet listings and reports
+marked FOUND in the last MATCH_FOUND_REPORT_DAYS days, of the same category.
+Both sides are encoded into NumPy arrays (one element per row) and scored
+in one vectorized pass:
+- breed and gender: equal, unknown on either side, or different
+- location: distance between geocoded points, or equal location text
+- date: days between the pet going missing and the candidate appearing
+- description: cosine similarity of hashed word vectors
+Scores are 0..1 (weights in MATCH_WEIGHTS); pairs scoring at least
+MATCH_MIN_SCORE are stored in MissingPetMatch, so a lookup is an indexed
+read. Saving either side with changed scoring fields (PET_FIELDS,
+MISSING_PET_FIELDS) queues that row in MatchRefresh (signals.py, and the
+admin bulk actions for their queryset.update()); scoring loads a whole
+category, so the `run_match_worker` command re-scores queued rows against
+the other side outside the request. `python manage.py rebuild_matches`
+recomputes everything.
+"""
+import hashlib
+import re
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from geo.spatial import EARTH_RADIUS_KM
+from .models import MatchRefresh, MissingPet, MissingPetMatch
+
+WORD_RE = re.compile(r'[a-z]{3,}')
+TOKEN_DIMENSIONS = 512
+
+DEFAULT_WEIGHTS = {
+    'breed': 0.2,
+    'gender': 0.15,
+    'location': 0.3,
+    'date': 0.15,
+    'description': 0.2,
+}
+
+# Model fields that feed the score, a save touching none of them changes nothing
+PET_FIELDS = {'category', 'breed', 'gender', 'location', 'latitude', 'longitude', 'description', 'status', 'is_active'}
+MISSING_PET_FIELDS = {
+    'category', 'breed', 'gender', 'last_seen_location', 'latitude', 'longitude', 'last_seen_date',
+    'description', 'status', 'is_active', 'found_date',
+}
+
+
+def get_weights():
+    return {**DEFAULT_WEIGHTS, **getattr(settings, 'MATCH_WEIGHTS', {})}
+
+
+def get_min_score():
+    return getattr(settings, 'MATCH_MIN_SCORE', 0.5)
+
+
+def found_since():
+    return timezone.now() - timedelta(days=getattr(settings, 'MATCH_FOUND_REPORT_DAYS', 30))
+
+
+def token_vector(text):
+    #Unit vector of hashed word counts (the hashing trick keeps the width fixed)
+    vector = np.zeros(TOKEN_DIMENSIONS, dtype=np.float32)
+    for word in WORD_RE.findall((text or '').lower()):
+        digest = hashlib.md5(word.encode()).digest()
+        vector[int.from_bytes(digest[:4], 'little') % TOKEN_DIMENSIONS] += 1
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def encode(records):
+    """
+    Column arrays for a list of record dicts (see pet_record/missing_record);
+    every array has one element (or row) per record
+    """
+    def column(key, dtype=object):
+        return np.array([record[key] for record in records], dtype=dtype)
+
+    return {
+        'pk': column('pk'),
+        'breed': column('breed'),
+        'gender': column('gender'),
+        'location': column('location'),
+        'latitude': column('latitude', np.float64),
+        'longitude': column('longitude', np.float64),
+        'day': column('day', np.int64),
+        'tokens': np.stack([token_vector(record['description']) for record in records])
+        if records else np.zeros((0, TOKEN_DIMENSIONS), dtype=np.float32),
+    }
+
+
+def normalize(text):
+    return ' '.join((text or '').lower().split())
+
+
+def as_float(value):
+    return np.nan if value is None else value
+
+
+def pet_record(pk, breed, gender, location, latitude, longitude, created_at, description):
+    return {
+        'pk': pk, 'breed': normalize(breed), 'gender': gender, 'location': normalize(location),
+        'latitude': as_float(latitude), 'longitude': as_float(longitude),
+        'day': created_at.date().toordinal(), 'description': description,
+    }
+
+
+def missing_record(pk, breed, gender, location, latitude, longitude, day, description):
+    return {
+        'pk': pk, 'breed': normalize(breed), 'gender': gender, 'location': normalize(location),
+        'latitude': as_float(latitude), 'longitude': as_float(longitude),
+        'day': day.toordinal(), 'description': description,
+    }
+
+
+def attribute_match(a, b, unknown):
+    #1 when equal, 0.5 when either side is unknown, else 0
+    known = (a != unknown) & (b != unknown)
+    return np.where(known, (a == b).astype(np.float64), 0.5)
+
+
+def location_score(missing, candidates):
+    lat1, lon1 = np.radians(missing['latitude']), np.radians(missing['longitude'])
+    lat2, lon2 = np.radians(candidates['latitude']), np.radians(candidates['longitude'])
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    distance_km = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+    same_text = (missing['location'] == candidates['location']).astype(np.float64)
+    by_distance = np.exp(-distance_km / getattr(settings, 'MATCH_DISTANCE_SCALE_KM', 10))
+    return np.where(np.isnan(distance_km), same_text, by_distance)
+
+
+def date_score(missing, candidates):
+    #Full marks for candidates appearing up to two weeks after the pet went missing, none after 90 days
+    days = candidates['day'] - missing['day']
+    after = np.clip(1 - (days - 14) / 76, 0, 1)
+    return np.where(days < -7, 0.0, np.where(days <= 14, 1.0, after))
+
+
+def score(missing, candidates):
+    """
+    Scores of every missing/candidate pair, with either side a single
+    record: encode([one]) against encode(many) broadcasts to one score per row
+    """
+    weights = get_weights()
+    components = {
+        'breed': attribute_match(missing['breed'], candidates['breed'], ''),
+        'gender': attribute_match(missing['gender'], candidates['gender'], 'UNKNOWN'),
+        'location': location_score(missing, candidates),
+        'date': date_score(missing, candidates),
+        'description': np.einsum('ij,ij->i', *np.broadcast_arrays(missing['tokens'], candidates['tokens'])),
+    }
+    total = sum(weights[name] * values for name, values in components.items())
+    return np.round(total / sum(weights.values()), 4)
+
+
+def missing_rows(**filters):
+    rows = MissingPet.objects.filter(**filters).values_list(
+        'pk', 'breed', 'gender', 'last_seen_location', 'latitude', 'longitude', 'last_seen_date', 'description'
+    )
+    return [missing_record(*row) for row in rows]
+
+
+def found_rows(**filters):
+    rows = MissingPet.objects.filter(
+        status='FOUND', is_active=True, found_date__gte=found_since(), **filters
+    ).values_list('pk', 'breed', 'gender', 'last_seen_location', 'latitude', 'longitude', 'found_date', 'description')
+    return [missing_record(*row[:6], row[6].date(), row[7]) for row in rows]
+
+
+def pet_rows(**filters):
+    from adopt.models import Pet
+
+    rows = Pet.objects.filter(status='AVAILABLE', is_active=True, **filters).values_list(
+        'pk', 'breed', 'gender', 'location', 'latitude', 'longitude', 'created_at', 'description'
+    )
+    return [pet_record(*row) for row in rows]
+
+
+def matches_above(scores, pks, min_score):
+    keep = np.flatnonzero(scores >= min_score)
+    return [(pks[index], float(scores[index])) for index in keep]
+
+
+@transaction.atomic
+def refresh_missing_pet(missing_pet):
+    """Re-score an open report against every candidate, replacing its matches"""
+    MissingPetMatch.objects.filter(missing_pet=missing_pet).delete()
+    rows = missing_rows(pk=missing_pet.pk, status='MISSING', is_active=True)
+    if not rows:
+        return 0
+
+    query = encode(rows)
+    min_score = get_min_score()
+    matches = []
+    for field, candidate_rows in (
+        ('pet_id', pet_rows(category=missing_pet.category)),
+        ('found_report_id', found_rows(category=missing_pet.category)),
+    ):
+        if candidate_rows:
+            candidates = encode(candidate_rows)
+            for pk, value in matches_above(score(query, candidates), candidates['pk'], min_score):
+                matches.append(MissingPetMatch(missing_pet=missing_pet, score=value, **{field: pk}))
+
+    MissingPetMatch.objects.bulk_create(matches)
+    return len(matches)
+
+
+@transaction.atomic
+def refresh_candidate(obj):
+    """Re-score a pet listing or FOUND report against every open report of its category"""
+    if isinstance(obj, MissingPet):
+        field = 'found_report_id'
+        rows = found_rows(pk=obj.pk)
+    else:
+        field = 'pet_id'
+        rows = pet_rows(pk=obj.pk)
+
+    MissingPetMatch.objects.filter(**{field: obj.pk}).delete()
+    if not rows:
+        return 0
+
+    candidate = encode(rows)
+    reports = missing_rows(status='MISSING', is_active=True, category=obj.category)
+    if not reports:
+        return 0
+
+    missing = encode(reports)
+    matches = [
+        MissingPetMatch(missing_pet_id=pk, score=value, **{field: obj.pk})
+        for pk, value in matches_above(score(missing, candidate), missing['pk'], get_min_score())
+    ]
+    MissingPetMatch.objects.bulk_create(matches)
+    return len(matches)
+
+
+def queue_refresh(kind, pks):
+    """Queue pets ('PET') or reports ('MISSING_PET') for the match worker, one pending row per object"""
+    MatchRefresh.objects.bulk_create([MatchRefresh(kind=kind, object_id=pk) for pk in pks], ignore_conflicts=True)
+
+
+def refresh_queued(limit=None):
+    """Re-score queued pets and reports, oldest first; returns how many were refreshed"""
+    from adopt.models import Pet
+
+    queued = MatchRefresh.objects.order_by('created_at', 'id').values_list('id', 'kind', 'object_id')
+    refreshed = 0
+    for refresh_id, kind, object_id in list(queued[:limit] if limit else queued):
+        # Claim by deleting, so a save while this runs queues the object again
+        if not MatchRefresh.objects.filter(id=refresh_id).delete()[0]:
+            continue
+        model = MissingPet if kind == 'MISSING_PET' else Pet
+        obj = model.objects.filter(pk=object_id).only('pk', 'category').first()
+        if obj is None:
+            # Deleted, its matches went with it
+            continue
+        if kind == 'MISSING_PET':
+            refresh_missing_pet(obj)
+        refresh_candidate(obj)
+        refreshed += 1
+    return refreshed
+
+
+def take(arrays, index):
+    #One record of encoded arrays, still as arrays so it broadcasts
+    return {key: values[index:index + 1] for key, values in arrays.items()}
+
+
+@transaction.atomic
+def rebuild_all():
+    """Recompute every report's matches, encoding each category's candidates once; returns the number stored"""
+    MissingPetMatch.objects.all().delete()
+    min_score = get_min_score()
+    total = 0
+
+    categories = MissingPet.objects.filter(status='MISSING', is_active=True).values_list('category', flat=True).order_by().distinct()
+    for category in categories:
+        reports = encode(missing_rows(status='MISSING', is_active=True, category=category))
+        candidate_sets = [
+            ('pet_id', encode(rows)) for rows in [pet_rows(category=category)] if rows
+        ] + [
+            ('found_report_id', encode(rows)) for rows in [found_rows(category=category)] if rows
+        ]
+
+        matches = []
+        for index, missing_pet_id in enumerate(reports['pk']):
+            query = take(reports, index)
+            for field, candidates in candidate_sets:
+                for pk, value in matches_above(score(query, candidates), candidates['pk'], min_score):
+                    if pk != missing_pet_id:
+                        matches.append(MissingPetMatch(missing_pet_id=missing_pet_id, score=value, **{field: pk}))
+        MissingPetMatch.objects.bulk_create(matches, batch_size=1000)
+        total += len(matches)
+    return total
@@ -0,0 +1,62 @@
+# Generated by Django 5.0 on 2026-10-17 20:10
+
+from django.core.files.images import get_image_dimensions
+from django.db import migrations, models
+
+
+def backfill_primary_images(apps, schema_editor):
+    MissingPet = apps.get_model('missing_pets', 'MissingPet')
+    MissingPetImage = apps.get_model('missing_pets', 'MissingPetImage')
+    
+    for image in MissingPetImage.objects.filter(is_primary=True).iterator():
+        try:
+            width, height = get_image_dimensions(image.image)
+        except (OSError, ValueError):
+            width, height = None, None
+        MissingPetImage.objects.filter(pk=image.pk).update(width=width, height=height)
+        MissingPet.objects.filter(pk=image.missing_pet_id).update(
+            primary_image_path=image.image.name,
+            primary_image_width=width,
+            primary_image_height=height
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('missing_pets', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='missingpet',
+            name='primary_image_height',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='missingpet',
+            name='primary_image_path',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='missingpet',
+            name='primary_image_width',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='missingpetimage',
+            name='height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='missingpetimage',
+            name='width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AlterField(
+            model_name='missingpetimage',
+            name='image',
+            field=models.ImageField(height_field='height', upload_to='missing_pets/', width_field='width'),
+        ),
+        migrations.RunPython(backfill_primary_images, migrations.RunPython.noop),
+    ]
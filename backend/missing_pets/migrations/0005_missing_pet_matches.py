@@ -0,0 +1,33 @@
+# Generated by Django 5.0 on 2026-10-17 20:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adopt', '0004_image_variants'),
+        ('missing_pets', '0004_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MissingPetMatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('found_report', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='missing_pets.missingpet')),
+                ('missing_pet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matches', to='missing_pets.missingpet')),
+                ('pet', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='missing_pet_matches', to='adopt.pet')),
+            ],
+            options={
+                'verbose_name': 'Missing Pet Match',
+                'verbose_name_plural': 'Missing Pet Matches',
+                'db_table': 'missing_pet_matches',
+                'ordering': ['-score'],
+                'indexes': [models.Index(fields=['missing_pet', '-score'], name='missing_pet_missing_e1a35c_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.0 on 2026-10-17 21:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('missing_pets', '0005_missing_pet_matches'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='missingpet',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['status', 'category', '-created_at'], name='missing_pets_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='missingpet',
+            index=models.Index(condition=models.Q(('is_active', True), ('status', 'MISSING')), fields=['status', '-created_at', '-id'], name='missing_pets_missing_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='missingpet',
+            index=models.Index(fields=['reporter', '-created_at'], name='missing_pets_reporter_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.0 on 2026-10-17 21:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adopt', '0005_feed_indexes'),
+        ('missing_pets', '0006_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='missingpetmatch',
+            constraint=models.UniqueConstraint(fields=('missing_pet', 'pet'), name='missing_pet_match_pet_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='missingpetmatch',
+            constraint=models.UniqueConstraint(fields=('missing_pet', 'found_report'), name='missing_pet_match_found_unique'),
+        ),
+    ]
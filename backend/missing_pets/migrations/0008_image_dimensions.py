@@ -0,0 +1,38 @@
+# Generated by Django 5.0 on 2026-10-17 22:40
+
+from django.core.files.images import get_image_dimensions
+from django.db import migrations, models
+
+
+def backfill_image_dimensions(apps, schema_editor):
+    #0002 only sized primary images, size the rest (and retry failed reads) once here
+    MissingPet = apps.get_model('missing_pets', 'MissingPet')
+    MissingPetImage = apps.get_model('missing_pets', 'MissingPetImage')
+    
+    for image in MissingPetImage.objects.filter(width__isnull=True).iterator():
+        try:
+            width, height = get_image_dimensions(image.image)
+        except (OSError, ValueError):
+            continue
+        MissingPetImage.objects.filter(pk=image.pk).update(width=width, height=height)
+        if image.is_primary:
+            MissingPet.objects.filter(pk=image.missing_pet_id).update(
+                primary_image_width=width,
+                primary_image_height=height
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('missing_pets', '0007_match_pair_unique'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='missingpetimage',
+            name='image',
+            field=models.ImageField(upload_to='missing_pets/'),
+        ),
+        migrations.RunPython(backfill_image_dimensions, migrations.RunPython.noop),
+    ]
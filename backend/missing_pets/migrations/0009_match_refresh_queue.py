@@ -0,0 +1,32 @@
+# Generated by Django 5.0 on 2026-10-17 22:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('missing_pets', '0008_image_dimensions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MatchRefresh',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('PET', 'Pet'), ('MISSING_PET', 'Missing Pet')], max_length=12)),
+                ('object_id', models.UUIDField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Match Refresh',
+                'verbose_name_plural': 'Match Refreshes',
+                'db_table': 'missing_pet_match_refreshes',
+                'ordering': ['created_at'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='matchrefresh',
+            constraint=models.UniqueConstraint(fields=('kind', 'object_id'), name='match_refresh_unique'),
+        ),
+    ]
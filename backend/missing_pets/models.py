@@ -1,6 +1,8 @@
 from django.db import models
 from django.conf import settings
+from django.core.files.images import get_image_dimensions
 from django.utils import timezone
+from geo.gazetteer import locate
 import uuid
 
 
@@ -59,6 +61,17 @@ class MissingPet(models.Model):
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='MISSING')
     is_active = models.BooleanField(default=True)
     
+    # Coordinates from the offline geocoder (geo/gazetteer.py), null when unknown
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    geohash = models.CharField(max_length=12, blank=True, default='', db_index=True)
+    
+    # Denormalized primary image (kept in sync by MissingPetImage)
+    primary_image_path = models.CharField(max_length=255, blank=True, default='')
+    primary_image_width = models.PositiveIntegerField(null=True, blank=True)
+    primary_image_height = models.PositiveIntegerField(null=True, blank=True)
+    primary_image_variants = models.JSONField(default=dict, blank=True)
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -74,17 +87,55 @@ class MissingPet(models.Model):
             models.Index(fields=['last_seen_location']),
             models.Index(fields=['status']),
             models.Index(fields=['-created_at']),
+            # Feed filtered by status/category, newest first. is_active=True is a bare
+            # boolean term in the SQL, only usable as a partial index condition
+            models.Index(
+                fields=['status', 'category', '-created_at'],
+                condition=models.Q(is_active=True),
+                name='missing_pets_feed_idx',
+            ),
+            # Default feed (list without ?status=), ordered like KeysetCursorPagination.
+            # status leads although it is constant, SQLite prefers an equality search
+            # on another index over scanning this one in order
+            models.Index(
+                fields=['status', '-created_at', '-id'],
+                condition=models.Q(is_active=True, status='MISSING'),
+                name='missing_pets_missing_idx',
+            ),
+            # my_reports
+            models.Index(fields=['reporter', '-created_at'], name='missing_pets_reporter_idx'),
         ]
     
     def __str__(self):
         name = self.name or 'Unknown'
         return f"{name} ({self.category}) - {self.status}"
     
+    def save(self, *args, **kwargs):
+        #Geocode the location text whenever it is saved
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'last_seen_location' in update_fields:
+            self.latitude, self.longitude, self.geohash = locate(self.last_seen_location)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'latitude', 'longitude', 'geohash'}
+        super().save(*args, **kwargs)
+    
     def mark_as_found(self):
         #Mark pet as found
         self.status = 'FOUND'
         self.found_date = timezone.now()
         self.save(update_fields=['status', 'found_date'])
+    
+    def set_primary_image(self, image):
+        #Copy the primary image onto the report (None clears it)
+        values = {
+            'primary_image_path': image.image.name if image else '',
+            'primary_image_width': image.width if image else None,
+            'primary_image_height': image.height if image else None,
+            'primary_image_variants': image.variants if image else {},
+        }
+        MissingPet.objects.filter(pk=self.pk).update(**values)
+        for attr, value in values.items():
+            setattr(self, attr, value)
 
 
 class MissingPetImage(models.Model):
@@ -96,9 +147,15 @@ class MissingPetImage(models.Model):
         related_name='images'
     )
     image = models.ImageField(upload_to='missing_pets/')
+    width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    height = models.PositiveIntegerField(null=True, blank=True, editable=False)
     is_primary = models.BooleanField(default=False)
     uploaded_at = models.DateTimeField(auto_now_add=True)
     
+    # Resized WebP/AVIF copies, {format: {width: path}} (imaging/pipeline.py)
+    variants = models.JSONField(default=dict, blank=True, editable=False)
+    processed_at = models.DateTimeField(null=True, blank=True, editable=False, db_index=True)
+    
     class Meta:
         db_table = 'missing_pet_images'
         verbose_name = 'Missing Pet Image'
@@ -110,10 +167,96 @@ class MissingPetImage(models.Model):
         return f"Image for {name} {'(Primary)' if self.is_primary else ''}"
     
     def save(self, *args, **kwargs):
+        #Size a new upload here rather than through width_field, which re-reads
+        #the stored file on every load of a row without dimensions
+        if self.image and not self.image._committed:
+            self.width, self.height = get_image_dimensions(self.image)
+        
         #Ensure only one primary image per missing pet
         if self.is_primary:
             MissingPetImage.objects.filter(
                 missing_pet=self.missing_pet,
                 is_primary=True
             ).update(is_primary=False)
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+        
+        # Keep the denormalized copy on the report in sync
+        if self.is_primary:
+            self.missing_pet.set_primary_image(self)
+        elif (
+            self.missing_pet.primary_image_path == self.image.name
+            # Identical photos share a file, so the path alone doesn't identify the primary image
+            and not MissingPetImage.objects.filter(missing_pet=self.missing_pet, is_primary=True).exists()
+        ):
+            self.missing_pet.set_primary_image(None)
+
+
+class MissingPetMatch(models.Model):
+    #Precomputed attribute match for an open report (missing_pets/matching.py)
+    
+    missing_pet = models.ForeignKey(
+        MissingPet,
+        on_delete=models.CASCADE,
+        related_name='matches'
+    )
+    
+    # Exactly one of these is set: an adoption listing or a recently FOUND report
+    pet = models.ForeignKey(
+        'adopt.Pet',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='missing_pet_matches'
+    )
+    found_report = models.ForeignKey(
+        MissingPet,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    score = models.FloatField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'missing_pet_matches'
+        verbose_name = 'Missing Pet Match'
+        verbose_name_plural = 'Missing Pet Matches'
+        ordering = ['-score']
+        indexes = [
+            models.Index(fields=['missing_pet', '-score']),
+        ]
+        # One row per pair (NULLs never collide, so each applies to its own kind)
+        constraints = [
+            models.UniqueConstraint(fields=['missing_pet', 'pet'], name='missing_pet_match_pet_unique'),
+            models.UniqueConstraint(fields=['missing_pet', 'found_report'], name='missing_pet_match_found_unique'),
+        ]
+    
+    def __str__(self):
+        return f"{self.missing_pet} ~ {self.pet or self.found_report} ({self.score:.2f})"
+
+
+class MatchRefresh(models.Model):
+    #Saved pet listing or report waiting to be re-scored by the `run_match_worker` command
+    
+    KIND_CHOICES = (
+        ('PET', 'Pet'),
+        ('MISSING_PET', 'Missing Pet'),
+    )
+    
+    kind = models.CharField(max_length=12, choices=KIND_CHOICES)
+    object_id = models.UUIDField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'missing_pet_match_refreshes'
+        verbose_name = 'Match Refresh'
+        verbose_name_plural = 'Match Refreshes'
+        ordering = ['created_at']
+        # Saves before the worker gets to an object share its one pending row
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='match_refresh_unique'),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.object_id}"
@@ -1,41 +1,62 @@
 from rest_framework import serializers
+from core.serializers import ModelSerializer
 from .models import MissingPet, MissingPetImage
 from users.serializers import UserSerializer
+from imaging.pipeline import srcset, thumbnail
+from imaging.uploads import add_images
 
 
-class MissingPetImageSerializer(serializers.ModelSerializer):
+class MissingPetImageSerializer(ModelSerializer):
+    
+    thumbnail = serializers.SerializerMethodField()
+    srcset = serializers.SerializerMethodField()
     
     class Meta:
         model = MissingPetImage
-        fields = ('id', 'image', 'is_primary', 'uploaded_at')
-        read_only_fields = ('id', 'uploaded_at')
+        fields = ('id', 'image', 'width', 'height', 'thumbnail', 'srcset', 'is_primary', 'uploaded_at')
+        read_only_fields = ('id', 'width', 'height', 'uploaded_at')
+    
+    def get_thumbnail(self, obj) -> str | None:
+        return thumbnail(obj.variants, obj.image.storage, self.context.get('request'))
+    
+    def get_srcset(self, obj) -> dict:
+        #{mime type: srcset} of the resized variants, empty until processed
+        return srcset(obj.variants, obj.image.storage, self.context.get('request'))
 
 
-class MissingPetListSerializer(serializers.ModelSerializer):
+class MissingPetListSerializer(ModelSerializer):
     
     reporter_name = serializers.CharField(source='reporter.full_name', read_only=True)
     primary_image = serializers.SerializerMethodField()
+    primary_image_srcset = serializers.SerializerMethodField()
+    distance_km = serializers.FloatField(read_only=True)  # only with ?near=
     category_display = serializers.CharField(source='get_category_display', read_only=True)
     
     class Meta:
         model = MissingPet
         fields = (
             'id', 'name', 'category', 'category_display', 'breed',
-            'gender', 'last_seen_location', 'last_seen_date',
-            'reward_offered', 'status', 'primary_image',
+            'gender', 'last_seen_location', 'latitude', 'longitude', 'distance_km',
+            'last_seen_date', 'reward_offered', 'status', 'primary_image',
+            'primary_image_width', 'primary_image_height', 'primary_image_srcset',
             'reporter_name', 'created_at'
         )
         read_only_fields = ('id', 'created_at')
     
     def get_primary_image(self, obj):
-        primary = obj.images.filter(is_primary=True).first()
-        if primary:
+        # Read the denormalized column instead of joining the images table
+        if obj.primary_image_path:
+            url = MissingPetImage._meta.get_field('image').storage.url(obj.primary_image_path)
             request = self.context.get('request')
-            return request.build_absolute_uri(primary.image.url) if request else primary.image.url
+            return request.build_absolute_uri(url) if request else url
         return None
+    
+    def get_primary_image_srcset(self, obj) -> dict:
+        storage = MissingPetImage._meta.get_field('image').storage
+        return srcset(obj.primary_image_variants, storage, self.context.get('request'))
 
 
-class MissingPetDetailSerializer(serializers.ModelSerializer):
+class MissingPetDetailSerializer(ModelSerializer):
     
     reporter = UserSerializer(read_only=True)
     images = MissingPetImageSerializer(many=True, read_only=True)
@@ -48,14 +69,14 @@ class MissingPetDetailSerializer(serializers.ModelSerializer):
         fields = (
             'id', 'reporter', 'name', 'category', 'category_display',
             'breed', 'gender', 'gender_display', 'description',
-            'last_seen_location', 'last_seen_date', 'reward_offered',
+            'last_seen_location', 'latitude', 'longitude', 'last_seen_date', 'reward_offered',
             'contact_phone', 'contact_email', 'status', 'status_display',
             'is_active', 'images', 'created_at', 'updated_at', 'found_date'
         )
         read_only_fields = ('id', 'reporter', 'created_at', 'updated_at', 'found_date')
 
 
-class MissingPetCreateUpdateSerializer(serializers.ModelSerializer):
+class MissingPetCreateUpdateSerializer(ModelSerializer):
     
     images = serializers.ListField(
         child=serializers.ImageField(),
@@ -102,12 +123,7 @@ class MissingPetCreateUpdateSerializer(serializers.ModelSerializer):
         images_data = validated_data.pop('images', [])
         missing_pet = MissingPet.objects.create(**validated_data)
         
-        for index, image in enumerate(images_data):
-            MissingPetImage.objects.create(
-                missing_pet=missing_pet,
-                image=image,
-                is_primary=(index == 0)
-            )
+        add_images(missing_pet, images_data, 'missing_pets')  # first image is primary
         
         return missing_pet
     
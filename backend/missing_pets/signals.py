@@ -0,0 +1,68 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from core.response_cache import invalidate_cached_responses
+from adopt.models import Pet
+from .matching import MISSING_PET_FIELDS, PET_FIELDS, queue_refresh
+from .models import MissingPet, MissingPetImage
+
+
+@receiver(post_delete, sender=MissingPetImage)
+def clear_deleted_primary_image(sender, instance, **kwargs):
+    #Clear the denormalized primary image when that image is deleted
+    if instance.is_primary:
+        MissingPet.objects.filter(
+            pk=instance.missing_pet_id,
+            primary_image_path=instance.image.name
+        ).update(primary_image_path='', primary_image_width=None, primary_image_height=None, primary_image_variants={})
+
+
+@receiver(post_save, sender=MissingPet)
+@receiver(post_delete, sender=MissingPet)
+def invalidate_missing_pet_responses(sender, instance, **kwargs):
+    invalidate_cached_responses('missing_pets', instance.pk)
+
+
+@receiver(post_save, sender=MissingPetImage)
+@receiver(post_delete, sender=MissingPetImage)
+def invalidate_missing_pet_image_responses(sender, instance, **kwargs):
+    invalidate_cached_responses('missing_pets', instance.missing_pet_id)
+
+
+def scoring_state(instance, fields):
+    #Loaded values of the scoring fields (deferred ones are left out instead of fetched)
+    return {field: instance.__dict__[field] for field in fields if field in instance.__dict__}
+
+
+def scoring_changed(instance, fields, created, update_fields):
+    #Compare with the values the instance was loaded or last saved with
+    if update_fields is not None and not set(update_fields) & fields:
+        return False
+    state = scoring_state(instance, fields)
+    changed = created or state != getattr(instance, '_match_state', None)
+    instance._match_state = state
+    return changed
+
+
+@receiver(post_init, sender=MissingPet)
+def remember_missing_pet_scoring_fields(sender, instance, **kwargs):
+    instance._match_state = scoring_state(instance, MISSING_PET_FIELDS)
+
+
+@receiver(post_init, sender=Pet)
+def remember_pet_scoring_fields(sender, instance, **kwargs):
+    instance._match_state = scoring_state(instance, PET_FIELDS)
+
+
+@receiver(post_save, sender=MissingPet)
+def refresh_missing_pet_matches(sender, instance, created, update_fields=None, **kwargs):
+    #A report is matched while MISSING and is a candidate for others once FOUND; the worker re-scores it
+    if not scoring_changed(instance, MISSING_PET_FIELDS, created, update_fields):
+        return
+    queue_refresh('MISSING_PET', [instance.pk])
+
+
+@receiver(post_save, sender=Pet)
+def refresh_pet_matches(sender, instance, created, update_fields=None, **kwargs):
+    if not scoring_changed(instance, PET_FIELDS, created, update_fields):
+        return
+    queue_refresh('PET', [instance.pk])
@@ -1,3 +1,265 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from collections import Counter
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from adopt.models import Pet
+from core.query_plans import explain, unindexed_steps
+from core.testing import make_missing_pet, make_pet, make_user
+from adopt.tests import GIF_BYTES
+from users.models import User
+from .matching import encode, missing_rows, pet_record, refresh_queued, score
+from .models import MatchRefresh, MissingPetImage, MissingPetMatch
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class MissingPetListQueryCountTests(APITestCase):
+    """List endpoints must not issue a query per report for the primary image"""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.reporter = make_user('reporter@example.com', full_name='Pet Reporter')
+
+    def create_reports(self, count):
+        with self.captureOnCommitCallbacks(execute=True):
+            for index in range(count):
+                report = make_missing_pet(self.reporter, name=f'Lost {index}')
+                MissingPetImage.objects.create(
+                    missing_pet=report,
+                    image=SimpleUploadedFile(f'lost{index}.gif', GIF_BYTES, content_type='image/gif'),
+                    is_primary=True,
+                )
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries), response
+
+    def test_list_query_count_does_not_grow_with_page_size(self):
+        self.create_reports(2)
+        small, _ = self.count_queries('/api/v1/missing-pets/')
+
+        self.create_reports(8)
+        large, response = self.count_queries('/api/v1/missing-pets/')
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertTrue(all(report['primary_image'] for report in response.data['results']))
+        self.assertEqual(small, large)
+
+    def test_my_reports_query_count_does_not_grow(self):
+        self.client.force_authenticate(self.reporter)
+
+        self.create_reports(2)
+        small, _ = self.count_queries('/api/v1/missing-pets/my-reports/')
+
+        self.create_reports(8)
+        large, _ = self.count_queries('/api/v1/missing-pets/my-reports/')
+        self.assertEqual(small, large)
+
+
+class SuggestedMatchTests(APITestCase):
+    """Attribute matches are precomputed by the match worker when either side is saved"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = make_user('reporter@example.com', full_name='Pet Reporter')
+        self.report = self.create_report('Sheru', status='MISSING')
+
+    def create_report(self, name, status='MISSING', **fields):
+        values = {
+            'name': name,
+            'category': 'DOG',
+            'breed': 'Labrador',
+            'gender': 'MALE',
+            'description': 'Golden labrador with a red collar and a white patch on the chest',
+            'last_seen_location': 'Thamel, Kathmandu',
+            'last_seen_date': timezone.now().date() - timedelta(days=3),
+            'status': status,
+            **fields,
+        }
+        return make_missing_pet(self.user, **values)
+
+    def create_pet(self, name, **fields):
+        values = {
+            'name': name,
+            'breed': 'Labrador',
+            'age': 24,
+            'size': 'LARGE',
+            'description': 'Found this golden labrador wearing a red collar, white patch on chest',
+            **fields,
+        }
+        return make_pet(self.user, **values)
+
+    def matched(self, report=None):
+        refresh_queued()
+        return {
+            (match.pet_id or match.found_report_id): match.score
+            for match in MissingPetMatch.objects.filter(missing_pet=report or self.report)
+        }
+
+    def test_similar_listing_is_matched_and_others_are_not(self):
+        same = self.create_pet('Goldie')
+        self.create_pet('Far away', location='Pokhara', breed='Husky', gender='FEMALE', description='Grey husky')
+        self.create_pet('Cat', category='CAT')
+
+        matches = self.matched()
+        self.assertEqual(set(matches), {same.pk})
+        self.assertGreater(matches[same.pk], 0.8)
+
+    def test_listing_leaves_matches_when_adopted(self):
+        pet = self.create_pet('Goldie')
+        self.assertIn(pet.pk, self.matched())
+
+        pet.mark_as_adopted()
+        self.assertEqual(self.matched(), {})
+
+    def test_report_saved_after_the_listings_is_scored_against_them(self):
+        pet = self.create_pet('Goldie')
+        later = self.create_report('Sheru again')
+        self.assertIn(pet.pk, self.matched(later))
+
+        later.mark_as_found()
+        self.assertEqual(self.matched(later), {})
+
+    def test_found_report_becomes_a_candidate(self):
+        sighting = self.create_report('Stray lab')
+        self.assertNotIn(sighting.pk, self.matched())
+
+        sighting.mark_as_found()
+        self.assertIn(sighting.pk, self.matched())
+
+    def all_matches(self):
+        #Counter, so a duplicated pair shows up
+        refresh_queued()
+        return Counter(MissingPetMatch.objects.values_list('missing_pet_id', 'pet_id', 'found_report_id', 'score'))
+
+    def test_rebuild_matches_agrees_with_incremental_updates(self):
+        # Several open reports of one category, each category must be scored once
+        self.create_report('Kalu', gender='FEMALE')
+        self.create_report('Moti', breed='')
+        for index in range(5):
+            self.create_pet(f'Pet {index}', gender=['MALE', 'FEMALE', 'UNKNOWN'][index % 3])
+        self.create_report('Stray lab').mark_as_found()
+        incremental = self.all_matches()
+        self.assertEqual(len({match[0] for match in incremental}), 3)
+
+        out = StringIO()
+        call_command('rebuild_matches', stdout=out)
+        self.assertEqual(self.all_matches(), incremental)
+        self.assertIn(f'Stored {len(incremental)} match(es)', out.getvalue())
+
+    def test_saves_without_scoring_changes_skip_rescoring(self):
+        pet = self.create_pet('Goldie')
+        before = self.matched()[pet.pk]
+        pet.contact_phone = '9811111111'
+        pet.save()
+        self.assertFalse(MatchRefresh.objects.exists())
+
+        pet = Pet.objects.get(pk=pet.pk)
+        pet.description = 'Grey husky'
+        pet.save()
+        self.assertLess(self.matched()[pet.pk], before)
+
+    def test_score_is_vectorized_over_candidates(self):
+        query = encode(missing_rows(pk=self.report.pk))
+        candidates = encode([
+            pet_record(index, 'Labrador', 'MALE', 'Kathmandu', 27.7172, 85.3240, timezone.now(), 'golden labrador')
+            for index in range(100)
+        ])
+        scores = score(query, candidates)
+        self.assertEqual(scores.shape, (100,))
+        self.assertTrue((scores == scores[0]).all())
+
+    def test_saves_queue_scoring_for_the_worker(self):
+        with CaptureQueriesContext(connection) as context:
+            pet = self.create_pet('Goldie')
+            pet.description = 'Golden labrador with a red collar'
+            pet.save()
+        # No candidate scan in the request, and one pending refresh however often it is saved
+        self.assertFalse([query for query in context.captured_queries if 'missing_pet_matches' in query['sql']])
+        self.assertEqual(list(MatchRefresh.objects.values_list('kind', 'object_id')), [('MISSING_PET', self.report.pk), ('PET', pet.pk)])
+
+        out = StringIO()
+        call_command('run_match_worker', '--once', stdout=out)
+        self.assertIn('Refreshed 2', out.getvalue())
+        self.assertFalse(MatchRefresh.objects.exists())
+        self.assertIn(pet.pk, self.matched())
+
+    def test_admin_bulk_actions_rescore_their_rows(self):
+        pet = self.create_pet('Goldie')
+        self.assertIn(pet.pk, self.matched())
+
+        admin = User.objects.create_superuser(email='admin@example.com', password='pass12345', full_name='Admin')
+        self.client.force_login(admin)
+        self.client.post('/admin/adopt/pet/', {'action': 'mark_as_adopted', '_selected_action': [pet.pk]})
+        self.assertEqual(self.matched(), {})
+
+        self.client.post('/admin/missing_pets/missingpet/', {'action': 'close_reports', '_selected_action': [self.report.pk]})
+        self.client.post('/admin/adopt/pet/', {'action': 'mark_as_available', '_selected_action': [pet.pk]})
+        self.assertEqual(self.matched(), {})
+
+    def test_suggested_matches_endpoint_reads_the_stored_matches(self):
+        pet = self.create_pet('Goldie')
+        weaker = self.create_pet('Maybe', breed='', description='Brown dog')
+        refresh_queued()
+
+        # Report, then matches joined to their listings
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/v1/missing-pets/{self.report.id}/suggested-matches/')
+        self.assertEqual(response.status_code, 200)
+        data = response.data['data']
+        self.assertEqual([match['listing']['id'] for match in data], [str(pet.id), str(weaker.id)])
+        self.assertEqual(data[0]['kind'], 'pet')
+        self.assertGreater(data[0]['score'], data[1]['score'])
+
+
+class MissingPetQueryPlanTests(APITestCase):
+    """Every missing_pets query of the listing endpoints is answered from an index, without a sort"""
+
+    def setUp(self):
+        cache.clear()
+        self.reporter = make_user('reporter@example.com', full_name='Pet Reporter')
+        for index, (category, status) in enumerate([('CAT', 'MISSING'), ('DOG', 'MISSING'), ('CAT', 'FOUND')] * 3):
+            make_missing_pet(self.reporter, name=f'Lost {index}', category=category, status=status)
+
+    def assert_indexed(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        queries = [query['sql'] for query in context.captured_queries if 'FROM "missing_pets"' in query['sql']]
+        self.assertTrue(queries)
+        for sql in queries:
+            self.assertEqual(unindexed_steps(sql, 'missing_pets'), [], f'{sql}\n{explain(sql)}')
+        return queries
+
+    def test_default_feed(self):
+        queries = self.assert_indexed('/api/v1/missing-pets/')
+        self.assertIn('missing_pets_missing_idx', ' '.join(explain(queries[-1])))
+
+    def test_cursor_feed(self):
+        self.assert_indexed('/api/v1/missing-pets/?cursor=')
+
+    def test_feed_by_category_and_status(self):
+        self.assert_indexed('/api/v1/missing-pets/?category=CAT')
+        self.assert_indexed('/api/v1/missing-pets/?category=CAT&status=FOUND')
+
+    def test_my_reports(self):
+        self.client.force_authenticate(self.reporter)
+        queries = self.assert_indexed('/api/v1/missing-pets/my-reports/')
+        self.assertIn('missing_pets_reporter_idx', ' '.join(explain(queries[-1])))
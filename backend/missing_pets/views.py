@@ -2,27 +2,40 @@ from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter, OrderingFilter
-from .models import MissingPet, MissingPetImage
+from django.conf import settings
+from .models import MissingPet, MissingPetMatch
 from .serializers import (
     MissingPetListSerializer, MissingPetDetailSerializer,
     MissingPetCreateUpdateSerializer, MissingPetImageSerializer
 )
+from core.pagination import FeedPagination
+from geo.filters import DistanceOrderingFilter
+from core.db_router import ReplicaReadMixin
+from core.response_cache import CachedResponseMixin
+from imaging.uploads import InvalidImage, StreamingUploadMixin, add_images
 from core.permissions import IsOwnerOrAdmin, HasAcceptedTerms
+from search.filters import FullTextSearchFilter
 from .filters import MissingPetFilter
+from notifications.fanout import start_job
+from imaging.matching import possible_matches
+from imaging.phash import HASH_BITS
+from adopt.serializers import PetListSerializer
 from users.utils import send_missing_pet_confirmation
 
 
-class MissingPetViewSet(viewsets.ModelViewSet):
-    queryset = MissingPet.objects.filter(is_active=True).select_related('reporter').prefetch_related('images')
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+class MissingPetViewSet(ReplicaReadMixin, StreamingUploadMixin, CachedResponseMixin, viewsets.ModelViewSet):
+    queryset = MissingPet.objects.filter(is_active=True).select_related('reporter')
+    filter_backends = [DjangoFilterBackend, DistanceOrderingFilter, FullTextSearchFilter]
+    pagination_class = FeedPagination
+    cache_namespace = 'missing_pets'
+    streaming_upload_actions = ('create', 'upload_images')
     filterset_class = MissingPetFilter
     search_fields = ['name', 'breed', 'description', 'last_seen_location']
     ordering_fields = ['created_at', 'last_seen_date']
     ordering = ['-created_at']
     
     def get_permissions(self):
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'possible_matches', 'suggested_matches']:
             return [permissions.AllowAny()]
         elif self.action == 'create':
             return [permissions.IsAuthenticated(), HasAcceptedTerms()]
@@ -45,8 +58,15 @@ class MissingPetViewSet(viewsets.ModelViewSet):
             status_filter = self.request.query_params.get('status')
             if not status_filter:
                 queryset = queryset.filter(status='MISSING')
+            
+            # List reads the denormalized primary image, no images join needed
+            return queryset
         
-        return queryset
+        # Match lookups only need the report itself
+        if self.action in ['possible_matches', 'suggested_matches']:
+            return queryset
+        
+        return queryset.prefetch_related('images')
     
     def perform_create(self, serializer):
         #Set reporter when creating missing pet report
@@ -62,19 +82,74 @@ class MissingPetViewSet(viewsets.ModelViewSet):
             send_missing_pet_confirmation(self.request.user, missing_pet)
         except Exception as e:
             print(f"Failed to send missing pet confirmation: {e}")
+        
+        # Alert users in the area (sent by the run_notification_jobs worker)
+        start_job('MISSING_PET_ALERT', missing_pet)
     
     @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated], url_path='my-reports')
     def my_reports(self, request):
         #Get current user's missing pet reports
         #GET /api/v1/missing-pets/my-reports/
         
-        reports = MissingPet.objects.filter(reporter=request.user).select_related('reporter').prefetch_related('images')
+        reports = MissingPet.objects.filter(reporter=request.user).select_related('reporter')
         serializer = MissingPetListSerializer(reports, many=True, context={'request': request})
         return Response({
             'success': True,
             'data': serializer.data
         })
     
+    @action(detail=True, methods=['get'], permission_classes=[permissions.AllowAny], url_path='possible-matches')
+    def possible_matches(self, request, pk=None):
+        #Pets and other reports whose photos look like this one's
+        #GET /api/v1/missing-pets/{id}/possible-matches/
+        
+        missing_pet = self.get_object()
+        serializer_classes = {'pet': PetListSerializer, 'missing_pet': MissingPetListSerializer}
+        
+        matches = [
+            {
+                'kind': kind,
+                'distance': distance,
+                'similarity': round(1 - distance / HASH_BITS, 4),
+                'listing': serializer_classes[kind](listing, context={'request': request}).data,
+            }
+            for kind, listing, distance in possible_matches(missing_pet)
+        ]
+        return Response({
+            'success': True,
+            'data': matches
+        })
+    
+    @action(detail=True, methods=['get'], permission_classes=[permissions.AllowAny], url_path='suggested-matches')
+    def suggested_matches(self, request, pk=None):
+        #Pets and FOUND reports whose details fit this report, precomputed by missing_pets/matching.py
+        #GET /api/v1/missing-pets/{id}/suggested-matches/
+        
+        missing_pet = self.get_object()
+        matches = (
+            MissingPetMatch.objects
+            .filter(missing_pet=missing_pet)
+            .select_related('pet__owner', 'found_report__reporter')
+            [:getattr(settings, 'MATCH_LIMIT', 20)]
+        )
+        
+        data = [
+            {
+                'kind': 'pet' if match.pet_id else 'missing_pet',
+                'score': match.score,
+                'listing': (
+                    PetListSerializer(match.pet, context={'request': request}).data
+                    if match.pet_id else
+                    MissingPetListSerializer(match.found_report, context={'request': request}).data
+                ),
+            }
+            for match in matches
+        ]
+        return Response({
+            'success': True,
+            'data': data
+        })
+    
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated, IsOwnerOrAdmin])
     def mark_found(self, request, pk=None):
         #Mark pet as found
@@ -110,10 +185,14 @@ class MissingPetViewSet(viewsets.ModelViewSet):
                 'error': f'Maximum 5 images allowed. Current: {current_count}'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        created_images = []
-        for image in images:
-            pet_image = MissingPetImage.objects.create(missing_pet=missing_pet, image=image)
-            created_images.append(pet_image)
+        # Files are already spooled to disk and hashed; one bulk INSERT, the first becomes primary if none is set
+        try:
+            created_images = add_images(missing_pet, images, self.cache_namespace)
+        except InvalidImage as e:
+            return Response({
+                'success': False,
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
         
         serializer = MissingPetImageSerializer(created_images, many=True, context={'request': request})
         return Response({
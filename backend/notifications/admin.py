@@ -0,0 +1,34 @@
+from django.contrib import admin
+from django.utils import timezone
+from .models import NotificationJob, OutboundEmail
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'get_recipients', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('subject', 'to')
+    readonly_fields = ('subject', 'body', 'html_body', 'from_email', 'to', 'attempts', 'last_error',
+                       'claim_token', 'locked_until', 'created_at', 'sent_at')
+    
+    actions = ['retry_now']
+    
+    def get_recipients(self, obj):
+        return ', '.join(obj.to)
+    get_recipients.short_description = 'To'
+    
+    def retry_now(self, request, queryset):
+        """Requeue failed/pending messages for immediate delivery"""
+        count = queryset.exclude(status='SENT').update(
+            status='PENDING', attempts=0, next_attempt_at=timezone.now(), claim_token='', locked_until=None
+        )
+        self.message_user(request, f'{count} email(s) requeued.')
+    retry_now.short_description = 'Retry selected emails now'
+
+
+@admin.register(NotificationJob)
+class NotificationJobAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'object_id', 'status', 'sent_count', 'failed_count', 'created_at', 'finished_at')
+    list_filter = ('kind', 'status', 'created_at')
+    readonly_fields = ('kind', 'object_id', 'last_recipient_id', 'sent_count', 'failed_count',
+                       'created_at', 'started_at', 'finished_at')
@@ -0,0 +1,72 @@
+"""
+Email template registry
+
+Every transactional email is a subject plus two templates under
+notifications/templates/emails/: <name>.html and <name>.txt. The plain-text
+part has its own template instead of being derived from the HTML with
+strip_tags. Templates are compiled once per process, and render_batch()
+renders many recipients through one Context.
+"""
+from functools import lru_cache
+
+from django.conf import settings
+from django.template import Context, engines
+from core.profiling import section
+
+from .outbox import enqueue_email
+
+EMAIL_SUBJECTS = {
+    'verification': 'Verify your Adopt Me account',
+    'password_reset': 'Reset your Adopt Me password',
+    'welcome': 'Welcome to Adopt Me!',
+    'pet_listing_confirmation': 'Your pet listing is now live!',
+    'missing_pet_confirmation': 'Your missing pet report has been posted',
+    'missing_pet_alert': 'A pet went missing near you',
+    'donation_confirmation': 'Thank you for your donation!',
+    'feedback_confirmation': 'We received your message',
+}
+
+
+class EmailTemplate:
+
+    def __init__(self, name, subject):
+        engine = engines['django']
+        self.name = name
+        self.subject = subject
+        self.html = engine.get_template(f'emails/{name}.html').template
+        self.text = engine.get_template(f'emails/{name}.txt').template
+
+    def get_base_context(self):
+        return {'frontend_url': settings.FRONTEND_URL}
+
+    def render(self, context):
+        """(subject, text, html) for one recipient"""
+        return self.render_batch([context])[0]
+
+    def render_batch(self, contexts):
+        """(subject, text, html) for each context, sharing the compiled templates and base context"""
+        base = self.get_base_context()
+        html_context = Context(base)
+        text_context = Context(base, autoescape=False)
+
+        rendered = []
+        for values in contexts:
+            with html_context.push(values), text_context.push(values):
+                rendered.append((
+                    self.subject,
+                    self.text.render(text_context),
+                    self.html.render(html_context),
+                ))
+        return rendered
+
+
+@lru_cache(maxsize=None)
+def get_email_template(name):
+    return EmailTemplate(name, EMAIL_SUBJECTS[name])
+
+
+def send_templated_email(name, context, recipient_list):
+    """Render a registered email and queue it"""
+    with section('email'):
+        subject, text, html = get_email_template(name).render(context)
+        return enqueue_email(subject, text, recipient_list, html_message=html)
@@ -0,0 +1,214 @@
+"""
+Notification fan-out
+
+A NotificationJob sends one notification to every matching user. The
+`run_notification_jobs` command runs pending jobs:
+- recipients are streamed in primary key order with iterator(), a chunk at a time
+- each chunk gets NotificationDelivery rows and moves the job's resume point
+- the email is rendered once per chunk and sent over one SMTP connection,
+  paced to NOTIFICATION_SEND_RATE messages per second
+- deliveries go PENDING -> SENDING -> SENT/FAILED; a job resumed after a
+  crash only sends PENDING deliveries and users past the resume point, so
+  a message in flight when the worker died stays SENDING and is not resent
+"""
+import time
+from abc import ABC, abstractmethod
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from .emails import get_email_template
+from .models import NotificationDelivery, NotificationJob
+
+
+class FanOut(ABC):
+    """What a job kind sends and to whom"""
+
+    template_name = None
+
+    def __init__(self, job):
+        self.job = job
+
+    @abstractmethod
+    def get_object(self):
+        """The job's subject, e.g. the MissingPet"""
+
+    @abstractmethod
+    def get_recipients(self, obj):
+        """Queryset of users to notify"""
+
+    def get_context(self, obj):
+        return {}
+
+
+class MissingPetAlert(FanOut):
+    """Alert users whose location matches where a pet was last seen"""
+
+    template_name = 'missing_pet_alert'
+
+    def get_object(self):
+        from missing_pets.models import MissingPet
+        return MissingPet.objects.filter(pk=self.job.object_id).first()
+
+    def get_recipients(self, missing_pet):
+        location = missing_pet.last_seen_location.strip().lower()
+        return (
+            get_user_model().objects
+            .alias(location_lower=Lower('location'))
+            .filter(location_lower=location, is_active=True)
+            .exclude(pk=missing_pet.reporter_id)
+        )
+
+    def get_context(self, missing_pet):
+        return {'missing_pet': missing_pet}
+
+
+FANOUTS = {
+    'MISSING_PET_ALERT': MissingPetAlert,
+}
+
+
+def start_job(kind, obj):
+    return NotificationJob.objects.create(kind=kind, object_id=str(obj.pk))
+
+
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart"""
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+        self.next_at = 0
+
+    def wait(self):
+        now = time.monotonic()
+        if self.next_at > now:
+            time.sleep(self.next_at - now)
+        self.next_at = max(now, self.next_at) + self.interval
+
+
+class JobRunner:
+
+    def __init__(self, job, chunk_size=None):
+        self.job = job
+        self.fanout = FANOUTS[job.kind](job)
+        self.chunk_size = chunk_size or getattr(settings, 'NOTIFICATION_CHUNK_SIZE', 500)
+        self.limiter = RateLimiter(getattr(settings, 'NOTIFICATION_SEND_RATE', 0))
+        self.connection = None
+
+    def run(self):
+        obj = self.fanout.get_object()
+        job = self.job
+        job.status = 'RUNNING'
+        job.started_at = job.started_at or timezone.now()
+        job.save(update_fields=['status', 'started_at'])
+
+        if obj is not None:
+            try:
+                # Deliveries recorded before a crash but never claimed
+                self.send_pending(obj)
+
+                recipients = self.fanout.get_recipients(obj).order_by('pk')
+                if job.last_recipient_id is not None:
+                    recipients = recipients.filter(pk__gt=job.last_recipient_id)
+
+                rows = recipients.values_list('pk', flat=True).iterator(chunk_size=self.chunk_size)
+                while chunk := list(islice(rows, self.chunk_size)):
+                    self.record_chunk(chunk)
+                    self.send_pending(obj)
+            finally:
+                if self.connection is not None:
+                    self.connection.close()
+
+        job.status = 'DONE'
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'finished_at'])
+        return job
+
+    def record_chunk(self, user_ids):
+        with transaction.atomic():
+            NotificationDelivery.objects.bulk_create(
+                [NotificationDelivery(job=self.job, user_id=user_id) for user_id in user_ids],
+                ignore_conflicts=True
+            )
+            self.job.last_recipient_id = user_ids[-1]
+            self.job.save(update_fields=['last_recipient_id'])
+
+    def send_pending(self, obj):
+        deliveries = NotificationDelivery.objects.filter(job=self.job, status='PENDING')
+        while True:
+            batch = list(deliveries.order_by('id').values_list('id', 'user__email')[:self.chunk_size])
+            if not batch:
+                return
+
+            # Claim first: a crash from here on leaves SENDING rows that are never resent
+            NotificationDelivery.objects.filter(id__in=[delivery_id for delivery_id, _ in batch]).update(status='SENDING')
+
+            # Same content for every recipient, render once per chunk
+            subject, text, html = get_email_template(self.fanout.template_name).render(self.fanout.get_context(obj))
+
+            sent, failed = [], []
+            attempted = 0
+            try:
+                for delivery_id, email in batch:
+                    self.limiter.wait()
+                    attempted += 1
+                    try:
+                        self.send(subject, text, html, email)
+                    except Exception as e:
+                        failed.append((delivery_id, str(e)[:2000]))
+                        self.reset_connection()
+                    else:
+                        sent.append(delivery_id)
+            finally:
+                # Also runs when interrupted: keep what was sent, release what was never tried
+                self.record_results(sent, failed, [delivery_id for delivery_id, _ in batch[attempted:]])
+
+    def record_results(self, sent, failed, released):
+        now = timezone.now()
+        with transaction.atomic():
+            NotificationDelivery.objects.filter(id__in=sent).update(status='SENT', updated_at=now)
+            NotificationDelivery.objects.filter(id__in=released).update(status='PENDING', updated_at=now)
+            for delivery_id, error in failed:
+                NotificationDelivery.objects.filter(id=delivery_id).update(status='FAILED', error=error, updated_at=now)
+            self.job.sent_count += len(sent)
+            self.job.failed_count += len(failed)
+            self.job.save(update_fields=['sent_count', 'failed_count'])
+
+    def send(self, subject, text, html, email):
+        if self.connection is None:
+            self.connection = get_connection(fail_silently=False)
+            self.connection.open()
+        message = EmailMultiAlternatives(
+            subject=subject,
+            body=text,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[email],
+            connection=self.connection,
+        )
+        message.attach_alternative(html, 'text/html')
+        message.send()
+
+    def reset_connection(self):
+        #Reconnect on the next send, the relay may have dropped us
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except Exception:
+                pass
+            self.connection = None
+
+
+def run_pending_jobs(chunk_size=None, resume=False):
+    """
+    Run pending jobs, returns the jobs run. With resume=True also pick up
+    RUNNING jobs, i.e. ones a crashed worker left behind; only pass it
+    when no other worker is running.
+    """
+    statuses = ['PENDING', 'RUNNING'] if resume else ['PENDING']
+    jobs = NotificationJob.objects.filter(status__in=statuses).order_by('created_at')
+    return [JobRunner(job, chunk_size).run() for job in jobs]
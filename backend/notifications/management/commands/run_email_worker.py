@@ -0,0 +1,23 @@
+import time
+from django.core.management.base import BaseCommand
+from notifications.outbox import process_outbox
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued emails from the outbox'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Process due messages and exit')
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--interval', type=float, default=5, help='Seconds to sleep when the outbox is empty')
+    
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = process_outbox(options['batch_size'])
+            if sent or failed:
+                self.stdout.write(f'Sent {sent}, failed {failed}')
+            
+            if not (sent or failed):
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
@@ -0,0 +1,26 @@
+import time
+from django.core.management.base import BaseCommand
+from notifications.fanout import run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = 'Run notification fan-out jobs (e.g. missing pet alerts). Run a single instance.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Run pending jobs and exit')
+        parser.add_argument('--chunk-size', type=int, default=None)
+        parser.add_argument('--interval', type=float, default=10, help='Seconds to sleep when no job is pending')
+    
+    def handle(self, *args, **options):
+        # Jobs still RUNNING at startup were interrupted, resume them first
+        resume = True
+        while True:
+            jobs = run_pending_jobs(options['chunk_size'], resume=resume)
+            resume = False
+            for job in jobs:
+                self.stdout.write(f'{job}: sent {job.sent_count}, failed {job.failed_count}')
+            
+            if not jobs:
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
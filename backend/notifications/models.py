@@ -0,0 +1,117 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class OutboundEmail(models.Model):
+    #Queued email, delivered by the `run_email_worker` command
+    
+    STATUS_CHOICES = (
+        ('PENDING', 'Pending'),
+        ('SENDING', 'Sending'),
+        ('SENT', 'Sent'),
+        ('FAILED', 'Failed'),  # dead letter, gave up after EMAIL_OUTBOX_MAX_ATTEMPTS
+    )
+    
+    # Message
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True, default='')
+    from_email = models.CharField(max_length=255)
+    to = models.JSONField(help_text="List of recipient addresses")
+    
+    # Delivery state
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    
+    # Set while a worker holds the message; an expired lease means the worker died
+    claim_token = models.CharField(max_length=32, blank=True, default='')
+    locked_until = models.DateTimeField(null=True, blank=True)
+    
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'outbound_emails'
+        verbose_name = 'Outbound Email'
+        verbose_name_plural = 'Outbound Emails'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
+
+
+class NotificationJob(models.Model):
+    #Fan-out of one notification to many users, run by the `run_notification_jobs` command
+    
+    KIND_CHOICES = (
+        ('MISSING_PET_ALERT', 'Missing Pet Alert'),
+    )
+    
+    STATUS_CHOICES = (
+        ('PENDING', 'Pending'),
+        ('RUNNING', 'Running'),
+        ('DONE', 'Done'),
+    )
+    
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    object_id = models.CharField(max_length=64, help_text="Primary key of the object the notification is about")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    
+    # Resume point: recipients are streamed in primary key order
+    last_recipient_id = models.UUIDField(null=True, blank=True)
+    
+    sent_count = models.PositiveIntegerField(default=0)
+    failed_count = models.PositiveIntegerField(default=0)
+    
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'notification_jobs'
+        verbose_name = 'Notification Job'
+        verbose_name_plural = 'Notification Jobs'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.object_id} ({self.status})"
+
+
+class NotificationDelivery(models.Model):
+    #Per-recipient state of a NotificationJob, so a resumed job never sends twice
+    
+    STATUS_CHOICES = (
+        ('PENDING', 'Pending'),
+        ('SENDING', 'Sending'),  # left behind by a crash: delivery unknown, not retried
+        ('SENT', 'Sent'),
+        ('FAILED', 'Failed'),
+    )
+    
+    job = models.ForeignKey(NotificationJob, on_delete=models.CASCADE, related_name='deliveries')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='notification_deliveries')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    error = models.TextField(blank=True, default='')
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'notification_deliveries'
+        verbose_name = 'Notification Delivery'
+        verbose_name_plural = 'Notification Deliveries'
+        unique_together = ['job', 'user']
+        indexes = [
+            models.Index(fields=['job', 'status']),
+        ]
+    
+    def __str__(self):
+        return f"{self.job} -> {self.user_id} ({self.status})"
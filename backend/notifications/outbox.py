@@ -0,0 +1,132 @@
+"""
+Outbound email queue
+
+Request code calls enqueue_email(), which is a single INSERT. The
+`run_email_worker` command calls process_outbox() in a loop:
+- claims a batch of due messages (PENDING, or SENDING with an expired lease)
+- sends them over one SMTP connection
+- marks each SENT, or schedules a retry with exponential backoff; after
+  EMAIL_OUTBOX_MAX_ATTEMPTS the message is left FAILED (dead letter)
+Delivery is at-least-once: if a worker dies mid-batch, messages it already
+handed to the relay are sent again once their lease expires.
+"""
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+
+def get_setting(name, default):
+    return getattr(settings, name, default)
+
+
+def enqueue_email(subject, message, recipient_list, html_message=None, from_email=None):
+    """Queue an email for the worker, same arguments as django.core.mail.send_mail"""
+    return OutboundEmail.objects.create(
+        subject=subject,
+        body=message,
+        html_body=html_message or '',
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(recipient_list),
+    )
+
+
+def retry_delay(attempts):
+    """Backoff after the given number of failed attempts: base, 2x base, 4x base, ... capped"""
+    base = get_setting('EMAIL_OUTBOX_RETRY_BACKOFF', 60)
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), get_setting('EMAIL_OUTBOX_MAX_BACKOFF', 3600)))
+
+
+def claim_batch(batch_size):
+    """Lease up to batch_size due messages to this worker"""
+    now = timezone.now()
+    due = (
+        Q(status='PENDING', next_attempt_at__lte=now)
+        | Q(status='SENDING', locked_until__lt=now)
+    )
+    ids = list(
+        OutboundEmail.objects.filter(due)
+        .order_by('next_attempt_at', 'id')
+        .values_list('id', flat=True)[:batch_size]
+    )
+    if not ids:
+        return []
+    
+    # Conditional update, so two workers never claim the same row
+    token = uuid.uuid4().hex
+    OutboundEmail.objects.filter(due, id__in=ids).update(
+        status='SENDING',
+        claim_token=token,
+        locked_until=now + timedelta(seconds=get_setting('EMAIL_OUTBOX_LEASE', 300)),
+    )
+    return list(OutboundEmail.objects.filter(claim_token=token, status='SENDING').order_by('id'))
+
+
+def build_message(email, connection):
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email,
+        to=email.to,
+        connection=connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, 'text/html')
+    return message
+
+
+def mark_failed(email, error):
+    email.attempts += 1
+    email.last_error = str(error)[:2000]
+    email.claim_token = ''
+    email.locked_until = None
+    if email.attempts >= get_setting('EMAIL_OUTBOX_MAX_ATTEMPTS', 5):
+        email.status = 'FAILED'
+    else:
+        email.status = 'PENDING'
+        email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+    email.save(update_fields=['attempts', 'last_error', 'claim_token', 'locked_until', 'status', 'next_attempt_at'])
+
+
+def process_outbox(batch_size=None):
+    """Send one batch of due messages, returns (sent, failed)"""
+    batch = claim_batch(batch_size or get_setting('EMAIL_OUTBOX_BATCH_SIZE', 50))
+    if not batch:
+        return 0, 0
+    
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        for email in batch:
+            mark_failed(email, e)
+        return 0, len(batch)
+    
+    sent = []
+    failed = 0
+    try:
+        for email in batch:
+            # One message at a time so a rejected recipient only fails its own message
+            try:
+                connection.send_messages([build_message(email, connection)])
+            except Exception as e:
+                mark_failed(email, e)
+                failed += 1
+            else:
+                sent.append(email.id)
+    finally:
+        connection.close()
+    
+    OutboundEmail.objects.filter(id__in=sent).update(
+        status='SENT',
+        sent_at=timezone.now(),
+        attempts=F('attempts') + 1,
+        claim_token='',
+        locked_until=None,
+    )
+    return len(sent), failed
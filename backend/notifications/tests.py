@@ -0,0 +1,184 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from contact.models import Feedback
+from contact.utils import send_feedback_confirmation_email
+from core.testing import make_missing_pet, make_user
+from users.models import User
+from .emails import EMAIL_SUBJECTS, get_email_template, send_templated_email
+from .fanout import run_pending_jobs, start_job
+from .models import NotificationDelivery, NotificationJob, OutboundEmail
+from .outbox import enqueue_email, process_outbox
+
+
+class OutboxTests(TestCase):
+
+    def enqueue(self, to='someone@example.com'):
+        return enqueue_email('Hello', 'Plain body', [to], html_message='<p>Html body</p>')
+
+    def test_helpers_enqueue_instead_of_sending(self):
+        feedback = Feedback.objects.create(email='someone@example.com', name='Someone', subject='Hi', message='Hello')
+        self.assertTrue(send_feedback_confirmation_email(feedback))
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboundEmail.objects.get().status, 'PENDING')
+
+    def test_worker_sends_batch_over_one_connection(self):
+        for index in range(3):
+            self.enqueue(f'user{index}@example.com')
+
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.open') as opened:
+            call_command('run_email_worker', '--once', stdout=StringIO())
+        self.assertEqual(opened.call_count, 1)
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(mail.outbox[0].alternatives, [('<p>Html body</p>', 'text/html')])
+        self.assertFalse(OutboundEmail.objects.exclude(status='SENT').exists())
+
+    @override_settings(EMAIL_OUTBOX_MAX_ATTEMPTS=2, EMAIL_OUTBOX_RETRY_BACKOFF=60)
+    def test_failures_back_off_then_dead_letter(self):
+        email = self.enqueue()
+
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError('relay down')):
+            self.assertEqual(process_outbox(), (0, 1))
+            email.refresh_from_db()
+            self.assertEqual((email.status, email.attempts), ('PENDING', 1))
+            self.assertGreater(email.next_attempt_at, timezone.now() + timedelta(seconds=50))
+
+            # Not due yet
+            self.assertEqual(process_outbox(), (0, 0))
+
+            OutboundEmail.objects.update(next_attempt_at=timezone.now())
+            self.assertEqual(process_outbox(), (0, 1))
+
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts, email.last_error), ('FAILED', 2, 'relay down'))
+        self.assertEqual(process_outbox(), (0, 0))
+
+    def test_expired_lease_is_reclaimed(self):
+        email = self.enqueue()
+        OutboundEmail.objects.update(status='SENDING', claim_token='dead', locked_until=timezone.now() - timedelta(seconds=1))
+
+        self.assertEqual(process_outbox(), (1, 0))
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'SENT')
+
+
+class EmailTemplateTests(TestCase):
+
+    def test_every_registered_template_renders(self):
+        for name, subject in EMAIL_SUBJECTS.items():
+            rendered_subject, text, html = get_email_template(name).render({})
+            self.assertEqual(rendered_subject, subject)
+            self.assertIn('Adopt Me', text)
+            self.assertIn('<html>', html)
+            self.assertNotIn('<', text)
+
+    def test_html_is_escaped_text_is_not(self):
+        user = User(email='a@example.com', full_name='Tom & <Jerry>')
+        _, text, html = get_email_template('welcome').render({'user': user})
+        self.assertIn('Hello Tom & <Jerry>,', text)
+        self.assertIn('Hello Tom &amp; &lt;Jerry&gt;,', html)
+
+    def test_templates_compile_once(self):
+        template = get_email_template('welcome')
+        self.assertIs(get_email_template('welcome'), template)
+
+    def test_render_batch_keeps_contexts_apart(self):
+        users = [User(email=f'{name}@example.com', full_name=name) for name in ('Ann', 'Bob')]
+        rendered = get_email_template('welcome').render_batch([{'user': user} for user in users])
+        self.assertIn('Hello Ann,', rendered[0][1])
+        self.assertIn('Hello Bob,', rendered[1][1])
+        self.assertNotIn('Ann', rendered[1][2])
+
+    def test_send_templated_email_queues_both_parts(self):
+        send_templated_email('welcome', {'user': User(full_name='Ann')}, ['ann@example.com'])
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.subject, 'Welcome to Adopt Me!')
+        self.assertIn('Hello Ann,', email.body)
+        self.assertIn('class="button"', email.html_body)
+
+
+@override_settings(NOTIFICATION_SEND_RATE=0)
+class MissingPetAlertTests(TestCase):
+
+    def setUp(self):
+        self.reporter = self.create_user('reporter', 'Pokhara')
+        self.neighbours = [
+            self.create_user(f'near{index}', location)
+            for index, location in enumerate(['Pokhara', 'pokhara', 'POKHARA', 'Pokhara', 'Pokhara'])
+        ]
+        self.create_user('far', 'Kathmandu')
+        self.create_user('inactive', 'Pokhara', is_active=False)
+        self.missing_pet = make_missing_pet(self.reporter, last_seen_location='Pokhara ')
+
+    def create_user(self, name, location, is_active=True):
+        return make_user(f'{name}@example.com', full_name=name, location=location, is_active=is_active)
+
+    def test_alerts_every_neighbour_once(self):
+        job = start_job('MISSING_PET_ALERT', self.missing_pet)
+        run_pending_jobs(chunk_size=2)
+
+        recipients = sorted(message.to[0] for message in mail.outbox)
+        self.assertEqual(recipients, sorted(user.email for user in self.neighbours))
+        self.assertIn('Kitty', mail.outbox[0].body)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.sent_count, job.failed_count), ('DONE', 5, 0))
+        self.assertEqual(run_pending_jobs(), [])
+
+    def test_resumed_job_never_sends_twice(self):
+        job = start_job('MISSING_PET_ALERT', self.missing_pet)
+        sent = []
+        crashed = []
+
+        def crash_on_third(message):
+            if len(sent) == 2 and not crashed:
+                crashed.append(message.to[0])
+                raise SystemExit('worker killed')
+            sent.append(message.to[0])
+            return 1
+
+        with mock.patch('django.core.mail.EmailMessage.send', autospec=True, side_effect=crash_on_third):
+            with self.assertRaises(SystemExit):
+                run_pending_jobs(chunk_size=2)
+            # Not picked up again unless resuming
+            self.assertEqual(run_pending_jobs(chunk_size=2), [])
+            run_pending_jobs(chunk_size=2, resume=True)
+
+        self.assertEqual(len(sent), len(set(sent)))
+        deliveries = dict(NotificationDelivery.objects.filter(job=job).values_list('user__email', 'status'))
+        self.assertEqual(len(deliveries), 5)
+        self.assertEqual(sorted(sent), sorted(email for email, status in deliveries.items() if status == 'SENT'))
+        # The message in flight at the crash is never retried
+        self.assertEqual(list(deliveries.values()).count('SENDING'), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'DONE')
+
+    def test_creating_report_starts_alert_job(self):
+        self.reporter.terms_accepted = True
+        self.reporter.phone_number = '9800000000'
+        self.reporter.save()
+        client = APIClient()
+        client.force_authenticate(self.reporter)
+        response = client.post('/api/v1/missing-pets/', {
+            'name': 'Rex',
+            'category': 'DOG',
+            'gender': 'MALE',
+            'description': 'Brown collar',
+            'last_seen_location': 'Pokhara',
+            'last_seen_date': timezone.now().date(),
+            'contact_phone': '9800000000',
+            'contact_email': self.reporter.email,
+        })
+        self.assertEqual(response.status_code, 201)
+        job = NotificationJob.objects.get()
+        self.assertEqual(job.kind, 'MISSING_PET_ALERT')
+        self.assertEqual(job.status, 'PENDING')
@@ -1,5 +1,6 @@
 from django.contrib import admin
 from .models import RescueContact
+from core.response_cache import invalidate_cached_responses
 
 
 @admin.register(RescueContact)
@@ -42,20 +43,24 @@ class RescueContactAdmin(admin.ModelAdmin):
     
     def verify_contacts(self, request, queryset):
         count = queryset.update(is_verified=True)
+        invalidate_cached_responses('rescue')
         self.message_user(request, f'{count} contact(s) verified.')
     verify_contacts.short_description = 'Verify selected contacts'
     
     def unverify_contacts(self, request, queryset):
         count = queryset.update(is_verified=False)
+        invalidate_cached_responses('rescue')
         self.message_user(request, f'{count} contact(s) unverified.')
     unverify_contacts.short_description = 'Unverify selected contacts'
     
     def activate_contacts(self, request, queryset):
         count = queryset.update(is_active=True)
+        invalidate_cached_responses('rescue')
         self.message_user(request, f'{count} contact(s) activated.')
     activate_contacts.short_description = 'Activate selected contacts'
     
     def deactivate_contacts(self, request, queryset):
         count = queryset.update(is_active=False)
+        invalidate_cached_responses('rescue')
         self.message_user(request, f'{count} contact(s) deactivated.')
     deactivate_contacts.short_description = 'Deactivate selected contacts'
\ No newline at end of file
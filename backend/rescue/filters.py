@@ -1,8 +1,9 @@
 import django_filters
+from geo.filters import NearbyFilterSet
 from .models import RescueContact
 
 
-class RescueContactFilter(django_filters.FilterSet):
+class RescueContactFilter(NearbyFilterSet):
     """
     Advanced filters for Rescue Contacts
     
@@ -12,6 +13,7 @@ class RescueContactFilter(django_filters.FilterSet):
     - is_verified: Boolean (true/false)
     - emergency_service: Boolean (true/false) - for vets only
     - name: Case-insensitive contains search
+    - near, radius_km: Within radius_km (default 10) of "lat,lon", nearest first
     
     Examples:
     - /api/v1/rescue/?type=SHELTER
@@ -19,6 +21,7 @@ class RescueContactFilter(django_filters.FilterSet):
     - /api/v1/rescue/?city=Kathmandu
     - /api/v1/rescue/?is_verified=true
     - /api/v1/rescue/?type=VETERINARIAN&emergency_service=true
+    - /api/v1/rescue/?near=27.7172,85.3240&type=VETERINARIAN&emergency_service=true (nearest first)
     """
     
     # City filter (case-insensitive partial match)
@@ -1,4 +1,5 @@
 from django.db import models
+from geo.gazetteer import locate
 
 
 class RescueContact(models.Model):
@@ -17,6 +18,11 @@ class RescueContact(models.Model):
     address = models.TextField()
     city = models.CharField(max_length=100)
     
+    # Coordinates from the offline geocoder (geo/gazetteer.py), null when unknown
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    geohash = models.CharField(max_length=12, blank=True, default='', db_index=True)
+    
     # Contact details
     phone = models.CharField(max_length=15)
     email = models.EmailField()
@@ -72,6 +78,15 @@ class RescueContact(models.Model):
             models.Index(fields=['is_verified']),
         ]
     
+    def save(self, *args, **kwargs):
+        #Geocode the location text whenever it is saved
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'address', 'city'} & set(update_fields):
+            self.latitude, self.longitude, self.geohash = locate(self.address, self.city)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'latitude', 'longitude', 'geohash'}
+        super().save(*args, **kwargs)
+    
     def __str__(self):
         verified = " ✓" if self.is_verified else ""
         return f"{self.name} ({self.get_type_display()}){verified}"
\ No newline at end of file
@@ -1,27 +1,29 @@
 from rest_framework import serializers
+from core.serializers import ModelSerializer
 from .models import RescueContact
 
 
-class RescueContactListSerializer(serializers.ModelSerializer):
+class RescueContactListSerializer(ModelSerializer):
     type_display = serializers.CharField(source='get_type_display', read_only=True)
+    distance_km = serializers.FloatField(read_only=True)  # only with ?near=
     
     class Meta:
         model = RescueContact
         fields = (
-            'id', 'name', 'type', 'type_display', 'city',
+            'id', 'name', 'type', 'type_display', 'city', 'latitude', 'longitude', 'distance_km',
             'phone', 'email', 'is_verified', 'emergency_service'
         )
         read_only_fields = ('id',)
 
 
-class RescueContactDetailSerializer(serializers.ModelSerializer):
+class RescueContactDetailSerializer(ModelSerializer):
     
     type_display = serializers.CharField(source='get_type_display', read_only=True)
     
     class Meta:
         model = RescueContact
         fields = (
-            'id', 'name', 'type', 'type_display', 'address', 'city',
+            'id', 'name', 'type', 'type_display', 'address', 'city', 'latitude', 'longitude',
             'phone', 'email', 'website', 'description', 'operating_hours',
             'capacity', 'specialization', 'services', 'emergency_service',
             'is_verified', 'is_active', 'created_at', 'updated_at'
@@ -0,0 +1,10 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from core.response_cache import invalidate_cached_responses
+from .models import RescueContact
+
+
+@receiver(post_save, sender=RescueContact)
+@receiver(post_delete, sender=RescueContact)
+def invalidate_rescue_contact_responses(sender, instance, **kwargs):
+    invalidate_cached_responses('rescue', instance.pk)
@@ -1,18 +1,22 @@
 from rest_framework import viewsets, permissions
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import SearchFilter
 from .models import RescueContact
 from .serializers import RescueContactListSerializer, RescueContactDetailSerializer
 from .filters import RescueContactFilter
+from geo.filters import DistanceOrderingFilter
+from core.db_router import ReplicaReadMixin
+from core.response_cache import CachedResponseMixin
 
-class RescueContactViewSet(viewsets.ReadOnlyModelViewSet):
+class RescueContactViewSet(ReplicaReadMixin, CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     queryset = RescueContact.objects.filter(is_active=True)
     permission_classes = [permissions.AllowAny]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, SearchFilter, DistanceOrderingFilter]
     filterset_class = RescueContactFilter
     search_fields = ['name', 'city', 'address', 'description', 'services']
     ordering_fields = ['name', 'city', 'created_at']
     ordering = ['name']
+    cache_namespace = 'rescue'
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -1,10 +1,12 @@
 """
 Main API URL Configuration
-All API endpoints are under /api/v1/
+All API endpoints are under /api/v1/, every view is wrapped for request profiling (core/profiling.py)
 """
 from django.urls import path, include
+from core.profiling import profile_views
+from core.views import CacheStatsView
 
-urlpatterns = [
+urlpatterns = profile_views([
     # Authentication endpoints
     path('auth/', include('users.urls')),
     
@@ -25,4 +27,7 @@ urlpatterns = [
     
     # Feedback/Contact endpoints
     path('feedback/', include('contact.urls')),
-]
\ No newline at end of file
+    
+    # Response cache hit/miss counters (admin only)
+    path('cache-stats/', CacheStatsView.as_view(), name='cache-stats'),
+])
\ No newline at end of file
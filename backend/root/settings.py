@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 from pathlib import Path
 from datetime import timedelta
 import os
+from .database import get_databases
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -57,9 +58,16 @@ INSTALLED_APPS = [
     'donate',
     'contact',
     'terms',
+    'search',
+    'notifications',
+    'geo',
+    'imaging',
+    'benchmarks',
 ]
 
 MIDDLEWARE = [
+    # First, so its total covers the other middleware
+    'core.profiling.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -68,6 +76,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.db_router.PrimaryPinMiddleware',
+    'users.hashers.PasswordHashingBusyMiddleware',
 ]
 
 ROOT_URLCONF = 'root.urls'
@@ -94,12 +104,16 @@ WSGI_APPLICATION = 'root.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
-}
+# DATABASE_URL / DATABASE_REPLICA_URLS, SQLite db.sqlite3 by default (root/database.py)
+# SQLite tuning: SQLITE_PROFILE ('default', or 'production' for WAL, BEGIN IMMEDIATE etc.) and SQLITE_PRAGMAS overrides
+DATABASES = get_databases(BASE_DIR)
+
+# Public list/retrieve reads of these apps go to a replica (core/db_router.py)
+DATABASE_ROUTERS = ['core.db_router.ReplicaRouter']
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+REPLICA_APPS = ('adopt', 'missing_pets', 'rescue', 'terms')
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', 10))  # reads stay on the primary after a write
+REPLICA_LAG_SECONDS = int(os.environ.get('REPLICA_LAG_SECONDS', 10))  # cached responses are rebuilt from the primary this long after an invalidation
 
 # Custom User Model
 AUTH_USER_MODEL = 'users.User'
@@ -123,6 +137,21 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing (users/hashers.py): the first hasher makes new hashes, the
+# rest still verify old ones. Costs from `python manage.py benchmark_password_hasher`
+PASSWORD_HASHERS = [
+    'users.hashers.Argon2PasswordHasher',
+    'users.hashers.PBKDF2PasswordHasher',
+]
+PASSWORD_ARGON2_TIME_COST = int(os.environ.get('PASSWORD_ARGON2_TIME_COST', 2))
+PASSWORD_ARGON2_MEMORY_COST = int(os.environ.get('PASSWORD_ARGON2_MEMORY_COST', 102400))  # KiB
+PASSWORD_ARGON2_PARALLELISM = int(os.environ.get('PASSWORD_ARGON2_PARALLELISM', 8))
+PASSWORD_PBKDF2_ITERATIONS = int(os.environ.get('PASSWORD_PBKDF2_ITERATIONS', 720000))
+
+# Concurrent hashes per process, and how many more may wait before logins get a 429
+PASSWORD_HASHING_WORKERS = int(os.environ.get('PASSWORD_HASHING_WORKERS', os.cpu_count() or 2))
+PASSWORD_HASHING_QUEUE_SIZE = int(os.environ.get('PASSWORD_HASHING_QUEUE_SIZE', PASSWORD_HASHING_WORKERS * 4))
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.0/topics/i18n/
@@ -148,6 +177,14 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Uploaded files are stored once per content under media/blobs/ (imaging/storage.py);
+# `python manage.py gc_media_blobs` deletes files nothing references any more
+STORAGES = {
+    'default': {'BACKEND': 'imaging.storage.ContentAddressedStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+MEDIA_BLOB_GC_GRACE = 3600  # seconds an unreferenced blob is kept
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -156,7 +193,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
@@ -183,6 +220,22 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# In-process Bloom filter of blacklisted refresh token JTIs (users/tokens.py)
+JTI_BLACKLIST_FILTER_CAPACITY = 100_000
+JTI_BLACKLIST_FILTER_ERROR_RATE = 0.001
+JTI_BLACKLIST_SYNC_INTERVAL = 2  # seconds between incremental syncs
+JTI_BLACKLIST_CACHE_ALIAS = 'default'  # shared version counter, other processes sync at once after a blacklist
+
+# Token bucket limits on public write endpoints, per client IP and submitted email (core/throttling.py)
+RATE_LIMIT_CACHE_ALIAS = 'default'
+NUM_PROXIES = int(os.environ.get('NUM_PROXIES', 0))  # reverse proxies appending to X-Forwarded-For, 0 uses REMOTE_ADDR
+RATE_LIMITS = {
+    'register': {'ip': '10/hour'},
+    'forgot_password': {'ip': '10/hour', 'email': '3/hour'},
+    'feedback': {'ip': '10/hour', 'email': '5/hour'},
+    'donation': {'ip': '30/hour'},
+}
+
 # CORS Settings
 CORS_ALLOWED_ORIGINS = [
     'http://localhost:3000',
@@ -207,9 +260,88 @@ EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
 
 DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'Adopt Me <noreply@adoptme.com>')
 
+# Outbound email queue (notifications/outbox.py)
+# Views enqueue; `python manage.py run_email_worker` delivers
+EMAIL_OUTBOX_BATCH_SIZE = int(os.environ.get('EMAIL_OUTBOX_BATCH_SIZE', 50))  # messages per SMTP connection
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.environ.get('EMAIL_OUTBOX_MAX_ATTEMPTS', 5))  # then FAILED (dead letter)
+EMAIL_OUTBOX_RETRY_BACKOFF = 60  # seconds, doubled after every failed attempt
+EMAIL_OUTBOX_MAX_BACKOFF = 3600
+EMAIL_OUTBOX_LEASE = 300  # seconds a worker may hold a batch before another worker reclaims it
+
+# Notification fan-out (notifications/fanout.py), run by `python manage.py run_notification_jobs`
+NOTIFICATION_CHUNK_SIZE = int(os.environ.get('NOTIFICATION_CHUNK_SIZE', 500))  # recipients per chunk
+NOTIFICATION_SEND_RATE = float(os.environ.get('NOTIFICATION_SEND_RATE', 20))  # messages per second, 0 = unlimited
+
+# Image uploads are streamed to temporary files (imaging/uploads.py)
+IMAGE_UPLOAD_MAX_SIZE = 5 * 1024 * 1024  # bytes per file, enforced while the body is read
+IMAGE_UPLOAD_MAX_FILES = 5  # per request
+
+# Image variants (imaging/pipeline.py), rendered by `python manage.py process_images`
+IMAGE_VARIANT_WIDTHS = [320, 640, 1280]  # px, srcset candidates
+IMAGE_VARIANT_FORMATS = ['avif', 'webp']  # best first, skipped if Pillow can't encode them
+IMAGE_VARIANT_QUALITY = {'avif': 60, 'webp': 80}
+
+# Photo matching (imaging/matching.py), /api/v1/missing-pets/{id}/possible-matches/
+IMAGE_MATCH_MAX_DISTANCE = 10  # differing bits out of 64 in the perceptual hash
+IMAGE_MATCH_LIMIT = 20
+
+# Attribute matching of missing pets (missing_pets/matching.py), /api/v1/missing-pets/{id}/suggested-matches/
+MATCH_MIN_SCORE = 0.5  # 0..1, lower-scoring pairs are not stored
+MATCH_FOUND_REPORT_DAYS = 30  # FOUND reports older than this are no longer candidates
+MATCH_DISTANCE_SCALE_KM = 10  # location score falls to 1/e at this distance
+MATCH_LIMIT = 20
+
 # Frontend URL
 FRONTEND_URL = 'http://localhost:3000'
 
+# Full-text search
+# Backend is picked by database vendor (SQLite FTS5 / PostgreSQL tsvector);
+# set SEARCH_BACKEND to a dotted path to override it
+SEARCH_BACKEND = os.environ.get('SEARCH_BACKEND') or None
+SEARCH_CONFIG = os.environ.get('SEARCH_CONFIG', 'english')  # PostgreSQL text search configuration
+
+# Cache
+# Local memory by default; set REDIS_URL in production so every worker
+# shares the response cache (needs the `redis` package)
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+            'LOCATION': os.environ.get('CACHE_LOCATION', 'adoptme'),
+        }
+    }
+
+# Authenticated users, keyed by token user_id (core/authentication.py)
+AUTH_USER_CACHE_ALIAS = 'default'
+AUTH_USER_CACHE_TIMEOUT = int(os.environ.get('AUTH_USER_CACHE_TIMEOUT', 60))  # seconds
+
+# Public list/detail responses (core/response_cache.py)
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get('RESPONSE_CACHE_TIMEOUT', 300))  # seconds
+
+# Request profiling (core/profiling.py)
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', 0))  # fraction of requests profiled without X-Profile
+PROFILING_TOKEN = os.environ.get('PROFILING_TOKEN', '')  # X-Profile value that enables profiling, any value while DEBUG if unset
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.profiling': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
 # API Documentation
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Pet Adoption & Rescue API',
@@ -0,0 +1,21 @@
+"""
+Django's SQLite backend with the PRAGMAS and TRANSACTION_MODE of the
+database settings (root/database.py SQLITE_PROFILES); Django 5.0 has no
+option for either
+"""
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.settings_dict.get('PRAGMAS', {}).items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        # IMMEDIATE takes the write lock up front (waiting busy_timeout), a deferred
+        # BEGIN that reads first fails at once when another writer got in between
+        mode = self.settings_dict.get('TRANSACTION_MODE')
+        self.cursor().execute(f'BEGIN {mode}' if mode else 'BEGIN')
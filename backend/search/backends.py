@@ -0,0 +1,254 @@
+"""
+Full-text search backends
+
+- SQLiteFTSBackend: FTS5 virtual table (local development)
+- PostgresSearchBackend: weighted tsvector table with a GIN index (production)
+- DatabaseSearchBackend: icontains fallback when neither is available
+
+Indexed objects get a SearchDocument row; the vendor table is keyed by
+SearchDocument.id, so incremental updates and deletes are primary-key
+operations and searches join from the full-text match back to the model.
+"""
+import re
+from abc import ABCMeta, abstractmethod
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from .indexes import get_index_fields, get_document_values
+from .models import SearchDocument
+
+# Cap the number of terms so a crafted query can't build a huge match expression
+MAX_TERMS = 10
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(query):
+    """Split a user query into plain word tokens (no operators or quotes)"""
+    return TOKEN_RE.findall(query)[:MAX_TERMS]
+
+
+class DatabaseSearchBackend:
+    """icontains search over the indexed fields, no index maintenance"""
+
+    # Whether search() annotates a meaningful `search_rank`
+    ranked = False
+
+    def __init__(self, using='default'):
+        self.using = using
+
+    @property
+    def connection(self):
+        return connections[self.using]
+
+    def is_available(self):
+        return True
+
+    def get_doc_type(self, model):
+        return model._meta.label_lower
+
+    def get_doc_id(self, model, pk):
+        """Primary key exactly as stored, so it can be joined against the model table"""
+        return str(model._meta.pk.get_db_prep_value(pk, self.connection))
+
+    def index_many(self, model, instances, fields):
+        pass
+
+    def remove(self, model, pk):
+        pass
+
+    def clear(self, model):
+        pass
+
+    def search(self, queryset, query):
+        fields = get_index_fields(queryset.model)
+        for term in tokenize(query):
+            condition = Q()
+            for field in fields:
+                condition |= Q(**{f'{field}__icontains': term})
+            queryset = queryset.filter(condition)
+        return queryset
+
+
+class FullTextSearchBackend(DatabaseSearchBackend, metaclass=ABCMeta):
+    """Shared document bookkeeping for the vendor full-text backends"""
+
+    ranked = True
+
+    # Vendor table keyed by search_documents.id
+    table = None
+
+    def is_available(self):
+        with self.connection.cursor() as cursor:
+            return self.table in self.connection.introspection.table_names(cursor)
+
+    def split_document(self, values):
+        #Short fields are weighted above the long free-text body (last field)
+        return ' '.join(values[:-1]), values[-1]
+
+    def index_many(self, model, instances, fields):
+        doc_type = self.get_doc_type(model)
+        documents = {self.get_doc_id(model, instance.pk): instance for instance in instances}
+        if not documents:
+            return
+
+        SearchDocument.objects.using(self.using).bulk_create(
+            [SearchDocument(doc_type=doc_type, doc_id=doc_id) for doc_id in documents],
+            ignore_conflicts=True
+        )
+        row_ids = dict(
+            SearchDocument.objects.using(self.using)
+            .filter(doc_type=doc_type, doc_id__in=list(documents))
+            .values_list('doc_id', 'id')
+        )
+        rows = [
+            (row_ids[doc_id], *self.split_document(get_document_values(instance, fields)))
+            for doc_id, instance in documents.items()
+        ]
+        with self.connection.cursor() as cursor:
+            self.write_rows(cursor, rows)
+
+    def remove(self, model, pk):
+        documents = SearchDocument.objects.using(self.using).filter(
+            doc_type=self.get_doc_type(model),
+            doc_id=self.get_doc_id(model, pk)
+        )
+        row_ids = list(documents.values_list('id', flat=True))
+        if row_ids:
+            with self.connection.cursor() as cursor:
+                cursor.executemany(
+                    f'DELETE FROM {self.quoted_table} WHERE {self.row_id_column} = %s',
+                    [(row_id,) for row_id in row_ids]
+                )
+            documents.delete()
+
+    def clear(self, model):
+        doc_type = self.get_doc_type(model)
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.quoted_table} WHERE {self.row_id_column} IN '
+                f'(SELECT id FROM search_documents WHERE doc_type = %s)',
+                [doc_type]
+            )
+        SearchDocument.objects.using(self.using).filter(doc_type=doc_type).delete()
+
+    @property
+    def quoted_table(self):
+        return self.connection.ops.quote_name(self.table)
+
+    def pk_column(self, model):
+        quote = self.connection.ops.quote_name
+        return f'{quote(model._meta.db_table)}.{quote(model._meta.pk.column)}'
+
+    @abstractmethod
+    def write_rows(self, cursor, rows):
+        """Insert or replace (row_id, title, body) rows"""
+
+
+class SQLiteFTSBackend(FullTextSearchBackend):
+
+    table = 'search_documents_fts'
+    row_id_column = 'rowid'
+
+    # bm25 column weights for (title, body)
+    weights = (5.0, 1.0)
+
+    def write_rows(self, cursor, rows):
+        cursor.executemany(
+            f'DELETE FROM {self.quoted_table} WHERE rowid = %s',
+            [(row_id,) for row_id, _, _ in rows]
+        )
+        cursor.executemany(
+            f'INSERT INTO {self.quoted_table} (rowid, title, body) VALUES (%s, %s, %s)',
+            rows
+        )
+
+    def search(self, queryset, query):
+        terms = tokenize(query)
+        if not terms:
+            return queryset
+
+        # Every term must match, as a prefix ("labra" finds "Labrador")
+        match = ' '.join(f'"{term}"*' for term in terms)
+        table = self.quoted_table
+        weights = ', '.join(str(weight) for weight in self.weights)
+        return queryset.extra(
+            select={'search_rank': f'-bm25({table}, {weights})'},
+            tables=['search_documents', self.table],
+            where=[
+                'search_documents.doc_type = %s',
+                f'search_documents.doc_id = {self.pk_column(queryset.model)}',
+                f'{table}.rowid = search_documents.id',
+                f'{table} MATCH %s',
+            ],
+            params=[self.get_doc_type(queryset.model), match],
+        )
+
+
+class PostgresSearchBackend(FullTextSearchBackend):
+
+    table = 'search_documents_tsv'
+    row_id_column = 'document_id'
+
+    @property
+    def config(self):
+        return getattr(settings, 'SEARCH_CONFIG', 'english')
+
+    def write_rows(self, cursor, rows):
+        cursor.executemany(
+            f'INSERT INTO {self.quoted_table} (document_id, vector) VALUES ('
+            f'%s, setweight(to_tsvector(%s::regconfig, %s), \'A\') || '
+            f'setweight(to_tsvector(%s::regconfig, %s), \'B\')) '
+            f'ON CONFLICT (document_id) DO UPDATE SET vector = EXCLUDED.vector',
+            [(row_id, self.config, title, self.config, body) for row_id, title, body in rows]
+        )
+
+    def search(self, queryset, query):
+        terms = tokenize(query)
+        if not terms:
+            return queryset
+
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        model = queryset.model
+        pk_type = model._meta.pk.db_type(self.connection)
+        table = self.quoted_table
+        return queryset.extra(
+            select={'search_rank': f'ts_rank_cd({table}.vector, to_tsquery(%s::regconfig, %s))'},
+            select_params=[self.config, tsquery],
+            tables=['search_documents', self.table],
+            where=[
+                'search_documents.doc_type = %s',
+                f'{self.pk_column(model)} = CAST(search_documents.doc_id AS {pk_type})',
+                f'{table}.document_id = search_documents.id',
+                f'{table}.vector @@ to_tsquery(%s::regconfig, %s)',
+            ],
+            params=[self.get_doc_type(model), self.config, tsquery],
+        )
+
+
+VENDOR_BACKENDS = {
+    'sqlite': SQLiteFTSBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+@lru_cache(maxsize=None)
+def get_search_backend(using='default'):
+    """
+    Backend for a database alias: settings.SEARCH_BACKEND if set, otherwise
+    picked by vendor. Falls back to icontains when the full-text table is
+    missing (e.g. SQLite built without FTS5).
+    """
+    backend_path = getattr(settings, 'SEARCH_BACKEND', None)
+    if backend_path:
+        return import_string(backend_path)(using)
+
+    backend_class = VENDOR_BACKENDS.get(connections[using].vendor, DatabaseSearchBackend)
+    backend = backend_class(using)
+    if not backend.is_available():
+        return DatabaseSearchBackend(using)
+    return backend
@@ -0,0 +1,31 @@
+from rest_framework.filters import SearchFilter
+from rest_framework.settings import api_settings
+from .backends import get_search_backend
+from .indexes import get_index_fields
+
+
+class FullTextSearchFilter(SearchFilter):
+    """
+    Drop-in replacement for DRF's SearchFilter backed by the full-text index
+    
+    - ?search= terms are AND-ed and prefix matched (labra -> Labrador)
+    - Results are ordered by relevance unless ?ordering= is given
+    - Models that aren't in search.indexes fall back to SearchFilter
+    
+    Must come after OrderingFilter in filter_backends so relevance ordering
+    isn't overwritten by the view's default ordering.
+    """
+    
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms or get_index_fields(queryset.model) is None:
+            return super().filter_queryset(request, queryset, view)
+        
+        backend = get_search_backend(queryset.db)
+        queryset = backend.search(queryset, ' '.join(terms))
+        
+        if backend.ranked and not request.query_params.get(api_settings.ORDERING_PARAM):
+            ordering = queryset.query.order_by or queryset.model._meta.ordering
+            queryset = queryset.order_by('-search_rank', *ordering)
+        
+        return queryset
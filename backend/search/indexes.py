@@ -0,0 +1,28 @@
+"""
+Models that are kept in the full-text index and the fields that make up
+their search document. Field order matters: earlier fields rank higher.
+"""
+from django.apps import apps
+
+SEARCH_INDEXES = {
+    'adopt.Pet': ('name', 'breed', 'location', 'description'),
+    'missing_pets.MissingPet': ('name', 'breed', 'last_seen_location', 'description'),
+}
+
+
+def get_indexed_models():
+    """Return (model, fields) pairs for every indexed model"""
+    return [
+        (apps.get_model(label), fields)
+        for label, fields in SEARCH_INDEXES.items()
+    ]
+
+
+def get_index_fields(model):
+    """Return the indexed fields for a model, or None if it isn't indexed"""
+    return SEARCH_INDEXES.get(model._meta.label)
+
+
+def get_document_values(instance, fields):
+    """Field values of an instance, in index order"""
+    return [str(getattr(instance, field) or '') for field in fields]
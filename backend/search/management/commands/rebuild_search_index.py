@@ -0,0 +1,47 @@
+from itertools import islice
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from search.backends import get_search_backend
+from search.indexes import get_indexed_models
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for pet listings and missing pet reports'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model',
+            action='append',
+            help='Only rebuild this model, e.g. adopt.Pet (can be repeated)'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+    
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        batch_size = options['batch_size']
+        selected = options['model']
+        
+        indexed = get_indexed_models()
+        if selected:
+            unknown = set(selected) - {model._meta.label for model, _ in indexed}
+            if unknown:
+                raise CommandError(f"Not indexed: {', '.join(sorted(unknown))}")
+        
+        self.stdout.write(f'Using {backend.__class__.__name__}')
+        
+        for model, fields in indexed:
+            if selected and model._meta.label not in selected:
+                continue
+            
+            backend.clear(model)
+            
+            total = 0
+            rows = model._default_manager.order_by('pk').only('pk', *fields).iterator(chunk_size=batch_size)
+            while batch := list(islice(rows, batch_size)):
+                with transaction.atomic():
+                    backend.index_many(model, batch, fields)
+                total += len(batch)
+            
+            self.stdout.write(self.style.SUCCESS(
+                f'Indexed {total} {model._meta.verbose_name_plural}'
+            ))
@@ -0,0 +1,58 @@
+# Generated by Django 5.0 on 2026-10-17 20:13
+
+from django.db import migrations, models
+
+
+def create_fulltext_table(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+            has_fts5 = cursor.fetchone()[0]
+        if not has_fts5:
+            # search.backends falls back to icontains
+            return
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE search_documents_fts USING fts5("
+            "title, body, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+    elif connection.vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE TABLE search_documents_tsv ("
+            "document_id bigint PRIMARY KEY REFERENCES search_documents (id) ON DELETE CASCADE, "
+            "vector tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX search_documents_tsv_vector_idx ON search_documents_tsv USING GIN (vector)"
+        )
+
+
+def drop_fulltext_table(apps, schema_editor):
+    schema_editor.execute('DROP TABLE IF EXISTS search_documents_fts')
+    schema_editor.execute('DROP TABLE IF EXISTS search_documents_tsv')
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('doc_type', models.CharField(help_text='Model label, e.g. adopt.pet', max_length=100)),
+                ('doc_id', models.CharField(help_text='Primary key as stored in the database', max_length=64)),
+            ],
+            options={
+                'verbose_name': 'Search Document',
+                'verbose_name_plural': 'Search Documents',
+                'db_table': 'search_documents',
+                'unique_together': {('doc_type', 'doc_id')},
+            },
+        ),
+        migrations.RunPython(create_fulltext_table, drop_fulltext_table),
+    ]
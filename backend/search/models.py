@@ -0,0 +1,17 @@
+from django.db import models
+
+
+class SearchDocument(models.Model):
+    #One row per indexed object; its id keys the vendor full-text table
+    
+    doc_type = models.CharField(max_length=100, help_text="Model label, e.g. adopt.pet")
+    doc_id = models.CharField(max_length=64, help_text="Primary key as stored in the database")
+    
+    class Meta:
+        db_table = 'search_documents'
+        verbose_name = 'Search Document'
+        verbose_name_plural = 'Search Documents'
+        unique_together = ('doc_type', 'doc_id')
+    
+    def __str__(self):
+        return f"{self.doc_type}:{self.doc_id}"
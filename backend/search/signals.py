@@ -0,0 +1,21 @@
+from django.db.models.signals import post_save, post_delete
+from .backends import get_search_backend
+from .indexes import get_indexed_models, get_index_fields
+
+
+def update_search_document(sender, instance, using, update_fields=None, **kwargs):
+    #Re-index on save, unless the save only touched non-indexed fields
+    fields = get_index_fields(sender)
+    if update_fields is not None and not set(update_fields) & set(fields):
+        return
+    get_search_backend(using).index_many(sender, [instance], fields)
+
+
+def remove_search_document(sender, instance, using, **kwargs):
+    get_search_backend(using).remove(sender, instance.pk)
+
+
+def connect_signals():
+    for model, fields in get_indexed_models():
+        post_save.connect(update_search_document, sender=model, dispatch_uid=f'search_index_{model._meta.label}')
+        post_delete.connect(remove_search_document, sender=model, dispatch_uid=f'search_remove_{model._meta.label}')
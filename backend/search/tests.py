@@ -0,0 +1,69 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from rest_framework.test import APITestCase
+
+from adopt.models import Pet
+from core.testing import make_pet, make_user
+from .backends import get_search_backend, SQLiteFTSBackend
+from .models import SearchDocument
+
+
+class FullTextSearchTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.owner = make_user()
+
+    def create_pet(self, **fields):
+        return make_pet(self.owner, **fields)
+
+    def search(self, query, **params):
+        response = self.client.get('/api/v1/pets/', {'search': query, **params})
+        self.assertEqual(response.status_code, 200)
+        return [pet['name'] for pet in response.data['results']]
+
+    def test_uses_fts5_backend_on_sqlite(self):
+        self.assertIsInstance(get_search_backend(), SQLiteFTSBackend)
+
+    def test_prefix_terms_are_anded(self):
+        self.create_pet(name='Rex', breed='Labrador Retriever', location='Pokhara')
+        self.create_pet(name='Max', breed='Labrador', location='Kathmandu')
+        self.create_pet(name='Tom', breed='Persian', category='CAT')
+
+        self.assertEqual(sorted(self.search('labra')), ['Max', 'Rex'])
+        self.assertEqual(self.search('labra pokh'), ['Rex'])
+        self.assertEqual(self.search('"); DROP TABLE pets; --'), [])
+
+    def test_results_ranked_by_relevance(self):
+        self.create_pet(name='Ginger', description='Looks a bit like a husky')
+        self.create_pet(name='Husky', breed='Siberian Husky')
+
+        self.assertEqual(self.search('husky'), ['Husky', 'Ginger'])
+        # explicit ordering wins over relevance
+        self.assertEqual(self.search('husky', ordering='name'), ['Ginger', 'Husky'])
+
+    def test_index_follows_updates_and_deletes(self):
+        pet = self.create_pet(name='Shadow')
+        self.assertEqual(self.search('shadow'), ['Shadow'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            pet.name = 'Luna'
+            pet.save()
+        self.assertEqual(self.search('shadow'), [])
+        self.assertEqual(self.search('luna'), ['Luna'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            pet.delete()
+        self.assertEqual(self.search('luna'), [])
+        self.assertFalse(SearchDocument.objects.exists())
+
+    def test_rebuild_command(self):
+        self.create_pet(name='Bella')
+        get_search_backend().clear(Pet)
+        self.assertEqual(self.search('bella'), [])
+
+        call_command('rebuild_search_index', '--model', 'adopt.Pet', stdout=StringIO())
+        cache.clear()  # the rebuild doesn't touch the models, so responses stay cached
+        self.assertEqual(self.search('bella'), ['Bella'])
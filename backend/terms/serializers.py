@@ -1,8 +1,9 @@
 from rest_framework import serializers
+from core.serializers import ModelSerializer
 from .models import TermsAndConditions, TermsAcceptance
 
 
-class TermsAndConditionsSerializer(serializers.ModelSerializer):
+class TermsAndConditionsSerializer(ModelSerializer):
     
     class Meta:
         model = TermsAndConditions
@@ -13,7 +14,7 @@ class TermsAndConditionsSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'created_at', 'updated_at')
 
 
-class TermsAcceptanceSerializer(serializers.ModelSerializer):
+class TermsAcceptanceSerializer(ModelSerializer):
     
     terms_version = serializers.CharField(source='terms.version', read_only=True)
     user_email = serializers.EmailField(source='user.email', read_only=True)
@@ -1,13 +1,15 @@
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from core.db_router import ReplicaReadMixin
+from core.throttling import get_client_ip
 from .models import TermsAndConditions, TermsAcceptance
 from .serializers import (
     TermsAndConditionsSerializer, TermsAcceptanceSerializer, AcceptTermsSerializer
 )
 
 
-class TermsViewSet(viewsets.ReadOnlyModelViewSet):
+class TermsViewSet(ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
     queryset = TermsAndConditions.objects.all()
     serializer_class = TermsAndConditionsSerializer
     permission_classes = [permissions.AllowAny]
@@ -83,9 +85,4 @@ class TermsViewSet(viewsets.ReadOnlyModelViewSet):
     
     def get_client_ip(self, request):
         #Get client IP address
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
\ No newline at end of file
+        return get_client_ip(request)
\ No newline at end of file
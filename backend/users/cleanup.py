@@ -0,0 +1,35 @@
+"""
+Scheduled cleanup of expired authentication tokens
+
+Email verification, password reset and JWT refresh tokens are useless
+once expired (a used reset token expires an hour later at most), but
+nothing deleted them. prune_expired_tokens() deletes them in bounded
+batches (core/batch_delete.py) so it can run next to live traffic; run
+it from cron with `python manage.py prune_expired_tokens`.
+"""
+from collections import Counter
+
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+from core.batch_delete import delete_in_batches
+from .models import EmailVerificationToken, PasswordResetToken
+
+
+def expired_tokens(now=None):
+    """[(model, expired queryset, index to walk)]"""
+    now = now or timezone.now()
+    return [
+        (EmailVerificationToken, EmailVerificationToken.objects.expired(now), 'expires_at'),
+        (PasswordResetToken, PasswordResetToken.objects.expired(now), 'expires_at'),
+        # simplejwt's table has no expires_at index, walk the primary key (blacklist rows cascade)
+        (OutstandingToken, OutstandingToken.objects.filter(expires_at__lte=now), 'pk'),
+    ]
+
+
+def prune_expired_tokens(batch_size=1000, pause=0, now=None):
+    """Delete expired tokens, returns a Counter of {model label: rows deleted}"""
+    deleted = Counter()
+    for _, queryset, index in expired_tokens(now):
+        deleted.update(delete_in_batches(queryset, batch_size=batch_size, pause=pause, index=index))
+    return deleted
@@ -0,0 +1,145 @@
+"""
+Password hashers with configurable cost, run on a bounded worker pool
+
+Hashing is deliberately slow (tens to hundreds of ms of CPU), so a login
+burst used to tie up every request worker at once. User.set_password and
+User.check_password (and so authenticate(), registration, password change
+and reset) hand the hashing to HashingPool: at most
+PASSWORD_HASHING_WORKERS hashes run at a time, up to
+PASSWORD_HASHING_QUEUE_SIZE more wait, anything beyond is rejected with a
+429 (PasswordHashingBusy) instead of queueing behind the burst. DRF turns
+the exception into its 429 response; PasswordHashingBusyMiddleware does the
+same for Django views such as the admin login. The hash libraries release
+the GIL, so the worker threads hash in parallel.
+
+The costs come from settings (PASSWORD_ARGON2_*, PASSWORD_PBKDF2_ITERATIONS);
+`python manage.py benchmark_password_hasher` picks values that fit a target
+latency on the host. Hashes made with other costs or the other algorithm
+still verify and are rehashed on the next successful login.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.http import HttpResponse
+from rest_framework.exceptions import Throttled
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+
+    @property
+    def time_cost(self):
+        return getattr(settings, 'PASSWORD_ARGON2_TIME_COST', 2)
+
+    @property
+    def memory_cost(self):
+        return getattr(settings, 'PASSWORD_ARGON2_MEMORY_COST', 102400)  # KiB
+
+    @property
+    def parallelism(self):
+        return getattr(settings, 'PASSWORD_ARGON2_PARALLELISM', 8)
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+
+    @property
+    def iterations(self):
+        return getattr(settings, 'PASSWORD_PBKDF2_ITERATIONS', hashers.PBKDF2PasswordHasher.iterations)
+
+
+class PasswordHashingBusy(Throttled):
+    default_detail = 'Too many password checks in progress, try again shortly.'
+    default_code = 'password_hashing_busy'
+
+
+class PasswordHashingBusyMiddleware:
+    """429 instead of a 500 when a non-DRF view (admin login, authenticate()) finds the pool full"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_exception(self, request, exception):
+        if not isinstance(exception, PasswordHashingBusy):
+            return None
+        response = HttpResponse(exception.detail, status=exception.status_code, content_type='text/plain')
+        response['Retry-After'] = str(exception.wait)
+        return response
+
+
+class HashingPool:
+    """Thread pool that rejects work instead of queueing without bound"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.executor = None
+        self.workers = None
+        self.in_flight = 0
+        self.peak = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def get_limits(self):
+        workers = getattr(settings, 'PASSWORD_HASHING_WORKERS', None) or os.cpu_count() or 2
+        return workers, getattr(settings, 'PASSWORD_HASHING_QUEUE_SIZE', workers * 4)
+
+    def run(self, function, *args):
+        workers, queue_size = self.get_limits()
+        with self.lock:
+            if self.in_flight >= workers + queue_size:
+                self.rejected += 1
+                raise PasswordHashingBusy(wait=1)
+            if self.workers != workers:
+                #First use, or PASSWORD_HASHING_WORKERS changed
+                if self.executor is not None:
+                    self.executor.shutdown(wait=False)
+                self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hashing')
+                self.workers = workers
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            executor = self.executor
+
+        try:
+            return executor.submit(function, *args).result()
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+                self.completed += 1
+
+    def stats(self):
+        workers, queue_size = self.get_limits()
+        with self.lock:
+            return {
+                'workers': workers,
+                'queue_size': queue_size,
+                'in_flight': self.in_flight,
+                'queued': max(0, self.in_flight - workers),
+                'peak': self.peak,
+                'completed': self.completed,
+                'rejected': self.rejected,
+            }
+
+
+pool = HashingPool()
+
+
+def verify(password, encoded):
+    #(valid, must_update) without the rehash, which saves and so stays on the request thread
+    if not hashers.check_password(password, encoded):
+        return False, False
+    preferred = hashers.get_hasher('default')
+    hasher = hashers.identify_hasher(encoded)
+    return True, hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
+
+
+def make_password(password):
+    return pool.run(hashers.make_password, password)
+
+
+def check_password(password, encoded):
+    """(valid, must_update) for a raw password against a stored hash"""
+    return pool.run(verify, password, encoded)
@@ -0,0 +1,52 @@
+import statistics
+import time
+from django.contrib.auth.hashers import get_hasher
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+
+class Command(BaseCommand):
+    help = 'Measure password hashing on this host and suggest the highest cost within a target latency'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--algorithm', choices=['argon2', 'pbkdf2_sha256'], default=None, help='Default: the current PASSWORD_HASHERS default')
+        parser.add_argument('--target-ms', type=float, default=250, help='Acceptable time for one hash')
+        parser.add_argument('--samples', type=int, default=3, help='Hashes timed per cost (median is used)')
+    
+    def measure(self, algorithm, samples, **costs):
+        #Median milliseconds per hash with the given cost settings
+        with override_settings(**costs):
+            hasher = get_hasher(algorithm)
+            timings = []
+            for _ in range(samples):
+                started = time.perf_counter()
+                hasher.encode('benchmark-password', hasher.salt())
+                timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
+    
+    def handle(self, *args, **options):
+        algorithm = options['algorithm'] or get_hasher('default').algorithm
+        target, samples = options['target_ms'], options['samples']
+        
+        if algorithm == 'argon2':
+            # Memory cost and parallelism stay as configured, time cost is raised until the target
+            best = None
+            for time_cost in range(1, 33):
+                elapsed = self.measure(algorithm, samples, PASSWORD_ARGON2_TIME_COST=time_cost)
+                self.stdout.write(f'time_cost={time_cost}: {elapsed:.1f}ms')
+                if elapsed > target:
+                    break
+                best = (time_cost, elapsed)
+            if best is None:
+                raise CommandError(f'time_cost=1 already takes over {target}ms, lower PASSWORD_ARGON2_MEMORY_COST')
+            setting = ('PASSWORD_ARGON2_TIME_COST', best[0])
+        else:
+            # PBKDF2 time is linear in the iteration count: extrapolate from a sample, then check
+            base = 100_000
+            per_iteration = self.measure(algorithm, samples, PASSWORD_PBKDF2_ITERATIONS=base) / base
+            iterations = max(10_000, int(target / per_iteration) // 10_000 * 10_000)
+            elapsed = self.measure(algorithm, samples, PASSWORD_PBKDF2_ITERATIONS=iterations)
+            best = (iterations, elapsed)
+            setting = ('PASSWORD_PBKDF2_ITERATIONS', iterations)
+        
+        self.stdout.write(self.style.SUCCESS(f'{setting[0]}={setting[1]}  # {best[1]:.1f}ms per hash'))
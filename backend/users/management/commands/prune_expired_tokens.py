@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from users.cleanup import prune_expired_tokens
+
+
+class Command(BaseCommand):
+    help = 'Delete expired email verification, password reset and JWT refresh tokens in batches'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows deleted per transaction')
+        parser.add_argument('--pause', type=float, default=0, help='Seconds to sleep between batches')
+    
+    def handle(self, *args, **options):
+        deleted = prune_expired_tokens(batch_size=options['batch_size'], pause=options['pause'])
+        # Every table is reported, cascaded blacklist rows included
+        for label, count in sorted(deleted.items()):
+            self.stdout.write(f'{label}: {count}')
+        self.stdout.write(self.style.SUCCESS(f'Deleted {sum(deleted.values())} expired token row(s)'))
@@ -0,0 +1,19 @@
+# Generated by Django 5.0 on 2026-10-17 20:23
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0002_emailverificationtoken_passwordresettoken'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.text.Lower('location'), models.F('id'), name='users_location_lower_idx'),
+        ),
+    ]
@@ -1,6 +1,9 @@
 from django.db import models
+from django.db.models import ExpressionWrapper, F, Q
+from django.db.models.functions import Lower
 from django.contrib.auth.models import AbstractBaseUser,AbstractUser,PermissionsMixin,BaseUserManager
 from django.utils import timezone
+from . import hashers
 import uuid
 import secrets
 import string
@@ -79,6 +82,10 @@ class User(AbstractBaseUser, PermissionsMixin):
         verbose_name = 'User'
         verbose_name_plural = 'Users'
         ordering = ['-date_joined']
+        indexes = [
+            # Missing pet alerts look users up by case-insensitive location
+            models.Index(Lower('location'), F('id'), name='users_location_lower_idx'),
+        ]
     
     def __str__(self):
         return self.email
@@ -89,6 +96,20 @@ class User(AbstractBaseUser, PermissionsMixin):
     def get_short_name(self):
         return self.full_name.split()[0] if self.full_name else self.email
     
+    def set_password(self, raw_password):
+        #Hash on the bounded pool (users/hashers.py), may raise PasswordHashingBusy
+        self.password = hashers.make_password(raw_password)
+        self._password = raw_password
+    
+    def check_password(self, raw_password):
+        valid, must_update = hashers.check_password(raw_password, self.password)
+        if must_update:
+            # Stored with an old algorithm or cost, rehash with the current one
+            self.set_password(raw_password)
+            self._password = None
+            self.save(update_fields=['password'])
+        return valid
+    
     def accept_terms(self, version):
         #Mark terms as accepted
         self.terms_accepted = True
@@ -97,6 +118,30 @@ class User(AbstractBaseUser, PermissionsMixin):
         self.save(update_fields=['terms_accepted', 'terms_accepted_at', 'terms_version'])
 
 
+class ExpiringTokenQuerySet(models.QuerySet):
+    """Expiry filters done in SQL on the indexed expires_at column"""
+    
+    def validity(self):
+        #Condition for a token that can still be used
+        return Q(expires_at__gt=timezone.now())
+    
+    def expired(self, now=None):
+        return self.filter(expires_at__lte=now or timezone.now())
+    
+    def valid(self):
+        return self.filter(self.validity())
+    
+    def with_validity(self):
+        #Annotate is_current so one query both finds a token and tells why it can't be used
+        return self.annotate(is_current=ExpressionWrapper(self.validity(), output_field=models.BooleanField()))
+
+
+class PasswordResetTokenQuerySet(ExpiringTokenQuerySet):
+    
+    def validity(self):
+        return super().validity() & Q(is_used=False)
+
+
 class EmailVerificationToken(models.Model):
     """Model to store email verification tokens"""
     
@@ -109,10 +154,15 @@ class EmailVerificationToken(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     expires_at = models.DateTimeField()
     
+    objects = ExpiringTokenQuerySet.as_manager()
+    
     class Meta:
         db_table = 'email_verification_tokens'
         verbose_name = 'Email Verification Token'
         verbose_name_plural = 'Email Verification Tokens'
+        indexes = [
+            models.Index(fields=['expires_at']),
+        ]
     
     def __str__(self):
         return f"Email verification for {self.user.email}"
@@ -140,11 +190,16 @@ class PasswordResetToken(models.Model):
     expires_at = models.DateTimeField()
     is_used = models.BooleanField(default=False)
     
+    objects = PasswordResetTokenQuerySet.as_manager()
+    
     class Meta:
         db_table = 'password_reset_tokens'
         verbose_name = 'Password Reset Token'
         verbose_name_plural = 'Password Reset Tokens'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['expires_at']),
+        ]
     
     def __str__(self):
         return f"Password reset for {self.user.email}"
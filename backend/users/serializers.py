@@ -1,13 +1,17 @@
 from rest_framework import serializers
+from core.serializers import ModelSerializer
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer as BaseTokenRefreshSerializer
 from django.contrib.auth.password_validation import validate_password
 from django.contrib.auth import authenticate
 from django.utils import timezone
 from datetime import timedelta
-from .models import User, PasswordResetToken, EmailVerificationToken
+from .models import User
 from .email_service import EmailService
+from .token_service import TokenUnavailable, resolve_reset_token, resolve_verification_token
+from .tokens import RefreshToken
 
 
-class UserRegistrationSerializer(serializers.ModelSerializer):
+class UserRegistrationSerializer(ModelSerializer):
     
     password = serializers.CharField(
         write_only=True,
@@ -47,7 +51,7 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         #Create user with validated data
         terms_accepted = validated_data.pop('terms_accepted')
-        password2 = validated_data.pop('confirm password')
+        validated_data.pop('password2')
         
         user = User.objects.create_user(
             email=validated_data['email'],
@@ -109,7 +113,13 @@ class UserLoginSerializer(serializers.Serializer):
             )
 
 
-class UserSerializer(serializers.ModelSerializer):
+
+class TokenRefreshSerializer(BaseTokenRefreshSerializer):
+    #Checks the blacklist through the JTI filter (users/tokens.py)
+    token_class = RefreshToken
+
+
+class UserSerializer(ModelSerializer):
     
     class Meta:
         model = User
@@ -124,7 +134,7 @@ class UserSerializer(serializers.ModelSerializer):
         )
 
 
-class UserUpdateSerializer(serializers.ModelSerializer):
+class UserUpdateSerializer(ModelSerializer):
     
     class Meta:
         model = User
@@ -202,16 +212,11 @@ class ResetPasswordSerializer(serializers.Serializer):
                 "new_password": "Password fields didn't match."
             })
         
-        # Verify token is valid
-        token = attrs.get('token')
+        # Verify token is valid, the view uses the resolved instance
         try:
-            reset_token = PasswordResetToken.objects.get(token=token)
-            if not reset_token.is_valid():
-                raise serializers.ValidationError(
-                    "Password reset link has expired or already been used."
-                )
-        except PasswordResetToken.DoesNotExist:
-            raise serializers.ValidationError("Invalid reset token.")
+            attrs['reset_token'] = resolve_reset_token(attrs.get('token'))
+        except TokenUnavailable as e:
+            raise serializers.ValidationError(str(e))
         
         return attrs
 
@@ -221,14 +226,10 @@ class VerifyEmailSerializer(serializers.Serializer):
     
     token = serializers.CharField(required=True)
     
-    def validate_token(self, value):
-        """Verify email token is valid"""
+    def validate(self, attrs):
+        """Verify email token is valid, the view uses the resolved instance"""
         try:
-            verification_token = EmailVerificationToken.objects.get(token=value)
-            if not verification_token.is_valid():
-                raise serializers.ValidationError(
-                    "Email verification link has expired."
-                )
-        except EmailVerificationToken.DoesNotExist:
-            raise serializers.ValidationError("Invalid verification token.")
-        return value
\ No newline at end of file
+            attrs['verification_token'] = resolve_verification_token(attrs['token'])
+        except TokenUnavailable as e:
+            raise serializers.ValidationError({'token': str(e)})
+        return attrs
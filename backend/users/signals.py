@@ -0,0 +1,21 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from core.authentication import invalidate_cached_user
+from .models import User
+from .tokens import bump_version
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_cache(sender, instance, **kwargs):
+    #Drop the cached user so the next request sees the new role/terms/is_active
+    invalidate_cached_user(instance.pk)
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def publish_blacklisted_token(sender, instance, created, **kwargs):
+    #Other processes sync on their next filter miss, once the row is visible to them
+    if created:
+        transaction.on_commit(bump_version)
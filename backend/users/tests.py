@@ -1,3 +1,324 @@
-from django.test import TestCase
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
 
-# Create your tests here.
+from django.contrib.auth.hashers import get_hasher
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from core.testing import make_user
+from .models import EmailVerificationToken, PasswordResetToken, User
+from . import hashers, token_service
+from .tokens import BloomFilter, RefreshToken, blacklist_filter
+
+
+class BloomFilterTests(TestCase):
+
+    def test_no_false_negatives_and_few_false_positives(self):
+        bloom = BloomFilter(1000, 0.01)
+        for index in range(1000):
+            bloom.add(f'jti-{index}')
+        
+        self.assertTrue(all(f'jti-{index}' in bloom for index in range(1000)))
+        false_positives = sum(f'other-{index}' in bloom for index in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+@override_settings(JTI_BLACKLIST_SYNC_INTERVAL=60)
+class TokenRefreshTests(APITestCase):
+    """Refresh tokens only hit the blacklist table when the JTI filter may contain them"""
+
+    def setUp(self):
+        cache.clear()
+        blacklist_filter.reset()
+        self.user = make_user('user@example.com', full_name='Token User')
+
+    def refresh(self, token):
+        return self.client.post('/api/v1/auth/refresh/', {'refresh': str(token)}, format='json')
+
+    def blacklist_checks(self, token):
+        #simplejwt's check_blacklist() EXISTS query
+        with CaptureQueriesContext(connection) as context:
+            response = self.refresh(token)
+        checks = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT 1 AS "a" FROM "token_blacklist_blacklistedtoken"')
+        ]
+        return response.status_code, len(checks)
+
+    def test_rotated_token_is_rejected(self):
+        token = RefreshToken.for_user(self.user)
+        response = self.refresh(token)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('access', response.data['data'])
+        self.assertNotEqual(response.data['data']['refresh'], str(token))
+
+        self.assertEqual(self.refresh(token).status_code, 401)
+        self.assertEqual(self.refresh(response.data['data']['refresh']).status_code, 200)
+
+    def test_unlisted_tokens_skip_the_blacklist_query(self):
+        for _ in range(3):
+            self.assertEqual(self.blacklist_checks(RefreshToken.for_user(self.user)), (200, 0))
+
+        rotated = RefreshToken.for_user(self.user)
+        self.refresh(rotated)
+        self.assertEqual(self.blacklist_checks(rotated), (401, 1))
+
+    def test_tokens_blacklisted_elsewhere_are_seen_after_sync(self):
+        token = RefreshToken.for_user(self.user)
+        self.assertEqual(self.refresh(RefreshToken.for_user(self.user)).status_code, 200)
+
+        # bulk_create skips the signal, like a row written by another process
+        outstanding = OutstandingToken.objects.get(jti=token['jti'])
+        BlacklistedToken.objects.bulk_create([BlacklistedToken(token=outstanding)])
+        blacklist_filter.sync(force=True)
+        self.assertEqual(self.refresh(token).status_code, 401)
+
+    def test_tokens_blacklisted_by_another_process_are_seen_at_once(self):
+        token = RefreshToken.for_user(self.user)
+        self.assertEqual(self.refresh(RefreshToken.for_user(self.user)).status_code, 200)
+
+        # Another worker rotates the token: the row and the shared version, not this filter
+        outstanding = OutstandingToken.objects.get(jti=token['jti'])
+        with self.captureOnCommitCallbacks(execute=True):
+            BlacklistedToken.objects.create(token=outstanding)
+        self.assertFalse(token['jti'] in blacklist_filter.filter)
+        self.assertEqual(self.refresh(token).status_code, 401)
+
+    def test_logout_blacklists_in_this_process_at_once(self):
+        token = RefreshToken.for_user(self.user)
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.post('/api/v1/auth/logout/', {'refresh': str(token)}, format='json').status_code, 200)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.refresh(token).status_code, 401)
+
+
+class PruneExpiredTokensTests(TestCase):
+
+    def setUp(self):
+        self.user = make_user('user@example.com', full_name='Token User', is_active=False)
+
+    def test_expired_tokens_are_deleted_in_batches(self):
+        now = timezone.now()
+        for index in range(5):
+            expires_at = now - timedelta(days=1)
+            token = OutstandingToken.objects.create(user=self.user, jti=f'expired-{index}', token='x', expires_at=expires_at)
+            if index % 2 == 0:
+                BlacklistedToken.objects.create(token=token)
+            PasswordResetToken.objects.create(user=self.user, token=f'reset-{index}', expires_at=expires_at, is_used=index == 0)
+        OutstandingToken.objects.create(user=self.user, jti='live', token='x', expires_at=now + timedelta(days=1))
+        PasswordResetToken.objects.create(user=self.user, token='reset-live', expires_at=now + timedelta(hours=1))
+        EmailVerificationToken.objects.create(user=self.user, token='verify', expires_at=now - timedelta(hours=1))
+
+        out = StringIO()
+        call_command('prune_expired_tokens', batch_size=2, stdout=out)
+        self.assertIn('token_blacklist.OutstandingToken: 5', out.getvalue())
+        self.assertIn('token_blacklist.BlacklistedToken: 3', out.getvalue())
+        self.assertIn('users.PasswordResetToken: 5', out.getvalue())
+        self.assertIn('users.EmailVerificationToken: 1', out.getvalue())
+        self.assertEqual(list(OutstandingToken.objects.values_list('jti', flat=True)), ['live'])
+        self.assertEqual(list(PasswordResetToken.objects.values_list('token', flat=True)), ['reset-live'])
+
+    def test_expired_tokens_are_rejected_in_sql(self):
+        now = timezone.now()
+        EmailVerificationToken.objects.create(user=self.user, token='old', expires_at=now - timedelta(minutes=1))
+        response = self.client.post('/api/v1/auth/verify-email/', {'token': 'old'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('expired', str(response.data))
+        response = self.client.post('/api/v1/auth/verify-email/', {'token': 'unknown'})
+        self.assertIn('Invalid', str(response.data))
+
+        PasswordResetToken.objects.create(user=self.user, token='used', expires_at=now + timedelta(hours=1), is_used=True)
+        self.assertFalse(PasswordResetToken.objects.valid().filter(token='used').exists())
+        response = self.client.post('/api/v1/auth/verify-password-reset-token/', {'token': 'used'})
+        self.assertEqual(response.data['error'], 'Password reset link has expired or already been used.')
+
+
+class TokenServiceTests(APITestCase):
+    """Reset/verify resolve their token once and consume it atomically"""
+
+    def setUp(self):
+        self.user = make_user('user@example.com', full_name='Token User')
+        self.reset_token = PasswordResetToken.objects.create(
+            user=self.user, token='reset', expires_at=timezone.now() + timedelta(hours=1)
+        )
+
+    def statements(self, url, data):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(url, data, format='json')
+        return response, [query['sql'] for query in context.captured_queries if 'SAVEPOINT' not in query['sql']]
+
+    def test_reset_password_resolves_the_token_once(self):
+        response, queries = self.statements('/api/v1/auth/reset-password/', {
+            'token': 'reset', 'new_password': 'N3w-passw0rd!', 'new_password2': 'N3w-passw0rd!'
+        })
+        self.assertEqual(response.status_code, 200)
+        # Token joined to its user, conditional UPDATE of the token, user password
+        self.assertEqual(len(queries), 3)
+        self.assertTrue(queries[1].startswith('UPDATE "password_reset_tokens"'))
+        self.assertIn('"is_used"', queries[1].split('WHERE')[1])
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('N3w-passw0rd!'))
+
+        response = self.client.post('/api/v1/auth/reset-password/', {
+            'token': 'reset', 'new_password': 'An0ther-pass!', 'new_password2': 'An0ther-pass!'
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_a_token_resolved_twice_is_consumed_once(self):
+        # Two requests that both passed validation
+        first = token_service.resolve_reset_token('reset')
+        second = token_service.resolve_reset_token('reset')
+        token_service.reset_password(first, 'N3w-passw0rd!')
+        with self.assertRaises(token_service.TokenUnavailable):
+            token_service.reset_password(second, 'An0ther-pass!')
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('N3w-passw0rd!'))
+
+    def test_verify_email_resolves_the_token_once(self):
+        EmailVerificationToken.objects.create(user=self.user, token='verify', expires_at=timezone.now() + timedelta(hours=1))
+        response, queries = self.statements('/api/v1/auth/verify-email/', {'token': 'verify'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len([sql for sql in queries if 'email_verification_tokens' in sql]), 2)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.is_verified)
+        self.assertFalse(EmailVerificationToken.objects.exists())
+
+
+class PasswordHashingTests(APITestCase):
+    """Hashing runs on the bounded pool, which sheds load with a 429"""
+
+    def setUp(self):
+        self.user = make_user('user@example.com', full_name='Hash User', is_verified=True)
+
+    def login(self):
+        return self.client.post('/api/v1/auth/login/', {'email': 'user@example.com', 'password': 'pass12345'}, format='json')
+
+    def test_passwords_are_hashed_with_argon2_on_the_pool(self):
+        completed = hashers.pool.stats()['completed']
+        self.assertTrue(self.user.password.startswith('argon2$'))
+        self.assertEqual(self.login().status_code, 200)
+        self.assertEqual(hashers.pool.stats()['completed'], completed + 1)
+
+    def test_old_hashes_are_upgraded_on_login(self):
+        self.user.password = get_hasher('pbkdf2_sha256').encode('pass12345', 'somesalt', iterations=1000)
+        self.user.save()
+        self.assertEqual(self.login().status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('argon2$'))
+
+    def while_pool_is_full(self, request):
+        #Response of request() while one blocked hash fills a pool of one worker and no queue
+        release = threading.Event()
+        busy = threading.Thread(target=hashers.pool.run, args=(release.wait,))
+        with override_settings(PASSWORD_HASHING_WORKERS=1, PASSWORD_HASHING_QUEUE_SIZE=0):
+            busy.start()
+            try:
+                while hashers.pool.stats()['in_flight'] == 0:
+                    time.sleep(0.01)
+                return request()
+            finally:
+                release.set()
+                busy.join()
+
+    def test_full_pool_rejects_logins_with_429(self):
+        rejected = hashers.pool.stats()['rejected']
+        response = self.while_pool_is_full(self.login)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertEqual(hashers.pool.stats()['rejected'], rejected + 1)
+        self.assertEqual(self.login().status_code, 200)
+
+    def test_full_pool_rejects_admin_logins_with_429(self):
+        User.objects.create_superuser(email='admin@example.com', password='pass12345', full_name='Admin')
+        credentials = {'username': 'admin@example.com', 'password': 'pass12345'}
+        response = self.while_pool_is_full(lambda: self.client.post('/admin/login/', credentials))
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertEqual(self.client.post('/admin/login/', credentials).status_code, 302)
+
+    def test_benchmark_suggests_a_cost(self):
+        out = StringIO()
+        call_command('benchmark_password_hasher', algorithm='pbkdf2_sha256', target_ms=20, samples=1, stdout=out)
+        self.assertIn('PASSWORD_PBKDF2_ITERATIONS=', out.getvalue())
+
+
+@override_settings(RATE_LIMITS={
+    'register': {'ip': '2/hour'},
+    'forgot_password': {'ip': '100/hour', 'email': '2/hour'},
+    'feedback': {'ip': '1/minute'},
+})
+class RateLimitTests(APITestCase):
+    """Public write endpoints are limited per IP and per email with token buckets"""
+
+    def setUp(self):
+        cache.clear()
+
+    def register(self, ip='10.0.0.1', **headers):
+        #Validation runs after the throttle, an empty body is enough to spend a token
+        return self.client.post('/api/v1/auth/', {}, format='json', REMOTE_ADDR=ip, **headers).status_code
+
+    def test_registration_is_limited_per_ip(self):
+        self.assertEqual([self.register(), self.register()], [400, 400])
+        response = self.client.post('/api/v1/auth/', {}, format='json', REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '1800')
+
+        # A client supplied X-Forwarded-For doesn't get a fresh bucket
+        self.assertEqual(self.register(ip='10.0.0.2'), 400)
+        self.assertEqual(self.register(HTTP_X_FORWARDED_FOR='10.7.7.7'), 429)
+
+    @override_settings(NUM_PROXIES=1)
+    def test_client_ip_behind_a_proxy(self):
+        #The proxy (REMOTE_ADDR) appends the address it saw, entries left of it are spoofable
+        self.assertEqual(self.register(ip='10.9.9.9', HTTP_X_FORWARDED_FOR='10.0.0.1'), 400)
+        self.assertEqual(self.register(ip='10.9.9.9', HTTP_X_FORWARDED_FOR='10.5.5.5, 10.0.0.1'), 400)
+        self.assertEqual(self.register(ip='10.9.9.9', HTTP_X_FORWARDED_FOR='10.6.6.6, 10.0.0.1'), 429)
+        self.assertEqual(self.register(ip='10.9.9.9', HTTP_X_FORWARDED_FOR='10.0.0.2'), 400)
+
+    def test_bucket_refills_continuously(self):
+        with patch('core.throttling.time.time', return_value=1_000_000):
+            self.assertEqual([self.register(), self.register(), self.register()], [400, 400, 429])
+        # Half an hour later one token is back, not the whole window
+        with patch('core.throttling.time.time', return_value=1_000_000 + 1800):
+            self.assertEqual([self.register(), self.register()], [400, 429])
+
+    def test_forgot_password_is_limited_per_email_across_ips(self):
+        make_user('user@example.com', full_name='Reset User', is_active=False)
+        for index in range(2):
+            response = self.client.post('/api/v1/auth/forgot-password/', {'email': 'user@example.com'}, REMOTE_ADDR=f'10.0.1.{index}')
+            self.assertEqual(response.status_code, 200)
+        response = self.client.post('/api/v1/auth/forgot-password/', {'email': ' User@Example.com'}, REMOTE_ADDR='10.0.1.9')
+        self.assertEqual(response.status_code, 429)
+
+    def test_feedback_is_limited(self):
+        self.assertNotEqual(self.client.post('/api/v1/feedback/', {}, format='json').status_code, 429)
+        self.assertEqual(self.client.post('/api/v1/feedback/', {}, format='json').status_code, 429)
+
+
+class RegistrationTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_valid_registration_creates_the_user(self):
+        response = self.client.post('/api/v1/auth/', {
+            'email': 'new@example.com',
+            'password': 'Adopt-me-2024',
+            'password2': 'Adopt-me-2024',
+            'full_name': 'New User',
+            'phone_number': '9800000000',
+            'terms_accepted': True,
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        user = User.objects.get(email='new@example.com')
+        self.assertTrue(user.check_password('Adopt-me-2024'))
+        self.assertTrue(user.terms_accepted)
@@ -0,0 +1,68 @@
+"""Password reset and email verification token handling
+
+A token is resolved once per request (user joined in) by the serializer
+and the instance is passed to the view. Consuming it is a conditional
+UPDATE/DELETE inside the same transaction as the user change, so two
+concurrent requests with one token cannot both succeed.
+"""
+
+from django.db import transaction
+from django.utils import timezone
+from .models import EmailVerificationToken, PasswordResetToken
+
+
+class TokenUnavailable(Exception):
+    """Token is unknown, expired or already used; str() is the message for the user"""
+
+
+def resolve_token(model, value, invalid_message, expired_message):
+    token = model.objects.with_validity().select_related('user').filter(token=value).first()
+    if token is None:
+        raise TokenUnavailable(invalid_message)
+    if not token.is_current:
+        raise TokenUnavailable(expired_message)
+    return token
+
+
+def resolve_reset_token(value):
+    return resolve_token(
+        PasswordResetToken, value,
+        "Invalid reset token.",
+        "Password reset link has expired or already been used."
+    )
+
+
+def resolve_verification_token(value):
+    return resolve_token(
+        EmailVerificationToken, value,
+        "Invalid verification token.",
+        "Email verification link has expired."
+    )
+
+
+@transaction.atomic
+def reset_password(reset_token, new_password):
+    """Mark the token used and set the user's password, or raise TokenUnavailable if it was used meanwhile"""
+    consumed = PasswordResetToken.objects.filter(
+        pk=reset_token.pk, is_used=False, expires_at__gt=timezone.now()
+    ).update(is_used=True)
+    if not consumed:
+        raise TokenUnavailable("Password reset link has expired or already been used.")
+
+    user = reset_token.user
+    user.set_password(new_password)
+    user.save(update_fields=['password'])
+    return user
+
+
+@transaction.atomic
+def verify_email(verification_token):
+    """Delete the token and mark the user verified, or raise TokenUnavailable if it was used meanwhile"""
+    deleted, _ = EmailVerificationToken.objects.filter(pk=verification_token.pk).delete()
+    if not deleted:
+        raise TokenUnavailable("Email verification link has expired.")
+
+    user = verification_token.user
+    user.is_verified = True
+    user.save(update_fields=['is_verified'])
+    return user
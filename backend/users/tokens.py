@@ -0,0 +1,157 @@
+"""
+Refresh tokens with an in-process Bloom filter in front of the blacklist
+
+simplejwt checks every refresh/logout token against BlacklistedToken (a
+join on OutstandingToken) before anything else. Almost every token is not
+blacklisted, so each process keeps a Bloom filter of blacklisted JTIs:
+a JTI the filter has never seen cannot be blacklisted and skips the query,
+only possible hits (real or false positive, JTI_BLACKLIST_FILTER_ERROR_RATE)
+go to the database.
+
+The filter syncs incrementally by BlacklistedToken id, at most every
+JTI_BLACKLIST_SYNC_INTERVAL seconds, re-reading the last
+JTI_BLACKLIST_SYNC_OVERLAP ids so rows committed out of id order are not
+missed. Tokens blacklisted in this process are added at once
+(RefreshToken.blacklist). Every committed BlacklistedToken row also bumps a
+version counter in the shared cache (JTI_BLACKLIST_CACHE_ALIAS,
+signals.py); a filter miss compares it with the version of the last sync
+and syncs at once when another process blacklisted something since, so a
+rotated or logged-out token can't be replayed against another worker in
+the meantime. Rows written without signals (bulk_create) wait for the next
+sync. Pruned rows stay in the filter (they only cost a query) until it
+fills up and is rebuilt from the table.
+"""
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken as BaseRefreshToken
+
+
+VERSION_KEY = 'jti_blacklist:version'
+
+
+def get_cache():
+    return caches[getattr(settings, 'JTI_BLACKLIST_CACHE_ALIAS', 'default')]
+
+
+def get_version():
+    return get_cache().get(VERSION_KEY)
+
+
+def bump_version():
+    cache = get_cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, 0, None)
+        cache.incr(VERSION_KEY)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter of strings"""
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def positions(self, item):
+        #Double hashing: k positions from the two halves of one digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return [(first + index * second) % self.size for index in range(self.hashes)]
+
+    def add(self, item):
+        added = False
+        for position in self.positions(item):
+            byte, bit = divmod(position, 8)
+            if not self.bits[byte] & (1 << bit):
+                self.bits[byte] |= 1 << bit
+                added = True
+        self.count += added
+
+    def __contains__(self, item):
+        return all(self.bits[byte] & (1 << bit) for byte, bit in (divmod(p, 8) for p in self.positions(item)))
+
+
+class BlacklistFilter:
+    """Process-wide Bloom filter of blacklisted JTIs, synced from BlacklistedToken"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.filter = None
+        self.last_id = 0
+        self.synced_at = None
+        self.version = None
+
+    def sync(self, force=False):
+        interval = getattr(settings, 'JTI_BLACKLIST_SYNC_INTERVAL', 2)
+        with self.lock:
+            if not force and self.synced_at is not None and time.monotonic() - self.synced_at < interval:
+                return
+
+            capacity = getattr(settings, 'JTI_BLACKLIST_FILTER_CAPACITY', 100_000)
+            if self.filter is None or self.filter.count >= self.filter.capacity:
+                # First sync or full: rebuild from the table, leaving room to grow
+                total = BlacklistedToken.objects.count()
+                error_rate = getattr(settings, 'JTI_BLACKLIST_FILTER_ERROR_RATE', 0.001)
+                self.filter = BloomFilter(max(capacity, total * 2), error_rate)
+                self.last_id = 0
+
+            # Read before the rows, a bump during the query triggers another sync
+            version = get_version()
+            overlap = getattr(settings, 'JTI_BLACKLIST_SYNC_OVERLAP', 100)
+            rows = (
+                BlacklistedToken.objects
+                .filter(id__gt=max(0, self.last_id - overlap))
+                .order_by('id')
+                .values_list('id', 'token__jti')
+            )
+            for pk, jti in rows.iterator():
+                self.filter.add(jti)
+                self.last_id = max(self.last_id, pk)
+            self.synced_at = time.monotonic()
+            self.version = version
+
+    def add(self, jti):
+        with self.lock:
+            if self.filter is not None:
+                self.filter.add(jti)
+
+    def might_contain(self, jti):
+        self.sync()
+        if jti in self.filter:
+            return True
+        # A miss is only certain if no other process blacklisted a token since the sync
+        if get_version() != self.version:
+            self.sync(force=True)
+            return jti in self.filter
+        return False
+
+
+blacklist_filter = BlacklistFilter()
+
+
+class RefreshToken(BaseRefreshToken):
+    """RefreshToken that only queries the blacklist for JTIs the filter may contain"""
+
+    def check_blacklist(self):
+        if blacklist_filter.might_contain(self.payload[api_settings.JTI_CLAIM]):
+            super().check_blacklist()
+
+    def blacklist(self):
+        #Logout and rotation; the JTI is in the payload, no OutstandingToken lookup
+        result = super().blacklist()
+        blacklist_filter.add(self.payload[api_settings.JTI_CLAIM])
+        return result
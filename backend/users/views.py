@@ -1,16 +1,21 @@
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from datetime import timedelta
+from core.permissions import IsAdminUser
+from core.throttling import RateLimitMixin
 from .serializers import (
     UserRegistrationSerializer, UserLoginSerializer, UserSerializer,
     UserUpdateSerializer, ChangePasswordSerializer, ForgotPasswordSerializer,
-    ResetPasswordSerializer, VerifyEmailSerializer, VerifyPasswordResetTokenSerializer
+    ResetPasswordSerializer, VerifyEmailSerializer, VerifyPasswordResetTokenSerializer,
+    TokenRefreshSerializer
 )
 from .models import PasswordResetToken, EmailVerificationToken
+from .tokens import RefreshToken
+from . import hashers, token_service
 from .utils import (
     send_verification_email, send_password_reset_email, send_welcome_email
 )
@@ -18,13 +23,16 @@ from .utils import (
 User = get_user_model()
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(RateLimitMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
+    rate_limit_scopes = {'create': 'register', 'forgot_password': 'forgot_password'}
     
     def get_permissions(self):
-        if self.action in ['create', 'login', 'forgot_password', 'reset_password', 'verify_email', 'verify_password_reset_token']:
+        if self.action in ['create', 'login', 'refresh', 'forgot_password', 'reset_password', 'verify_email', 'verify_password_reset_token']:
             return [permissions.AllowAny()]
+        elif self.action == 'hashing_stats':
+            return [IsAdminUser()]
         return [permissions.IsAuthenticated()]
     
     def get_serializer_class(self):
@@ -34,6 +42,8 @@ class UserViewSet(viewsets.ModelViewSet):
             return UserRegistrationSerializer
         elif self.action == 'login':
             return UserLoginSerializer
+        elif self.action == 'refresh':
+            return TokenRefreshSerializer
         elif self.action in ['update', 'partial_update']:
             return UserUpdateSerializer
         elif self.action == 'change_password':
@@ -113,6 +123,22 @@ class UserViewSet(viewsets.ModelViewSet):
             }
         })
     
+    @action(detail=False, methods=['post'], url_path='refresh')
+    def refresh(self, request):
+        #Exchange a refresh token for a new access token (and a rotated refresh token)
+        #POST /api/v1/auth/refresh/
+        
+        serializer = self.get_serializer(data=request.data)
+        try:
+            serializer.is_valid(raise_exception=True)
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+        
+        return Response({
+            'success': True,
+            'data': serializer.validated_data
+        })
+    
     @action(detail=False, methods=['post'], url_path='logout')
     def logout(self, request):
         #Logout user (blacklist refresh token)
@@ -133,6 +159,16 @@ class UserViewSet(viewsets.ModelViewSet):
                 'error': str(e)
             }, status=status.HTTP_400_BAD_REQUEST)
     
+    @action(detail=False, methods=['get'], url_path='hashing-stats')
+    def hashing_stats(self, request):
+        #Password hashing pool depth and rejections in this process (admin only)
+        #GET /api/v1/auth/hashing-stats/
+        
+        return Response({
+            'success': True,
+            'data': hashers.pool.stats()
+        })
+    
     @action(detail=False, methods=['get'], url_path='me')
     def me(self, request):
         #Get current user profile
@@ -231,29 +267,22 @@ class UserViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
-        token = serializer.validated_data['token']
-        
         try:
-            reset_token = PasswordResetToken.objects.get(token=token)
-            if reset_token.is_valid():
-                return Response({
-                    'success': True,
-                    'message': 'Token is valid',
-                    'data': {
-                        'email': reset_token.user.email,
-                        'expires_at': reset_token.expires_at
-                    }
-                })
-            else:
-                return Response({
-                    'success': False,
-                    'error': 'Token has expired or already been used'
-                }, status=status.HTTP_400_BAD_REQUEST)
-        except PasswordResetToken.DoesNotExist:
+            reset_token = token_service.resolve_reset_token(serializer.validated_data['token'])
+        except token_service.TokenUnavailable as e:
             return Response({
                 'success': False,
-                'error': 'Invalid token'
+                'error': str(e)
             }, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'success': True,
+            'message': 'Token is valid',
+            'data': {
+                'email': reset_token.user.email,
+                'expires_at': reset_token.expires_at
+            }
+        })
     
     @action(detail=False, methods=['post'], url_path='reset-password')
     def reset_password(self, request):
@@ -263,35 +292,22 @@ class UserViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
-        token = serializer.validated_data['token']
-        new_password = serializer.validated_data['new_password']
-        
         try:
-            reset_token = PasswordResetToken.objects.get(token=token)
-            
-            if not reset_token.is_valid():
-                return Response({
-                    'success': False,
-                    'error': 'Token has expired or already been used'
-                }, status=status.HTTP_400_BAD_REQUEST)
-            
-            # Update user password
-            user = reset_token.user
-            user.set_password(new_password)
-            user.save()
-            
-            # Mark token as used
-            reset_token.mark_as_used()
-            
-            return Response({
-                'success': True,
-                'message': 'Password reset successful. You can now login with your new password.'
-            })
-        except PasswordResetToken.DoesNotExist:
+            token_service.reset_password(
+                serializer.validated_data['reset_token'],
+                serializer.validated_data['new_password']
+            )
+        except token_service.TokenUnavailable as e:
+            # Used by a concurrent request since the serializer resolved it
             return Response({
                 'success': False,
-                'error': 'Invalid token'
+                'error': str(e)
             }, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'success': True,
+            'message': 'Password reset successful. You can now login with your new password.'
+        })
     
     @action(detail=False, methods=['post'], url_path='verify-email')
     def verify_email(self, request):
@@ -301,37 +317,21 @@ class UserViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
-        token = serializer.validated_data['token']
-        
         try:
-            verification_token = EmailVerificationToken.objects.get(token=token)
-            
-            if not verification_token.is_valid():
-                return Response({
-                    'success': False,
-                    'error': 'Email verification link has expired'
-                }, status=status.HTTP_400_BAD_REQUEST)
-            
-            # Mark user as verified
-            user = verification_token.user
-            user.is_verified = True
-            user.save(update_fields=['is_verified'])
-            
-            # Delete verification token
-            verification_token.delete()
-            
-            # Send welcome email
-            try:
-                send_welcome_email(user)
-            except Exception as e:
-                print(f"Failed to send welcome email: {e}")
-            
-            return Response({
-                'success': True,
-                'message': 'Email verified successfully. You can now login.'
-            })
-        except EmailVerificationToken.DoesNotExist:
+            user = token_service.verify_email(serializer.validated_data['verification_token'])
+        except token_service.TokenUnavailable as e:
             return Response({
                 'success': False,
-                'error': 'Invalid verification token'
-            }, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Send welcome email
+        try:
+            send_welcome_email(user)
+        except Exception as e:
+            print(f"Failed to send welcome email: {e}")
+        
+        return Response({
+            'success': True,
+            'message': 'Email verified successfully. You can now login.'
+        })
\ No newline at end of file